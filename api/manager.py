@@ -6,7 +6,6 @@ import time
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
-import pandas as pd
 
 import requests  # type: ignore
 
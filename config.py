@@ -4,6 +4,7 @@ from typing import List, Optional, Union, Dict
 import os
 from pathlib import Path
 import json
+import threading
 from enum import Enum
 
 from pydantic import BaseModel, HttpUrl, ValidationError, validator, DirectoryPath
@@ -261,6 +262,114 @@ def load_config(config_path: Path, account_path: Path) -> Config:
 
     return Config(**config_data)
 
+class ConfigService:
+    """
+    One validated Config shared by every thread, reloaded when the files change.
+
+    The config and account files are parsed once; a watcher thread polls their
+    modification times and, when either changes, loads and validates the new version.
+    A valid version replaces `config` in a single reference swap and bumps `version`;
+    an invalid one is logged and the running config is kept. Snapshots are shared, so
+    treat them as read-only. Strategies compare `version` at the top of each iteration
+    to pick up changes; subscribers are called with (old, new, changed_sections).
+    """
+
+    def __init__(self, config_path: Path, account_path: Path, poll_interval: float = 5.0):
+        self.config_path = Path(config_path)
+        self.account_path = Path(account_path)
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.stop_event = threading.Event()
+        self.watcher = None
+        self._mtimes = self._read_mtimes()
+        self.config = load_config(self.config_path, self.account_path)
+        self.version = 1
+
+    def _read_mtimes(self):
+        mtimes = []
+        for path in (self.config_path, self.account_path):
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def subscribe(self, callback):
+        with self.lock:
+            self.subscribers.append(callback)
+
+    def start(self):
+        with self.lock:
+            if self.watcher is None:
+                self.watcher = threading.Thread(target=self._watch, name="config-watcher", daemon=True)
+                self.watcher.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _watch(self):
+        while not self.stop_event.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                logging.error(f"Config watcher error: {e}")
+
+    def reload(self, force: bool = False) -> bool:
+        """Load the files again if they changed; returns True when a new version was swapped in."""
+        mtimes = self._read_mtimes()
+        if not force and mtimes == self._mtimes:
+            return False
+        self._mtimes = mtimes
+        try:
+            new = load_config(self.config_path, self.account_path)
+        except (ValidationError, ValueError, KeyError, OSError) as e:
+            # ValueError covers malformed JSON; files caught mid-write are retried on the next change
+            logging.error(f"Ignoring invalid config change in {self.config_path}: {e}")
+            return False
+
+        with self.lock:
+            old = self.config
+            changed = [name for name in new.__fields__ if getattr(old, name) != getattr(new, name)]
+            if not changed:
+                return False
+            self.config = new
+            self.version += 1
+            version = self.version
+            subscribers = list(self.subscribers)
+
+        logging.info(f"Config reloaded (version {version}), changed sections: {', '.join(changed)}")
+        if 'bot' in changed and old.bot.linear_grid != new.bot.linear_grid:
+            keys = sorted(key for key in set(old.bot.linear_grid) | set(new.bot.linear_grid)
+                          if old.bot.linear_grid.get(key) != new.bot.linear_grid.get(key))
+            logging.info(f"linear_grid changes: {', '.join(keys)}")
+        for callback in subscribers:
+            try:
+                callback(old, new, changed)
+            except Exception as e:
+                logging.error(f"Config subscriber failed: {e}")
+        return True
+
+_config_services = {}
+_config_services_lock = threading.Lock()
+_current_config_service = None
+
+def get_config_service(config_path: Path, account_path: Path, poll_interval: float = 5.0) -> ConfigService:
+    """The running ConfigService for this pair of files, created and started on first use."""
+    global _current_config_service
+    key = (Path(config_path).resolve(), Path(account_path).resolve())
+    with _config_services_lock:
+        service = _config_services.get(key)
+        if service is None:
+            service = _config_services[key] = ConfigService(config_path, account_path, poll_interval).start()
+        _current_config_service = service
+        return service
+
+def current_config_service() -> Optional[ConfigService]:
+    """The service most recently requested through get_config_service, if any."""
+    return _current_config_service
+
 def get_exchange_name(cli_exchange_name):
     if cli_exchange_name:
         return cli_exchange_name
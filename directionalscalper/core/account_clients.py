@@ -0,0 +1,130 @@
+"""
+One ccxt client per API key, shared by every component that trades the account.
+
+The market maker, the manager and each strategy used to build their own ccxt
+instance for the same key: separate HTTP sessions, market caches and rate limiters,
+so every component spent its own request budget. AccountClientRegistry hands all of
+them the same AccountClient, which holds:
+
+- the ccxt client, with a connection pool sized for the bot's threads and a nonce
+  that stays strictly increasing when many threads sign requests at once;
+- the named RateLimit objects for the key, so a limit applies to the whole account
+  and not to each component separately;
+- the rate-limit headers the exchange returned (Bybit's X-Bapi-Limit-*), per
+  endpoint, as one view of the headroom left on the key.
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+from directionalscalper.core.strategies.logger import Logger
+from rate_limit import RateLimit
+
+logging = Logger(logger_name="AccountClients", filename="AccountClients.log", stream=True)
+
+POOL_SIZE = 32  # Above the default of 10 so concurrent strategy threads don't drop connections
+
+
+class MonotonicNonce:
+    """Wraps a client's nonce() so concurrent callers never get the same or a smaller value."""
+
+    def __init__(self, nonce):
+        self.nonce = nonce
+        self.lock = threading.Lock()
+        self.last = 0
+
+    def __call__(self):
+        with self.lock:
+            value = max(self.nonce(), self.last + 1)
+            self.last = value
+            return value
+
+
+class AccountClient:
+    def __init__(self, key, client):
+        self.key = key
+        self.client = client
+        self.lock = threading.Lock()
+        self.rate_limiters = {}
+        self.shared_state = {}
+        self.rate_limit_status = {}  # endpoint path -> (remaining, limit, reset_ms, observed_at)
+
+        client.nonce = MonotonicNonce(client.nonce)
+        session = getattr(client, 'session', None)
+        if session is not None:
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self._observe_responses(client)
+
+    def shared(self, name, factory):
+        """A per-account object called `name` (e.g. the open-orders book), built with factory() once."""
+        with self.lock:
+            value = self.shared_state.get(name)
+            if value is None:
+                value = self.shared_state[name] = factory()
+            return value
+
+    def rate_limiter(self, name, calls, period):
+        """The account's RateLimit called `name`, created with (calls, period) the first time."""
+        with self.lock:
+            limiter = self.rate_limiters.get(name)
+            if limiter is None:
+                limiter = self.rate_limiters[name] = RateLimit(calls, period)
+            return limiter
+
+    def _observe_responses(self, client):
+        # handle_errors() receives the headers of its own response, unlike the shared
+        # last_response_headers attribute that other threads overwrite
+        handle_errors = client.handle_errors
+
+        def observe_and_handle_errors(code, reason, url, method, headers, body, response, request_headers, request_body):
+            try:
+                self.observe(url, headers)
+            except Exception as e:
+                logging.debug(f"Could not read rate limit headers for {url}: {e}")
+            return handle_errors(code, reason, url, method, headers, body, response, request_headers, request_body)
+
+        client.handle_errors = observe_and_handle_errors
+
+    def observe(self, url, headers):
+        if not headers:
+            return
+        remaining = headers.get('X-Bapi-Limit-Status')
+        limit = headers.get('X-Bapi-Limit')
+        if remaining is None or limit is None:
+            return
+        reset = headers.get('X-Bapi-Limit-Reset-Timestamp')
+        status = (int(remaining), int(limit), int(reset) if reset else None, time.time())
+        with self.lock:
+            self.rate_limit_status[urlparse(url).path] = status
+        if status[0] <= max(1, status[1] // 10):
+            logging.warning(f"Rate limit headroom low on {urlparse(url).path}: {status[0]}/{status[1]} left")
+
+    def headroom(self, max_age=60):
+        """{path: (remaining, limit)} reported by the exchange in the last max_age seconds."""
+        now = time.time()
+        with self.lock:
+            return {
+                path: (remaining, limit)
+                for path, (remaining, limit, reset, observed_at) in self.rate_limit_status.items()
+                if now - observed_at <= max_age and (reset is None or reset > now * 1000)
+            }
+
+
+class AccountClientRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.accounts = {}
+
+    def get(self, key, create_client):
+        """The AccountClient for `key`, building its ccxt client with create_client() the first time."""
+        with self.lock:
+            account = self.accounts.get(key)
+            if account is None:
+                account = self.accounts[key] = AccountClient(key, create_client())
+                logging.info(f"Created shared client for {key[0]} ({key[1]})")
+            return account
@@ -0,0 +1,143 @@
+"""
+Account equity, available margin and uPnL, refreshed once per account and read by every thread.
+
+Strategy threads used to fetch the balance on their own timers, so each sized its
+orders from whatever value it read last and the account was asked for its balance
+once per thread. AccountEquity refreshes on a single schedule in a background thread
+and publishes an immutable EquitySnapshot per quote currency. Readers get the latest
+snapshot with its timestamp; a snapshot is replaced whole, never updated in place, so
+total and available always belong together.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="AccountEquity", filename="AccountEquity.log", stream=True)
+
+EquitySnapshot = namedtuple('EquitySnapshot', 'quote total available wallet_balance upnl updated_at source')
+
+
+def _to_float(value, default=None):
+    try:
+        return float(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _bybit_coins(info):
+    # Bybit v5 wallet-balance response: result.list[].coin[]
+    coins = {}
+    for account in ((info or {}).get('result') or {}).get('list') or []:
+        for coin in account.get('coin') or []:
+            coins[coin.get('coin')] = coin
+    return coins
+
+
+class AccountEquity:
+    def __init__(self, refresh_interval=60, max_age=None):
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age if max_age is not None else 3 * refresh_interval  # Older snapshots are refreshed on read
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.snapshots = {}  # quote -> EquitySnapshot
+        self.quotes = set()  # Quotes that have been read, and so are kept up to date
+        self.fetch = None    # Returns a ccxt fetch_balance response
+        self.listeners = []  # Called with every new EquitySnapshot
+        self.refresher = None
+
+    def start(self, fetch):
+        """Refresh from fetch() every refresh_interval in a background thread; later calls are ignored."""
+        with self.lock:
+            if self.refresher is not None:
+                return
+            self.fetch = fetch
+            self.refresher = threading.Thread(target=self._refresh_loop, name="account-equity", daemon=True)
+            self.refresher.start()
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    # Reads
+
+    def get(self, quote):
+        """The latest EquitySnapshot for quote, fetching first if there is none or it is too old; None if unavailable."""
+        with self.lock:
+            self.quotes.add(quote)
+            snapshot = self.snapshots.get(quote)
+        if snapshot is not None and time.time() - snapshot.updated_at <= self.max_age:
+            return snapshot
+        try:
+            self.refresh(force=snapshot is not None)
+        except Exception as e:
+            logging.info(f"Error fetching balance for {quote}: {e}")
+        with self.lock:
+            return self.snapshots.get(quote)
+
+    # Updates
+
+    def refresh(self, force=False):
+        """
+        Fetch the balance once for every reader: callers that waited on another thread's
+        fetch use its result, and without force a snapshot younger than max_age is kept.
+        """
+        if self.fetch is None:
+            return
+        requested_at = time.time()
+        with self.refresh_lock:
+            if self._covered(requested_at if force else requested_at - self.max_age):
+                return
+            self.apply_balance(self.fetch())
+
+    def _covered(self, since):
+        # Every quote being read has a snapshot from `since` or later
+        with self.lock:
+            return bool(self.quotes) and all(
+                quote in self.snapshots and self.snapshots[quote].updated_at >= since for quote in self.quotes
+            )
+
+    def apply_balance(self, response, source='rest'):
+        """Publish snapshots from a ccxt fetch_balance response for every quote being read."""
+        now = time.time()
+        coins = _bybit_coins(response.get('info'))
+        with self.lock:
+            quotes = set(self.quotes)
+        for quote in quotes:
+            total = _to_float((response.get('total') or {}).get(quote))
+            if total is None:
+                logging.info(f"Balance for {quote} not found in the response.")
+                continue
+            coin = coins.get(quote, {})
+            self._publish(EquitySnapshot(
+                quote=quote,
+                total=total,
+                available=_to_float((response.get('free') or {}).get(quote)),
+                wallet_balance=_to_float(coin.get('walletBalance'), total),
+                upnl=_to_float(coin.get('unrealisedPnl'), 0.0),
+                updated_at=now,
+                source=source,
+            ))
+
+    def _publish(self, snapshot):
+        with self.lock:
+            self.snapshots[snapshot.quote] = snapshot
+        for listener in list(self.listeners):
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logging.warning(f"Equity listener failed: {e}")
+
+    # Background refresh
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            with self.lock:
+                if not self.quotes:
+                    continue
+            try:
+                self.refresh(force=True)
+            except Exception as e:
+                logging.warning(f"Background balance refresh failed, keeping the last snapshot: {e}")
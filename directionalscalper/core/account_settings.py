@@ -0,0 +1,108 @@
+import threading
+import time
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="AccountSettings", filename="AccountSettings.log", stream=True)
+
+HEDGE = 'hedge'
+ONE_WAY = 'one_way'
+CROSS = 'cross'
+ISOLATED = 'isolated'
+
+# Bybit return codes meaning "already set to that value"
+NOT_MODIFIED_CODES = {
+    'position_mode': ('110025',),
+    'margin_mode': ('110026',),
+    'leverage': ('110043',),
+}
+
+
+def _normalize_symbol(symbol):
+    # 'BTC/USDT:USDT' and 'BTCUSDT' both map to 'BTCUSDT'
+    return symbol.split(':')[0].replace('/', '') if symbol else ''
+
+
+def is_not_modified(field, error):
+    """True if `error` is the exchange saying `field` already had the requested value."""
+    message = str(error)
+    return any(code in message for code in NOT_MODIFIED_CODES.get(field, ())) or 'not modified' in message.lower()
+
+
+class AccountSettings:
+    """
+    Per-symbol account settings the exchange last confirmed: position mode, margin mode
+    and leverage.
+
+    Setup calls check matches() first and skip the request when nothing would change,
+    so a thread restarted for a symbol the account is already configured for starts
+    without any setup round trips. Values come from our own successful changes, from
+    "not modified" answers, and from position snapshots; entries older than max_age are
+    treated as unknown so a change made outside the bot is eventually picked up.
+    """
+
+    def __init__(self, max_age=3600):
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.settings = {}  # symbol -> {field: (value, recorded_at)}
+
+    def get(self, symbol, field):
+        with self.lock:
+            entry = self.settings.get(_normalize_symbol(symbol), {}).get(field)
+        if entry is None or time.time() - entry[1] > self.max_age:
+            return None
+        return entry[0]
+
+    def matches(self, symbol, **fields):
+        """True if every given field is known and equal to the given value."""
+        for field, value in fields.items():
+            known = self.get(symbol, field)
+            if known is None:
+                return False
+            if field == 'leverage':
+                if abs(float(known) - float(value)) > 1e-9:
+                    return False
+            elif known != value:
+                return False
+        return True
+
+    def record(self, symbol, **fields):
+        now = time.time()
+        with self.lock:
+            entry = self.settings.setdefault(_normalize_symbol(symbol), {})
+            for field, value in fields.items():
+                if value is not None:
+                    entry[field] = (float(value) if field == 'leverage' else value, now)
+
+    def forget(self, symbol, field=None):
+        with self.lock:
+            entry = self.settings.get(_normalize_symbol(symbol))
+            if entry is not None:
+                if field is None:
+                    entry.clear()
+                else:
+                    entry.pop(field, None)
+
+    def update_from_positions(self, positions):
+        """Record what a ccxt fetch_positions snapshot says about each symbol's settings."""
+        for position in positions:
+            info = position.get('info', {})
+            symbol = info.get('symbol') or position.get('symbol')
+            if not symbol:
+                continue
+            fields = {}
+            try:
+                if info.get('leverage') not in (None, ''):
+                    fields['leverage'] = float(info['leverage'])
+            except (TypeError, ValueError):
+                pass
+            position_idx = str(info.get('positionIdx', ''))
+            if position_idx in ('1', '2'):
+                fields['position_mode'] = HEDGE
+            elif position_idx == '0':
+                fields['position_mode'] = ONE_WAY
+            trade_mode = str(info.get('tradeMode', ''))
+            if trade_mode == '0':
+                fields['margin_mode'] = CROSS
+            elif trade_mode == '1':
+                fields['margin_mode'] = ISOLATED
+            self.record(symbol, **fields)
@@ -1,22 +1,67 @@
 import sqlite3
+import threading
+import time
 import pytz
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from directionalscalper.core.strategies.logger import Logger
 
 logging = Logger(logger_name="BotMetrics", filename="BotMetrics.log", stream=True)
 
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_bot_database(db_file="bot_data.db", exchange=None):
+    """Return the process-wide BotDatabase for db_file, creating it on first use."""
+    with _databases_lock:
+        db = _databases.get(db_file)
+        if db is None:
+            db = BotDatabase(db_file, exchange)
+            _databases[db_file] = db
+        elif exchange is not None and db.exchange is None:
+            db.exchange = exchange
+        return db
+
+
+def _utc_day(timestamp_ms):
+    return datetime.fromtimestamp(int(timestamp_ms) / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
 class BotDatabase:
+    """
+    SQLite store for bot metrics and the local fill/PnL ledger.
+
+    A single long-lived connection in WAL mode is shared by all threads (guarded by a
+    lock). The ledger is ingested incrementally: every stream remembers the last exchange
+    timestamp it has fully stored in `sync_cursors`, and each fetched window is written with
+    one executemany() inside the same transaction that moves the cursor.
+    """
+
+    LEDGER_LOOKBACK_DAYS = 30  # How far back the first sync goes when there is no cursor yet
+    LEDGER_SETTLE_MS = 60 * 1000  # Records this recent may still be arriving, so empty windows ending later don't move the cursor
+    MIN_SYNC_INTERVAL = 60  # Seconds between ledger syncs against the exchange
+
     def __init__(self, db_file="bot_data.db", exchange=None):
         self.db_file = db_file
         self.exchange = exchange
+        self.lock = threading.RLock()
+        self.last_sync_time = 0
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.create_tables_if_not_exists()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_file)
+        return self.conn
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
 
     def create_tables_if_not_exists(self):
-        with self.get_connection() as conn:
+        with self.lock, self.get_connection() as conn:
             cursor = conn.cursor()
-            
+
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS initial_values (
                 id INTEGER PRIMARY KEY,
@@ -24,7 +69,7 @@ class BotDatabase:
                 start_date TEXT
             )
             ''')
-            
+
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS daily_gains (
                 id INTEGER PRIMARY KEY,
@@ -32,25 +77,81 @@ class BotDatabase:
             )
             ''')
 
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS executions (
+                exec_id TEXT PRIMARY KEY,
+                symbol TEXT,
+                side TEXT,
+                order_id TEXT,
+                order_link_id TEXT,
+                price REAL,
+                qty REAL,
+                exec_value REAL,
+                fee REAL,
+                fee_rate REAL,
+                is_maker INTEGER,
+                exec_time INTEGER,
+                day TEXT
+            )
+            ''')
+
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS closed_pnl (
+                order_id TEXT,
+                symbol TEXT,
+                side TEXT,
+                qty REAL,
+                avg_entry_price REAL,
+                avg_exit_price REAL,
+                closed_pnl REAL,
+                closed_time INTEGER,
+                day TEXT,
+                PRIMARY KEY (order_id, closed_time)
+            )
+            ''')
+
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS funding_payments (
+                exec_id TEXT PRIMARY KEY,
+                symbol TEXT,
+                side TEXT,
+                funding REAL,
+                exec_time INTEGER,
+                day TEXT
+            )
+            ''')
+
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_cursors (
+                stream TEXT PRIMARY KEY,
+                last_time INTEGER
+            )
+            ''')
+
+            for table, time_column in (('executions', 'exec_time'), ('closed_pnl', 'closed_time'), ('funding_payments', 'exec_time')):
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_symbol_day ON {table} (symbol, day)')
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_day ON {table} (day)')
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_time ON {table} ({time_column})')
+
             conn.commit()
 
     def save_initial_values(self, initial_equity, start_date):
-        with self.get_connection() as conn:
+        with self.lock, self.get_connection() as conn:
             cursor = conn.cursor()
-            
+
             cursor.execute('DELETE FROM initial_values WHERE id = 1')  # Clear existing values
-            cursor.execute('INSERT INTO initial_values (id, initial_equity, start_date) VALUES (?, ?, ?)', 
+            cursor.execute('INSERT INTO initial_values (id, initial_equity, start_date) VALUES (?, ?, ?)',
                            (1, initial_equity, start_date.isoformat()))
-            
+
             conn.commit()
 
     def get_initial_values(self):
-        with self.get_connection() as conn:
+        with self.lock, self.get_connection() as conn:
             cursor = conn.cursor()
-            
+
             cursor.execute('SELECT initial_equity, start_date FROM initial_values WHERE id = 1')
             row = cursor.fetchone()
-            
+
             if row:
                 initial_equity, start_date_str = row
                 if start_date_str:  # Ensure start_date_str is not None
@@ -67,10 +168,10 @@ class BotDatabase:
     # def get_initial_values(self):
     #     with self.get_connection() as conn:
     #         cursor = conn.cursor()
-            
+
     #         cursor.execute('SELECT initial_equity, start_date FROM initial_values WHERE id = 1')
     #         row = cursor.fetchone()
-            
+
     #         if row:
     #             initial_equity, start_date_str = row
     #             if start_date_str:  # Ensure start_date_str is not None
@@ -80,12 +181,12 @@ class BotDatabase:
 
 
     def get_average_daily_gain(self):
-        with self.get_connection() as conn:
+        with self.lock, self.get_connection() as conn:
             cursor = conn.cursor()
-            
+
             cursor.execute('SELECT avg_daily_gain FROM daily_gains WHERE id = 1')  # Assuming you saved it with an id of 1
             row = cursor.fetchone()
-            
+
             if row:
                 return row[0]
             return 0.0
@@ -93,7 +194,7 @@ class BotDatabase:
     def compute_average_daily_gain(self):
 
         quote_currency = "USDT"
-        
+
         # Retrieve stored values
         initial_values = self.get_initial_values()
         if initial_values:
@@ -132,4 +233,206 @@ class BotDatabase:
     def compute_average_daily_gain_percentage(initial_equity, current_equity, days_passed):
         if days_passed == 0:
             return 0
-        return ((current_equity - initial_equity) / (initial_equity * days_passed)) * 100
\ No newline at end of file
+        return ((current_equity - initial_equity) / (initial_equity * days_passed)) * 100
+
+    # Ledger ingestion
+
+    def get_sync_cursor(self, stream):
+        with self.lock:
+            row = self.conn.execute('SELECT last_time FROM sync_cursors WHERE stream = ?', (stream,)).fetchone()
+            return row[0] if row else None
+
+    def _set_sync_cursor(self, conn, stream, last_time):
+        conn.execute('''
+            INSERT INTO sync_cursors (stream, last_time) VALUES (?, ?)
+            ON CONFLICT(stream) DO UPDATE SET last_time = MAX(last_time, excluded.last_time)
+        ''', (stream, last_time))
+
+    @staticmethod
+    def _window_cursor(window_end, newest, settled_before):
+        # A fully fetched window that ended before recent records could still be landing is
+        # complete up to its end. The open window at "now" is only complete up to just before
+        # its newest record: another one with the same timestamp may still land, so the next
+        # sync re-reads from `newest` and the primary keys drop what is already stored
+        if window_end < settled_before:
+            return window_end
+        return newest - 1 if newest is not None else None
+
+    def record_executions(self, executions, cursor=None):
+        """
+        Batch insert raw Bybit v5 execution records. Trade fills go to `executions`,
+        funding settlements (execType 'Funding') go to `funding_payments`. `cursor`, if
+        given, is stored as the point everything up to which is now in the ledger.
+        Returns the newest execTime seen, or None for an empty batch.
+        """
+        trade_rows = []
+        funding_rows = []
+        last_time = None
+
+        for execution in executions:
+            exec_time = int(execution.get('execTime') or 0)
+            last_time = exec_time if last_time is None else max(last_time, exec_time)
+            day = _utc_day(exec_time)
+            fee = float(execution.get('execFee') or 0)
+
+            if execution.get('execType') == 'Funding':
+                # Bybit reports funding as a fee: positive is paid, negative is received
+                funding_rows.append((execution['execId'], execution.get('symbol'), execution.get('side'), -fee, exec_time, day))
+            else:
+                trade_rows.append((
+                    execution['execId'],
+                    execution.get('symbol'),
+                    execution.get('side'),
+                    execution.get('orderId'),
+                    execution.get('orderLinkId'),
+                    float(execution.get('execPrice') or 0),
+                    float(execution.get('execQty') or 0),
+                    float(execution.get('execValue') or 0),
+                    fee,
+                    float(execution.get('feeRate') or 0),
+                    1 if execution.get('isMaker') else 0,
+                    exec_time,
+                    day,
+                ))
+
+        with self.lock, self.conn as conn:
+            if trade_rows:
+                conn.executemany('INSERT OR IGNORE INTO executions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', trade_rows)
+            if funding_rows:
+                conn.executemany('INSERT OR IGNORE INTO funding_payments VALUES (?, ?, ?, ?, ?, ?)', funding_rows)
+            if cursor is not None:
+                self._set_sync_cursor(conn, 'executions', cursor)
+
+        return last_time
+
+    def record_closed_pnl(self, records, cursor=None):
+        """
+        Batch insert raw Bybit v5 closed PnL records, storing `cursor` as in record_executions.
+        Returns the newest updatedTime seen.
+        """
+        rows = []
+        last_time = None
+
+        for record in records:
+            closed_time = int(record.get('updatedTime') or record.get('createdTime') or 0)
+            last_time = closed_time if last_time is None else max(last_time, closed_time)
+            rows.append((
+                record.get('orderId'),
+                record.get('symbol'),
+                record.get('side'),
+                float(record.get('closedSize') or record.get('qty') or 0),
+                float(record.get('avgEntryPrice') or 0),
+                float(record.get('avgExitPrice') or 0),
+                float(record.get('closedPnl') or 0),
+                closed_time,
+                _utc_day(closed_time),
+            ))
+
+        with self.lock, self.conn as conn:
+            if rows:
+                conn.executemany('INSERT OR IGNORE INTO closed_pnl VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            if cursor is not None:
+                self._set_sync_cursor(conn, 'closed_pnl', cursor)
+
+        return last_time
+
+    def sync_ledger(self, exchange=None, force=False):
+        """
+        Pull everything newer than the stored cursors from the exchange and append it to the
+        ledger. Cheap to call often: it is throttled to MIN_SYNC_INTERVAL unless forced.
+        """
+        exchange = exchange or self.exchange
+        if exchange is None:
+            logging.warning("sync_ledger called without an exchange")
+            return False
+
+        now = time.time()
+        if not force and now - self.last_sync_time < self.MIN_SYNC_INTERVAL:
+            return False
+        self.last_sync_time = now
+
+        default_start = int((now - self.LEDGER_LOOKBACK_DAYS * 86400) * 1000)
+        settled_before = int(now * 1000) - self.LEDGER_SETTLE_MS
+        try:
+            since = self.get_sync_cursor('executions')
+            for records, window_end in exchange.fetch_executions_bybit(since + 1 if since else default_start):
+                newest = max((int(record.get('execTime') or 0) for record in records), default=None)
+                self.record_executions(records, self._window_cursor(window_end, newest, settled_before))
+
+            since = self.get_sync_cursor('closed_pnl')
+            for records, window_end in exchange.fetch_closed_pnl_bybit(since + 1 if since else default_start):
+                newest = max((int(record.get('updatedTime') or record.get('createdTime') or 0) for record in records), default=None)
+                self.record_closed_pnl(records, self._window_cursor(window_end, newest, settled_before))
+            return True
+        except Exception as e:
+            logging.info(f"Error syncing PnL ledger: {e}")
+            return False
+
+    # Ledger queries
+
+    def get_daily_pnl(self, days=30, symbol=None):
+        """
+        Realized PnL per UTC day over the last `days` days: closed PnL plus funding.
+        Returns a list of (day, pnl) ordered by day.
+        """
+        start_day = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        symbol_filter = 'AND symbol = ?' if symbol else ''
+        params = (start_day, symbol) if symbol else (start_day,)
+
+        with self.lock:
+            rows = self.conn.execute(f'''
+                SELECT day, SUM(pnl) FROM (
+                    SELECT day, closed_pnl AS pnl FROM closed_pnl WHERE day >= ? {symbol_filter}
+                    UNION ALL
+                    SELECT day, funding AS pnl FROM funding_payments WHERE day >= ? {symbol_filter}
+                )
+                GROUP BY day ORDER BY day
+            ''', params + params).fetchall()
+        return rows
+
+    def get_average_daily_pnl(self, days=30, symbol=None):
+        daily_pnl = self.get_daily_pnl(days, symbol)
+        return sum(pnl for _, pnl in daily_pnl) / days if days else 0.0
+
+    def get_symbol_pnl(self, days=30):
+        """Realized PnL, fees and funding per symbol over the last `days` days."""
+        start_day = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT symbol, SUM(closed_pnl), SUM(fees), SUM(funding) FROM (
+                    SELECT symbol, closed_pnl, 0 AS fees, 0 AS funding FROM closed_pnl WHERE day >= ?
+                    UNION ALL
+                    SELECT symbol, 0, fee, 0 FROM executions WHERE day >= ?
+                    UNION ALL
+                    SELECT symbol, 0, 0, funding FROM funding_payments WHERE day >= ?
+                )
+                GROUP BY symbol
+            ''', (start_day, start_day, start_day)).fetchall()
+
+        return {
+            symbol: {'closed_pnl': closed_pnl, 'fees': fees, 'funding': funding, 'net_pnl': closed_pnl + funding}
+            for symbol, closed_pnl, fees, funding in rows
+        }
+
+    def get_max_drawdown(self, days=30, symbol=None):
+        """Largest peak-to-trough drop of cumulative realized PnL over the last `days` days."""
+        start_time = int((time.time() - days * 86400) * 1000)
+        symbol_filter = 'AND symbol = ?' if symbol else ''
+        params = (start_time, symbol) if symbol else (start_time,)
+
+        with self.lock:
+            rows = self.conn.execute(f'''
+                SELECT SUM(pnl) OVER (ORDER BY t ROWS UNBOUNDED PRECEDING) FROM (
+                    SELECT closed_time AS t, closed_pnl AS pnl FROM closed_pnl WHERE closed_time >= ? {symbol_filter}
+                    UNION ALL
+                    SELECT exec_time AS t, funding AS pnl FROM funding_payments WHERE exec_time >= ? {symbol_filter}
+                )
+            ''', params + params).fetchall()
+
+        peak = 0.0
+        max_drawdown = 0.0
+        for (cumulative_pnl,) in rows:
+            peak = max(peak, cumulative_pnl)
+            max_drawdown = max(max_drawdown, peak - cumulative_pnl)
+        return max_drawdown
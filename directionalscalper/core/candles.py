@@ -0,0 +1,253 @@
+"""
+Higher-timeframe candles built locally from one 1m series per symbol.
+
+Bybit candles are aligned to the UTC epoch, so a bar of any timeframe up to 1d is the
+1m bars inside [start, start + timeframe): first open, max high, min low, last close,
+summed volume. CandleStore keeps the 1m series per symbol in sync with a small
+incremental fetch and serves every other timeframe from it; closed higher-timeframe
+bars are kept per timeframe and announced to subscribers once, as they close.
+
+The series holds the longest lookback any caller has asked for: a shorter request is
+a slice of it, and a longer one only fetches the older bars that are missing.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from directionalscalper.core.indicator_cache import TIMEFRAME_SECONDS
+
+BASE_MS = 60 * 1000
+FETCH_LIMIT = 1000  # Bybit kline page size
+MAX_BARS = 12000    # ~8 days of 1m bars; enough for 3000 3m candles
+
+
+def timeframe_ms(timeframe):
+    return TIMEFRAME_SECONDS[timeframe] * 1000
+
+
+def aggregate(bars):
+    """Combine consecutive 1m [timestamp, open, high, low, close, volume] bars into one."""
+    volume = 0.0
+    for bar in bars:
+        volume += bar[5]
+    return [bars[0][0], bars[0][1], max(bar[2] for bar in bars), min(bar[3] for bar in bars), bars[-1][4], volume]
+
+
+def resample(bars, timeframe):
+    """Resample a sorted 1m series to `timeframe`; the last bucket may be incomplete."""
+    period = timeframe_ms(timeframe)
+    result = []
+    bucket, bucket_start = [], None
+    for bar in bars:
+        start = bar[0] - bar[0] % period
+        if start != bucket_start and bucket:
+            result.append([bucket_start] + aggregate(bucket)[1:])
+            bucket = []
+        bucket_start = start
+        bucket.append(bar)
+    if bucket:
+        result.append([bucket_start] + aggregate(bucket)[1:])
+    return result
+
+
+class _TimeframeState:
+    def __init__(self, timeframe, max_bars):
+        self.timeframe = timeframe
+        self.period = timeframe_ms(timeframe)
+        self.closed = deque(maxlen=max_bars)
+        self.next_start = None  # Start of the first bucket not yet closed
+
+
+class CandleSeries:
+    """1m bars for one symbol plus the closed bars of each higher timeframe served from them."""
+
+    def __init__(self, symbol, max_bars=MAX_BARS):
+        self.symbol = symbol
+        self.max_bars = max_bars
+        self.lock = threading.Lock()
+        self.times = []
+        self.bars = []
+        self.timeframes = {}
+        self.synced_at = 0.0
+        self.loaded_from = None  # Earliest timestamp the history was loaded from
+
+    def clear(self):
+        self.times, self.bars = [], []
+        self.timeframes = {}
+        self.loaded_from = None
+
+    def merge(self, candles):
+        """Insert or replace 1m candles by timestamp."""
+        for candle in candles:
+            bar = [int(candle[0])] + [float(value) for value in candle[1:6]]
+            if not self.times or bar[0] > self.times[-1]:
+                self.times.append(bar[0])
+                self.bars.append(bar)
+                continue
+            index = bisect_left(self.times, bar[0])
+            if index < len(self.times) and self.times[index] == bar[0]:
+                self.bars[index] = bar
+            else:
+                self.times.insert(index, bar[0])
+                self.bars.insert(index, bar)
+        overflow = len(self.bars) - self.max_bars
+        if overflow > 0:
+            del self.times[:overflow]
+            del self.bars[:overflow]
+            self.loaded_from = self.times[0]
+
+    def rebuild_closed(self):
+        """Re-derive the closed bars of every timeframe after older 1m bars were added, without re-announcing them."""
+        if not self.bars:
+            return
+        first = self.times[0]
+        for timeframe, state in self.timeframes.items():
+            if state.next_start is None:
+                continue
+            begin = first if first % state.period == 0 else first - first % state.period + state.period
+            state.closed.clear()
+            state.closed.extend(resample(self.bars[bisect_left(self.times, begin):bisect_left(self.times, state.next_start)], timeframe))
+
+    def _state(self, timeframe):
+        state = self.timeframes.get(timeframe)
+        if state is None:
+            state = self.timeframes[timeframe] = _TimeframeState(timeframe, self.max_bars)
+        return state
+
+    def advance(self, timeframe):
+        """
+        Close every bucket of `timeframe` that ended before the newest 1m bar began.
+        Returns the newly closed bars and the bucket still in progress (or None).
+        """
+        state = self._state(timeframe)
+        if not self.bars:
+            return [], None
+        first = self.times[0]
+        if state.next_start is None or state.next_start < first - first % state.period:
+            # Start from the first bucket the 1m history fully covers
+            state.closed.clear()
+            state.next_start = first if first % state.period == 0 else first - first % state.period + state.period
+
+        latest = self.times[-1]
+        pending = resample(self.bars[bisect_left(self.times, state.next_start):], timeframe)
+        newly_closed = [bar for bar in pending if bar[0] + state.period <= latest]
+        forming = pending[len(newly_closed)] if len(pending) > len(newly_closed) else None
+        if newly_closed:
+            state.closed.extend(newly_closed)
+            state.next_start = newly_closed[-1][0] + state.period
+        return newly_closed, forming
+
+    def candles(self, timeframe, limit):
+        """The last `limit` bars of `timeframe`, the one in progress included."""
+        if timeframe == '1m':
+            return [list(bar) for bar in self.bars[-limit:]]
+        _, forming = self.advance(timeframe)
+        state = self.timeframes[timeframe]
+        closed = list(state.closed)[-limit:] if limit else []
+        result = closed + [forming] if forming is not None else closed
+        return [list(bar) for bar in result[-limit:]]
+
+
+class CandleStore:
+    """
+    Shared 1m series per symbol. `get()` brings the series up to date through the
+    caller's fetch function (at most once per refresh_interval) and returns any
+    supported timeframe from it; callbacks subscribed to a timeframe above 1m receive
+    (key, timeframe, bar) for every bar of that timeframe as it closes.
+    """
+
+    def __init__(self, max_bars=MAX_BARS, refresh_interval=2.0):
+        self.max_bars = max_bars
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.series = {}
+        self.subscribers = {}
+
+    def supports(self, timeframe, limit):
+        if timeframe not in TIMEFRAME_SECONDS:
+            return False
+        return (limit + 1) * timeframe_ms(timeframe) // BASE_MS <= self.max_bars
+
+    def subscribe(self, timeframe, callback):
+        with self.lock:
+            self.subscribers.setdefault(timeframe, []).append(callback)
+
+    def _series(self, key):
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = CandleSeries(key, self.max_bars)
+            return series
+
+    def _backfill(self, series, fetch_1m, start):
+        # Fetch only the bars between `start` and the oldest one held
+        end = series.loaded_from
+        since = start
+        while since < end:
+            batch = fetch_1m(since)
+            if not batch:
+                break
+            series.merge(batch)
+            last = int(batch[-1][0])
+            if last < since:
+                break
+            since = last + BASE_MS
+        if len(series.bars) < self.max_bars:
+            series.loaded_from = start
+        series.rebuild_closed()
+
+    def _sync(self, series, fetch_1m, start):
+        now = time.time()
+        if not series.times:
+            # Nothing held yet: load the history from `start`
+            series.clear()
+            series.loaded_from = start
+            since = start
+        else:
+            # A full series can't hold more history; anything older would be trimmed straight away
+            if start < series.loaded_from and len(series.bars) < self.max_bars:
+                self._backfill(series, fetch_1m, start)
+            elif now - series.synced_at < self.refresh_interval:
+                return
+            # Re-read the last bar, which may have been in progress
+            since = series.times[-1]
+
+        current_minute = int(now * 1000) // BASE_MS * BASE_MS
+        while True:
+            batch = fetch_1m(since)
+            if not batch:
+                break
+            series.merge(batch)
+            last = int(batch[-1][0])
+            if last >= current_minute or last < since:
+                break
+            since = last + BASE_MS
+        series.synced_at = now
+
+    def _publish(self, key, series):
+        with self.lock:
+            subscribers = {timeframe: list(callbacks) for timeframe, callbacks in self.subscribers.items()}
+        for timeframe, callbacks in subscribers.items():
+            if timeframe not in TIMEFRAME_SECONDS or timeframe == '1m':
+                continue
+            newly_closed, _ = series.advance(timeframe)
+            for bar in newly_closed:
+                for callback in callbacks:
+                    callback(key, timeframe, list(bar))
+
+    def get(self, key, timeframe, limit, fetch_1m):
+        """
+        The last `limit` OHLCV rows of `timeframe` for `key`, the bar in progress
+        included, as fetch_ohlcv would return them. fetch_1m(since_ms) must return
+        1m candles from since_ms onwards.
+        """
+        period = timeframe_ms(timeframe)
+        now_ms = int(time.time() * 1000)
+        start = now_ms - now_ms % period - (limit - 1) * period
+        series = self._series(key)
+        with series.lock:
+            self._sync(series, fetch_1m, start)
+            self._publish(key, series)
+            return series.candles(timeframe, limit)
@@ -1,9 +1,23 @@
-from directionalscalper.core.exchanges.blofin import BlofinExchange
-from directionalscalper.core.exchanges.lbank import LBankExchange
-from directionalscalper.core.exchanges.mexc import MexcExchange
-from directionalscalper.core.exchanges.huobi import HuobiExchange
-from directionalscalper.core.exchanges.bitget import BitgetExchange
-from directionalscalper.core.exchanges.binance import BinanceExchange
-from directionalscalper.core.exchanges.hyperliquid import HyperLiquidExchange
-from directionalscalper.core.exchanges.bybit import BybitExchange
-from directionalscalper.core.exchanges.exchange import Exchange
+import importlib
+
+# Exchange classes are imported on first access so that using one exchange
+# doesn't import every other exchange module (and its dependencies).
+_EXCHANGES = {
+    'BlofinExchange': 'blofin',
+    'LBankExchange': 'lbank',
+    'MexcExchange': 'mexc',
+    'HuobiExchange': 'huobi',
+    'BitgetExchange': 'bitget',
+    'BinanceExchange': 'binance',
+    'HyperLiquidExchange': 'hyperliquid',
+    'BybitExchange': 'bybit',
+    'Exchange': 'exchange',
+}
+
+__all__ = list(_EXCHANGES)
+
+
+def __getattr__(name):
+    if name in _EXCHANGES:
+        return getattr(importlib.import_module(f"{__name__}.{_EXCHANGES[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -10,7 +10,6 @@ import ccxt
 import traceback
 from directionalscalper.core.strategies.logger import Logger
 
-from rate_limit import RateLimit
 
 logging = Logger(logger_name="BlofinExchange", filename="BlofinExchange.log", stream=True)
 
@@ -23,7 +22,7 @@ class BlofinExchange(Exchange):
         self.last_active_long_order_time = {}
         self.last_active_short_order_time = {}
         self.last_active_time = {}
-        self.rate_limiter = RateLimit(10, 1)
+        self.rate_limiter = self.account.rate_limiter('default', 10, 1)
 
     def log_order_active_times(self):
         try:
@@ -2,15 +2,16 @@ import uuid
 from .exchange import Exchange
 import logging
 import time
-import random
 from datetime import datetime, timedelta
 from typing import Optional, Tuple, List
 from ccxt.base.errors import RateLimitExceeded, NetworkError
 import ccxt
 import traceback
 from directionalscalper.core.strategies.logger import Logger
+from directionalscalper.core.bot_metrics import get_bot_database
+from directionalscalper.core.position_book import PositionBook
+from directionalscalper.core.account_settings import AccountSettings, HEDGE, CROSS, is_not_modified
 
-from rate_limit import RateLimit
 
 logging = Logger(logger_name="BybitExchange", filename="BybitExchange.log", stream=True)
 
@@ -26,9 +27,13 @@ class BybitExchange(Exchange):
         self.last_active_long_order_time = {}
         self.last_active_short_order_time = {}
         self.last_active_time = {}
-        self.rate_limiter = RateLimit(10, 1)
-        self.general_rate_limiter = RateLimit(50, 1)
-        self.order_rate_limiter = RateLimit(5, 1) 
+        self.rate_limiter = self.account.rate_limiter('default', 10, 1)
+        self.general_rate_limiter = self.account.rate_limiter('general', 50, 1)
+        self.order_rate_limiter = self.account.rate_limiter('order', 5, 1)
+        self.account_settings = self.account.shared('settings', AccountSettings)  # Position mode, margin mode and leverage per symbol
+        self.spot_position_book = self.account.shared('spot_positions', PositionBook)  # Spot snapshots, kept apart from derivatives positions
+        if market_type != 'spot':
+            self.account_equity.start(self._fetch_swap_balance)
 
     def log_order_active_times(self):
         try:
@@ -85,21 +90,14 @@ class BybitExchange(Exchange):
     def get_market_data_bybit(self, symbol: str) -> dict:
         values = {"precision": 0.0, "leverage": 0.0, "min_qty": 0.0}
         try:
-            time.sleep(1)  # Adding a fixed delay of 1 second to avoid hitting the rate limit
-            with self.general_rate_limiter:
-                self.exchange.load_markets()
-                symbol_data = self.exchange.market(symbol)
-                
-                if "info" in symbol_data:
-                    values["precision"] = symbol_data["precision"]["price"]
-                    values["min_qty"] = symbol_data["limits"]["amount"]["min"]
-
-                # Fetch positions
-                positions = self.exchange.fetch_positions()
-
-                for position in positions:
-                    if position['symbol'] == symbol:
-                        values["leverage"] = float(position['leverage'])
+            # Markets come from the shared snapshot, so this needs no request
+            symbol_data = self.exchange.market(symbol)
+
+            if "info" in symbol_data:
+                values["precision"] = symbol_data["precision"]["price"]
+                values["min_qty"] = symbol_data["limits"]["amount"]["min"]
+
+            values["leverage"] = self.get_current_leverage_bybit(symbol) or 0.0
 
         except Exception as e:
             logging.info(f"An unknown error occurred in get_market_data_bybit(): {e}")
@@ -179,46 +177,27 @@ class BybitExchange(Exchange):
 
         return None
 
-    def get_balance_bybit(self, quote):
-        if self.exchange.has['fetchBalance']:
-            try:
-                # Fetch the balance with params to specify the account type if needed
-                balance_response = self.exchange.fetch_balance({'type': 'swap'})
-
-                # Log the raw response for debugging purposes
-                #logging.info(f"Raw balance response from Bybit: {balance_response}")
+    def _fetch_swap_balance(self):
+        return self.retry_policy.execute(
+            self.exchange.fetch_balance, ({'type': 'swap'},), endpoint='fetch_balance', rate_limiter=self.general_rate_limiter
+        )
 
-                # Parse the balance
-                if quote in balance_response['total']:
-                    total_balance = balance_response['total'][quote]
-                    return total_balance
-                else:
-                    logging.info(f"Balance for {quote} not found in the response.")
-            except Exception as e:
-                logging.info(f"Error fetching balance from Bybit: {e}")
+    def get_equity_snapshot_bybit(self, quote):
+        """The account's latest shared EquitySnapshot for quote (total, available, upnl, updated_at), or None."""
+        if not self.exchange.has['fetchBalance']:
+            return None
+        return self.account_equity.get(quote)
 
-        return None
+    def get_balance_bybit(self, quote):
+        snapshot = self.get_equity_snapshot_bybit(quote)
+        return snapshot.total if snapshot is not None else None
 
     def get_available_balance_bybit(self, quote):
-        if self.exchange.has['fetchBalance']:
-            try:
-                # Fetch the balance with params to specify the account type
-                balance_response = self.exchange.fetch_balance({'type': 'swap'})
-
-                # Log the raw response for debugging purposes
-                #logging.info(f"Raw available balance response from Bybit: {balance_response}")
-
-                # Check for the required keys in the response
-                if 'free' in balance_response and quote in balance_response['free']:
-                    # Return the available balance for the specified currency
-                    return float(balance_response['free'][quote])
-                else:
-                    logging.warning(f"Available balance for {quote} not found in the response.")
-
-            except Exception as e:
-                logging.info(f"Error fetching available balance from Bybit: {e}")
-
-        return None
+        snapshot = self.get_equity_snapshot_bybit(quote)
+        if snapshot is None or snapshot.available is None:
+            logging.warning(f"Available balance for {quote} not found.")
+            return None
+        return snapshot.available
     
 
     def get_balance_bybit_unified(self, quote):
@@ -246,12 +225,17 @@ class BybitExchange(Exchange):
                     price=price,
                     params={**params, 'positionIdx': positionIdx}  # Pass the 'positionIdx' parameter here
                 )
+                self.open_orders_book.apply_created(
+                    order, symbol, side, qty, price, params.get('reduceOnly', False), positionIdx, params.get('orderLinkId'),
+                    'PostOnly' if params.get('postOnly') else params.get('timeInForce', 'GTC')
+                )
                 return order
             else:
                 logging.info(f"side {side} does not exist")
                 return {"error": f"side {side} does not exist"}
         except Exception as e:
             logging.info(f"An unknown error occurred in create_limit_order() for {symbol}: {e}")
+            self.order_tracker.mark_rejected(params.get('orderLinkId'), str(e))
             return {"error": str(e)}
 
     def create_limit_order_bybit_spot(self, symbol: str, side: str, qty: float, price: float, isLeverage=0, orderLinkId=None):
@@ -309,6 +293,10 @@ class BybitExchange(Exchange):
                 price=price,
                 params=extra_params  # Pass extra params here
             )
+            self.open_orders_book.apply_created(
+                order, symbol, side, qty, price, extra_params.get('reduceOnly', False), positionIdx, extra_params.get('orderLinkId'),
+                extra_params['timeInForce']
+            )
 
             # Log the time of order creation for side-specific tracking
             current_time = time.time()
@@ -322,6 +310,7 @@ class BybitExchange(Exchange):
             return order
         except Exception as e:
             logging.info(f"An error occurred in create_tagged_limit_order_bybit() for {symbol}: {e}")
+            self.order_tracker.mark_rejected(orderLinkId or params.get('orderLinkId'), str(e))
             return {"error": str(e)}
 
         
@@ -377,6 +366,10 @@ class BybitExchange(Exchange):
                 params['symbol'] = market['id']
 
             response = self.exchange.cancel_all_orders(params=params)
+            if symbol is not None:
+                self.open_orders_book.apply_cancelled_symbol(symbol)
+            else:
+                self.open_orders_book.apply_cancelled_all()
             
             logging.info(f"Successfully cancelled orders {response}")
             return response
@@ -394,6 +387,7 @@ class BybitExchange(Exchange):
         try:
             # Call the cancel_order method of the ccxt instance
             response = self.exchange.cancel_order(order_id, symbol)
+            self.open_orders_book.apply_cancelled(order_id)
             logging.info(f"Order {order_id} for {symbol} cancelled successfully.")
             return response
         except Exception as e:
@@ -504,24 +498,8 @@ class BybitExchange(Exchange):
             return None
 
     def get_futures_balance_bybit(self, quote):
-        if self.exchange.has['fetchBalance']:
-            try:
-                # Fetch the balance with params to specify the account type if needed
-                balance_response = self.exchange.fetch_balance({'type': 'swap'})
-
-                # Log the raw response for debugging purposes
-                #logging.info(f"Raw balance response from Bybit: {balance_response}")
-
-                # Parse the balance
-                if quote in balance_response['total']:
-                    total_balance = balance_response['total'][quote]
-                    return total_balance
-                else:
-                    logging.info(f"Balance for {quote} not found in the response.")
-            except Exception as e:
-                logging.info(f"Error fetching balance from Bybit: {e}")
-
-        return None
+        # Same account-wide snapshot as get_balance_bybit; no request per call
+        return self.get_balance_bybit(quote)
 
     def get_symbol_precision_bybit(self, symbol):
         try:
@@ -544,7 +522,7 @@ class BybitExchange(Exchange):
             logging.info("Traceback: %s", traceback.format_exc())
             return None, None
 
-    def get_positions_bybit(self, symbol, max_retries=100, retry_delay=5) -> dict:
+    def get_positions_bybit(self, symbol, max_retries=None, retry_delay=None, deadline=None) -> dict:
         values = {
             "long": {
                 "qty": 0.0,
@@ -568,28 +546,26 @@ class BybitExchange(Exchange):
             },
         }
 
-        for i in range(max_retries):
-            try:
-                data = self.exchange.fetch_positions(symbol)
-                if len(data) == 2:
-                    sides = ["long", "short"]
-                    for side in [0, 1]:
-                        values[sides[side]]["qty"] = float(data[side]["contracts"])
-                        values[sides[side]]["price"] = float(data[side]["entryPrice"] or 0)
-                        values[sides[side]]["realised"] = round(float(data[side]["info"]["unrealisedPnl"] or 0), 4)
-                        values[sides[side]]["cum_realised"] = round(float(data[side]["info"]["cumRealisedPnl"] or 0), 4)
-                        values[sides[side]]["upnl"] = round(float(data[side]["info"]["unrealisedPnl"] or 0), 4)
-                        values[sides[side]]["upnl_pct"] = round(float(data[side]["percentage"] or 0), 4)
-                        values[sides[side]]["liq_price"] = float(data[side]["liquidationPrice"] or 0)
-                        values[sides[side]]["entry_price"] = float(data[side]["entryPrice"] or 0)
-                break  # If the fetch was successful, break out of the loop
-            except Exception as e:
-                if i < max_retries - 1:  # If not the last attempt
-                    logging.info(f"An unknown error occurred in get_positions_bybit(): {e}. Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                else:
-                    logging.info(f"Failed to fetch positions after {max_retries} attempts: {e}")
-                    raise e  # If it's still failing after max_retries, re-raise the exception.
+        try:
+            data = self.retry_policy.execute(
+                self.exchange.fetch_positions, (symbol,), deadline=deadline,
+                max_attempts=max_retries, base_delay=retry_delay
+            )
+        except Exception as e:
+            logging.info(f"Failed to fetch positions for {symbol}: {e}")
+            raise
+
+        if len(data) == 2:
+            sides = ["long", "short"]
+            for side in [0, 1]:
+                values[sides[side]]["qty"] = float(data[side]["contracts"])
+                values[sides[side]]["price"] = float(data[side]["entryPrice"] or 0)
+                values[sides[side]]["realised"] = round(float(data[side]["info"]["unrealisedPnl"] or 0), 4)
+                values[sides[side]]["cum_realised"] = round(float(data[side]["info"]["cumRealisedPnl"] or 0), 4)
+                values[sides[side]]["upnl"] = round(float(data[side]["info"]["unrealisedPnl"] or 0), 4)
+                values[sides[side]]["upnl_pct"] = round(float(data[side]["percentage"] or 0), 4)
+                values[sides[side]]["liq_price"] = float(data[side]["liquidationPrice"] or 0)
+                values[sides[side]]["entry_price"] = float(data[side]["entryPrice"] or 0)
 
         return values
 
@@ -597,6 +573,7 @@ class BybitExchange(Exchange):
         try:
             # Assuming 'self.exchange' is your initialized CCXT exchange instance
             cancel_result = self.exchange.cancel_all_orders(symbol)
+            self.open_orders_book.apply_cancelled_symbol(symbol)
             logging.info(f"All open orders for {symbol} have been cancelled.")
             #logging.info(f"Result: {cancel_result}")
             return cancel_result
@@ -606,11 +583,10 @@ class BybitExchange(Exchange):
         
     def get_current_max_leverage_bybit(self, symbol):
         try:
-            # Fetch leverage tiers for the symbol
-            leverage_tiers = self.exchange.fetch_market_leverage_tiers(symbol)
+            leverage_tiers = self.fetch_leverage_tiers(symbol)
 
-            # Process leverage tiers to find the maximum leverage
-            max_leverage = max([tier['maxLeverage'] for tier in leverage_tiers if 'maxLeverage' in tier])
+            # Highest leverage over all tiers; usually the first, smallest tier, but the order is not relied on
+            max_leverage = max([tier['maxLeverage'] for tier in leverage_tiers if tier.get('maxLeverage')])
             logging.info(f"Maximum leverage for symbol {symbol}: {max_leverage}")
 
             return max_leverage
@@ -620,20 +596,32 @@ class BybitExchange(Exchange):
             return None
 
     def set_leverage_bybit(self, leverage, symbol):
+        if self.account_settings.matches(symbol, leverage=leverage):
+            logging.info(f"Leverage for {symbol} is already {leverage}")
+            return
         try:
             self.exchange.set_leverage(leverage, symbol)
+            self.account_settings.record(symbol, leverage=leverage)
             logging.info(f"Leverage set to {leverage} for symbol {symbol}")
         except Exception as e:
-            logging.info(f"Error setting leverage: {e}")
+            if is_not_modified('leverage', e):
+                self.account_settings.record(symbol, leverage=leverage)
+                logging.info(f"Leverage for {symbol} was already {leverage}")
+            else:
+                logging.info(f"Error setting leverage: {e}")
 
     def set_symbol_to_cross_margin(self, symbol, leverage):
         """
         Set a specific symbol's margin mode to cross with specified leverage.
         """
+        if self.account_settings.matches(symbol, margin_mode=CROSS, leverage=leverage):
+            logging.info(f"Symbol {symbol} is already cross margin with leverage {leverage}. No request sent.")
+            return {"status": "unchanged", "response": None}
         try:
             response = self.exchange.set_margin_mode('cross', symbol=symbol, params={'leverage': leverage})
             
             retCode = response.get('retCode') if isinstance(response, dict) else None
+            self.account_settings.record(symbol, margin_mode=CROSS, leverage=leverage)
 
             if retCode == 110026:  # Margin mode is already set to cross
                 logging.info(f"Symbol {symbol} is already set to cross margin mode. No changes made.")
@@ -643,17 +631,27 @@ class BybitExchange(Exchange):
                 return {"status": "changed", "response": response}
 
         except Exception as e:
+            if is_not_modified('margin_mode', e):
+                self.account_settings.record(symbol, margin_mode=CROSS)
+                logging.info(f"Symbol {symbol} is already set to cross margin mode. No changes made.")
+                return {"status": "unchanged", "response": None}
             logging.info(f"Failed to set margin mode or margin mode already set to cross for symbol {symbol} with leverage {leverage}: {e}")
             return {"status": "error", "message": str(e)}
 
     def setup_exchange_bybit(self, symbol) -> None:
         values = {"position": False, "leverage": False}
+        if self.account_settings.matches(symbol, position_mode=HEDGE):
+            return
         try:
             # Set the position mode to hedge
             self.exchange.set_position_mode(hedged=True, symbol=symbol)
+            self.account_settings.record(symbol, position_mode=HEDGE)
             values["position"] = True
         except Exception as e:
-            logging.info(f"An unknown error occurred in with set_position_mode: {e}")
+            if is_not_modified('position_mode', e):
+                self.account_settings.record(symbol, position_mode=HEDGE)
+            else:
+                logging.info(f"An unknown error occurred in with set_position_mode: {e}")
 
     def get_all_open_positions_bybit_spot(self, retries=10, delay_factor=10, max_delay=60) -> List[dict]:
         now = datetime.now()
@@ -679,6 +677,8 @@ class BybitExchange(Exchange):
                     # Update the shared cache with the new data
                     self.open_positions_shared_cache = open_positions
                     self.last_open_positions_time_shared = now
+                    self.spot_position_book.update_from_snapshot(open_positions)
+                    self.account_settings.update_from_positions(open_positions)
                     return open_positions
                 except Exception as e:
                     is_rate_limit_error = "Too many visits" in str(e) or (hasattr(e, 'response') and e.response.status_code == 403)
@@ -714,6 +714,8 @@ class BybitExchange(Exchange):
                     # Update the shared cache with the new data
                     self.open_positions_shared_cache = open_positions
                     self.last_open_positions_time_shared = now
+                    self.position_book.update_from_snapshot(open_positions)
+                    self.account_settings.update_from_positions(open_positions)
 
                     return open_positions
                 except Exception as e:
@@ -752,6 +754,8 @@ class BybitExchange(Exchange):
                     # Update the shared cache with the new data
                     self.open_positions_shared_cache = open_positions
                     self.last_open_positions_time_shared = now
+                    self.spot_position_book.update_from_snapshot(open_positions)
+                    self.account_settings.update_from_positions(open_positions)
                     return open_positions
                 except Exception as e:
                     is_rate_limit_error = "Too many visits" in str(e) or (hasattr(e, 'response') and e.response.status_code == 403)
@@ -764,21 +768,72 @@ class BybitExchange(Exchange):
                         logging.info(f"Error fetching open positions: {e}")
                         return []
                     
+    def _leverage_tier_fetcher(self, symbol):
+        params = {'category': 'linear'}
+        return lambda: self.retry_policy.execute(
+            self.exchange.fetch_derivatives_market_leverage_tiers, (symbol, params),
+            endpoint='fetch_leverage_tiers', rate_limiter=self.general_rate_limiter
+        )
+
     def fetch_leverage_tiers(self, symbol: str) -> dict:
         """
-        Fetch leverage tiers for a given symbol using CCXT's fetch_market_leverage_tiers method.
+        Leverage tiers for a given symbol, fetched once and then served from the shared
+        tier store until they expire.
 
         :param symbol: The trading symbol to fetch leverage tiers for.
-        :return: A dictionary containing leverage tiers information if successful, None otherwise.
+        :return: A list of ccxt leverage tier structures if successful, None otherwise.
         """
         try:
-            params = {'category': 'linear'}  # Adjust parameters based on the specific needs and API documentation
-            leverage_tiers = self.exchange.fetch_derivatives_market_leverage_tiers(symbol, params)
-            return leverage_tiers
+            return Exchange.leverage_tiers.tiers(self.exchange_id, symbol, self._leverage_tier_fetcher(symbol))
         except Exception as e:
             logging.info(f"Error fetching leverage tiers for {symbol}: {e}")
             return None
 
+    def get_leverage_at_notional_bybit(self, symbol, notional):
+        """Max leverage allowed for a position of `notional` quote currency, or None."""
+        try:
+            return Exchange.leverage_tiers.max_leverage(
+                self.exchange_id, symbol, self._leverage_tier_fetcher(symbol), notional
+            )
+        except Exception as e:
+            logging.info(f"Error looking up leverage tier for {symbol}: {e}")
+            return None
+
+    def get_maintenance_margin_bybit(self, symbol, notional):
+        """(maintenance margin rate, maintenance margin) for a position of `notional`, or (None, None)."""
+        try:
+            return Exchange.leverage_tiers.maintenance_margin(
+                self.exchange_id, symbol, notional, self._leverage_tier_fetcher(symbol)
+            )
+        except Exception as e:
+            logging.info(f"Error looking up maintenance margin for {symbol}: {e}")
+            return None, None
+
+    def get_current_leverage_bybit(self, symbol):
+        """
+        Leverage currently set on symbol: from the shared position book when a position is
+        open, then from the last value set or seen, and only then from a fetch of this one
+        symbol's positions.
+        """
+        details = self.position_book.get_details(symbol)
+        for side in ('long', 'short'):
+            leverage = details[side].get('leverage')
+            if leverage:
+                self.account_settings.record(symbol, leverage=leverage)
+                return leverage
+        leverage = self.account_settings.get(symbol, 'leverage')
+        if leverage:
+            return leverage
+        try:
+            positions = self.retry_policy.execute(
+                self.exchange.fetch_positions, ([symbol],), rate_limiter=self.general_rate_limiter
+            )
+        except Exception as e:
+            logging.info(f"Error fetching leverage for {symbol}: {e}")
+            return None
+        self.account_settings.update_from_positions(positions)
+        return self.account_settings.get(symbol, 'leverage')
+
     def get_open_take_profit_orders(self, symbol, side):
         """
         Fetches open take profit orders for the given symbol and side.
@@ -825,43 +880,50 @@ class BybitExchange(Exchange):
     #     logging.info(f"Failed to fetch open orders for {symbol} after {self.max_retries} retries.")
     #     return []
 
-    def get_all_open_orders(self):
+    def _fetch_all_open_orders(self):
+        # Every open order on the account in one paginated request, one attempt; raises on failure
+        return self.retry_policy.execute(
+            self.exchange.fetch_open_orders, kwargs={'params': {'paginate': True}},
+            endpoint='fetch_open_orders', max_attempts=1, rate_limiter=self.rate_limiter
+        )
+
+    def get_all_open_orders(self, deadline=None):
         """Fetches open orders for all symbols."""
-        for _ in range(self.max_retries):
-            try:
-                with self.rate_limiter:
-                    open_orders = self.exchange.fetch_open_orders()
-                return open_orders
-            except RateLimitExceeded:
-                logging.info(f"Rate limit exceeded when fetching open orders. Retrying in {self.retry_wait} seconds...")
-                time.sleep(self.retry_wait)
-            except Exception as e:
-                logging.error(f"Error fetching open orders: {e}")
-                logging.error(traceback.format_exc())
-        logging.info(f"Failed to fetch open orders after {self.max_retries} retries.")
-        return []
-
-    def get_open_orders(self, symbol, max_retries=100, retry_wait=1):
-        """Fetches open orders for the given symbol with exponential backoff."""
-        backoff = retry_wait
-        for attempt in range(max_retries):
-            try:
-                with self.rate_limiter:
-                    open_orders = self.exchange.fetch_open_orders(symbol)
-                return open_orders
-            except RateLimitExceeded:
-                logging.info(f"Rate limit exceeded when fetching open orders for {symbol}. Retrying in {retry_wait} seconds...")
-                time.sleep(retry_wait)
-            except NetworkError as e:
-                logging.error(f"Network error fetching open orders for {symbol}: {e}. Retrying in {backoff} seconds...")
-                time.sleep(backoff)
-                backoff *= 2  # Exponential backoff
-            except Exception as e:
-                logging.error(f"Error fetching open orders for {symbol}: {e}")
-                logging.error(traceback.format_exc())
-                break
-        logging.info(f"Failed to fetch open orders for {symbol} after {max_retries} retries.")
-        return []
+        try:
+            requested_at = time.time()
+            open_orders = self.retry_policy.execute(
+                self.exchange.fetch_open_orders, kwargs={'params': {'paginate': True}},
+                endpoint='fetch_open_orders', deadline=deadline, rate_limiter=self.rate_limiter
+            )
+            self.open_orders_book.update_from_snapshot(open_orders, requested_at)
+            return open_orders
+        except Exception as e:
+            logging.error(f"Error fetching open orders: {e}")
+            return []
+
+    def get_open_orders(self, symbol, max_retries=None, retry_wait=None, deadline=None):
+        """
+        Open orders for the given symbol from the account-wide book, which fetches every
+        open order at most once per max_age. Falls back to a per-symbol fetch under the
+        retry policy if the account-wide fetch fails. The fallback has its own circuit
+        breaker, so an open breaker on the account-wide fetch doesn't block it.
+
+        Raises if both fail: an empty list would read as "no open orders" and let the
+        caller place duplicates.
+        """
+        try:
+            return self.open_orders_book.get(symbol, fetch_all=self._fetch_all_open_orders)
+        except Exception as e:
+            logging.info(f"Account-wide open orders fetch failed: {e}, fetching {symbol} directly")
+
+        try:
+            return self.retry_policy.execute(
+                self.exchange.fetch_open_orders, (symbol,), endpoint='fetch_open_orders_symbol', deadline=deadline,
+                max_attempts=max_retries, base_delay=retry_wait, rate_limiter=self.rate_limiter
+            )
+        except Exception as e:
+            logging.error(f"Failed to fetch open orders for {symbol}: {e}")
+            raise
 
     # def get_open_orders(self, symbol):
     #     """Fetches open orders for the given symbol."""
@@ -911,7 +973,8 @@ class BybitExchange(Exchange):
             order_details = {
                 'id': order['id'],
                 'qty': float(order['info']['qty']),
-                'price': float(order['price'])  # Extracting the price
+                'price': float(order['price']),  # Extracting the price
+                'post_only': order['info'].get('timeInForce') == 'PostOnly',
             }
             
             if order['info'].get('reduceOnly', False):
@@ -965,6 +1028,7 @@ class BybitExchange(Exchange):
                             ):
                                 # use the new cancel_derivatives_order function
                                 self.exchange.cancel_derivatives_order(order_id, symbol)
+                                self.open_orders_book.apply_cancelled(order_id)
                                 logging.info(f"Cancelling order: {order_id}")
                 # If the code reaches this point without an exception, break out of the loop
                 break
@@ -1063,10 +1127,33 @@ class BybitExchange(Exchange):
         try:
             # Call the updated cancel_order method
             result = self.exchange.cancel_order(id=order_id, symbol=symbol)
+            self.open_orders_book.apply_cancelled(order_id)
             logging.info(f"Canceled order - ID: {order_id}, Response: {result}")
         except Exception as e:
             logging.info(f"Error occurred in cancel_order_by_id: {e}")
-           
+
+    def amend_order_bybit(self, order_id, symbol, side, qty=None, price=None):
+        """
+        Change an open limit order's qty and/or price in place (Bybit /v5/order/amend).
+        The order keeps its id and queue slot for an unchanged price. Returns the
+        response, or None if the exchange refused (e.g. the order already filled).
+        """
+        try:
+            order = self.exchange.edit_order(order_id, symbol, 'limit', side, qty, price)
+            self.open_orders_book.apply_amended(order_id, price=price, amount=qty)
+            logging.info(f"Amended order {order_id} for {symbol}: qty={qty}, price={price}")
+            return order
+        except Exception as e:
+            logging.info(f"Error occurred in amend_order_bybit for {symbol} order {order_id}: {e}")
+            return None
+
+    def quantize_order_bybit(self, symbol, price, qty):
+        """(price, qty) at the market's tick size and qty step, as the exchange would store them."""
+        return (
+            float(self.exchange.price_to_precision(symbol, price)),
+            float(self.exchange.amount_to_precision(symbol, qty)),
+        )
+
     def cancel_take_profit_orders_bybit(self, symbol, side):
         side = side.lower()
         side_map = {"long": "buy", "short": "sell"}
@@ -1084,6 +1171,7 @@ class BybitExchange(Exchange):
                 ):
                     order_id = order['id']  # Assuming 'id' is the standard format expected by cancel_order
                     self.exchange.cancel_order(order_id, symbol)
+                    self.open_orders_book.apply_cancelled(order_id)
                     logging.info(f"Canceled take profit order - ID: {order_id}")
 
         except Exception as e:
@@ -1111,48 +1199,21 @@ class BybitExchange(Exchange):
 
         return total_qty
 
-    def retry_api_call(self, function, *args, max_retries=100, base_delay=10, max_delay=60, **kwargs):
-        retries = 0
-        while retries < max_retries:
-            try:
-                return function(*args, **kwargs)
-            except Exception as e:  # Catch all exceptions
-                retries += 1
-                delay = min(base_delay * (2 ** retries) + random.uniform(0, 0.1 * (2 ** retries)), max_delay)
-                logging.info(f"Error occurred: {e}. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-        raise Exception(f"Failed to execute the API function after {max_retries} retries.")
+    def retry_api_call(self, function, *args, max_retries=None, base_delay=None, max_delay=None, deadline=None, **kwargs):
+        return self.retry_policy.execute(
+            function, args, kwargs, deadline=deadline, max_attempts=max_retries,
+            base_delay=base_delay, max_delay=max_delay
+        )
 
     def get_contract_size_bybit(self, symbol):
         positions = self.exchange.fetch_derivatives_positions([symbol])
         return positions[0]['contractSize']
 
-    def get_max_leverage_bybit(self, symbol, max_retries=10, backoff_factor=0.5):
-        #logging.info(f"Called get_max_leverage_bybit with symbol: {symbol}")
-        for retry in range(max_retries):
-            try:
-                tiers = self.exchange.fetch_derivatives_market_leverage_tiers(symbol)
-                for tier in tiers:
-                    info = tier.get('info', {})
-                    if info.get('symbol') == symbol:
-                        return float(info.get('maxLeverage'))
-                return None  # If symbol not found in tiers
-
-            except (RateLimitExceeded, NetworkError) as e:  # Include NetworkError
-                # Log the exception
-                logging.info(f"An error occurred while fetching max leverage: {str(e)}")
-
-                # Wait and retry if not the last attempt
-                if retry < max_retries - 1:  
-                    sleep_time = backoff_factor * (2 ** retry)  # Exponential backoff
-                    time.sleep(sleep_time)
-
-            except Exception as e:
-                # For any other types of exceptions, log and re-raise.
-                logging.info(f"An unknown error occurred: {str(e)}")
-                raise e
-
-        raise Exception(f"Failed to get max leverage for {symbol} after {max_retries} retries.")
+    def get_max_leverage_bybit(self, symbol, notional=0.0):
+        # Raises if the tiers can't be loaded, like the retry loop this replaced
+        return Exchange.leverage_tiers.max_leverage(
+            self.exchange_id, symbol, self._leverage_tier_fetcher(symbol), notional
+        )
 
     def print_trade_quantities_bybit(self, max_trade_qty, leverage_sizes, wallet_exposure, best_ask_price):
         sorted_leverage_sizes = sorted(leverage_sizes)  # Sort leverage sizes in ascending order
@@ -1212,6 +1273,68 @@ class BybitExchange(Exchange):
             logging.info(f"Error fetching recent trades for {symbol}: {e}")
             return []
 
+    def _fetch_v5_pages(self, endpoint, start_time, end_time=None, params=None):
+        """
+        Yield (records, window_end) for each window of a Bybit v5 history endpoint between
+        start_time and end_time (ms). Bybit caps each query at a 7 day window and pages
+        inside it newest first, so a window is only yielded once every page of it
+        (followed through nextPageCursor) has been fetched: everything up to window_end is
+        then in hand, and a caller can move its cursor there without skipping older pages.
+        """
+        end_time = end_time or int(time.time() * 1000)
+        window = 7 * 24 * 60 * 60 * 1000 - 1
+        window_start = int(start_time)
+
+        while window_start <= end_time:
+            window_end = min(window_start + window, end_time)
+            cursor = None
+            records = []
+            while True:
+                request = {**(params or {}), 'startTime': window_start, 'endTime': window_end}
+                if cursor:
+                    request['cursor'] = cursor
+                with self.rate_limiter:
+                    response = endpoint(request)
+                result = response.get('result', {}) if isinstance(response, dict) else {}
+                page = result.get('list', [])
+                records.extend(page)
+                cursor = result.get('nextPageCursor')
+                if not cursor or not page:
+                    break
+            yield records, window_end
+            window_start = window_end + 1
+
+    def fetch_executions_bybit(self, start_time, end_time=None, category='linear', limit=100):
+        """
+        Fetch account executions (fills and funding settlements) page by page.
+
+        :param int start_time: Timestamp in ms of the earliest execution to fetch.
+        :param int end_time: Timestamp in ms of the latest execution to fetch, defaults to now.
+        :return: Generator of (raw v5 execution records, window end in ms), one per complete 7 day window.
+        """
+        return self._fetch_v5_pages(self.exchange.privateGetV5ExecutionList, start_time, end_time, {'category': category, 'limit': limit})
+
+    def fetch_closed_pnl_bybit(self, start_time, end_time=None, category='linear', limit=100):
+        """
+        Fetch closed PnL records page by page.
+
+        :param int start_time: Timestamp in ms of the earliest record to fetch.
+        :param int end_time: Timestamp in ms of the latest record to fetch, defaults to now.
+        :return: Generator of (raw v5 closed PnL records, window end in ms), one per complete 7 day window.
+        """
+        return self._fetch_v5_pages(self.exchange.privateGetV5PositionClosedPnl, start_time, end_time, {'category': category, 'limit': limit})
+
+    def fetch_closed_trades_history(self, days):
+        """
+        Daily realized PnL for the last `days` days, served from the local ledger after an
+        incremental sync.
+
+        :return: List of {'date': 'YYYY-MM-DD', 'profit_loss': float}.
+        """
+        ledger = get_bot_database(exchange=self)
+        ledger.sync_ledger(self)
+        return [{'date': day, 'profit_loss': pnl} for day, pnl in ledger.get_daily_pnl(days)]
+
     def fetch_unrealized_pnl(self, symbol):
         """
         Fetches the unrealized profit and loss (PNL) for both long and short positions of a given symbol.
@@ -1260,6 +1383,9 @@ class BybitExchange(Exchange):
         return unrealized_pnl
 
     def process_position_data(self, open_position_data):
+        if open_position_data is self.position_book.positions:
+            return self.position_book.position_details
+
         position_details = {}
 
         for position in open_position_data:
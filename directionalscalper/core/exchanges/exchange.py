@@ -2,13 +2,8 @@ import os
 import logging
 import time
 import random
-import ta as ta
-from ta.momentum import RSIIndicator
-from ta.volatility import AverageTrueRange
-from ta.trend import CCIIndicator, ADXIndicator, EMAIndicator, SMAIndicator
 import uuid
 import ccxt
-import pandas as pd
 import numpy as np
 import json
 import requests, hmac, hashlib
@@ -16,8 +11,6 @@ import urllib.parse
 import threading
 import traceback
 from typing import Optional, Tuple, List
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.cluster import DBSCAN
 from ccxt.base.errors import RateLimitExceeded
 from ..strategies.logger import Logger
 from requests.exceptions import HTTPError
@@ -26,7 +19,25 @@ from ccxt.base.errors import NetworkError
 
 logging = Logger(logger_name="Exchange", filename="Exchange.log", stream=True)
 
-from rate_limit import RateLimit
+from directionalscalper.core.position_book import PositionBook
+from directionalscalper.core.indicators import MfiRsiEmaSignal, klmf
+from directionalscalper.core.levels import ZigZag, support_resistance_levels
+from directionalscalper.core.indicator_cache import indicator_cache
+from directionalscalper.core.candles import CandleStore, FETCH_LIMIT
+from directionalscalper.core.market_snapshot import MarketSnapshotStore
+from directionalscalper.core.account_clients import AccountClientRegistry
+from directionalscalper.core.open_orders import OpenOrdersBook
+from directionalscalper.core.order_tracker import OrderTracker
+from directionalscalper.core.retry_policy import RetryPolicy
+from directionalscalper.core.leverage_tiers import LeverageTierStore
+from directionalscalper.core.risk_engine import RiskEngine
+from directionalscalper.core.account_equity import AccountEquity
+from directionalscalper.core.registry import lazy_import
+
+# Imported on first use
+pd = lazy_import('pandas')
+ta = lazy_import('ta')
+sklearn_preprocessing = lazy_import('sklearn.preprocessing')
 
 class Exchange:
     # Shared class-level cache variables
@@ -37,6 +48,10 @@ class Exchange:
     open_positions_shared_cache = None
     last_open_positions_time_shared = None
     open_positions_semaphore = threading.Semaphore()
+    candle_store = CandleStore()  # 1m series per symbol; other timeframes are built from it
+    market_snapshots = MarketSnapshotStore()  # Market metadata per exchange, persisted under data/markets
+    account_clients = AccountClientRegistry()  # ccxt client and rate limiters per API key
+    leverage_tiers = LeverageTierStore()  # Leverage tiers per symbol, refreshed every few hours
 
     def __init__(self, exchange_id, api_key, secret_key, passphrase=None, market_type='swap'):
         self.order_timestamps = None
@@ -54,7 +69,24 @@ class Exchange:
 
         self.entry_order_ids = {}  # Initialize order history
         self.entry_order_ids_lock = threading.Lock()  # For thread safety
-        self.rate_limiter = RateLimit(10, 1)
+        self.rate_limiter = self.account.rate_limiter('default', 10, 1)
+        self.position_book = self.account.shared('positions', PositionBook)  # Built once per positions snapshot, read by every strategy thread
+        self.open_orders_book = self.account.shared('open_orders', OpenOrdersBook)  # Every open order on the account, by symbol
+        self.order_tracker = self.account.shared('order_tracker', lambda: OrderTracker(self.open_orders_book))  # Lifecycle of our own orders by orderLinkId
+        self.retry_policy = self.account.shared('retry_policy', RetryPolicy)  # Deadlines and circuit breakers per endpoint
+        self.risk_engine = self.account.shared('risk_engine', lambda: RiskEngine(self.position_book))  # Exposure and reduce triggers for every position
+        self.account_equity = self.account.shared('equity', self._new_account_equity)  # Balance snapshot read by every thread
+
+        self.indicator_streams = {}  # (symbol, ema_period, secondary_ema_period) -> MfiRsiEmaSignal
+        self.indicator_streams_lock = threading.Lock()
+        self.last_signal = {}  # symbol -> last signal returned by generate_l_signals
+        self.last_signal_lock = threading.Lock()
+
+    def _new_account_equity(self):
+        account_equity = AccountEquity()
+        # The risk engine evaluates against the latest equity of the quote being traded
+        account_equity.subscribe(lambda snapshot: self.risk_engine.update_equity(snapshot.total))
+        return account_equity
         
     def initialise(self):
         exchange_class = getattr(ccxt, self.exchange_id)
@@ -108,101 +140,69 @@ class Exchange:
                 'adjustForTimeDifference': True,
             }
             
-        # Initializing the exchange object
-        self.exchange = exchange_class(exchange_params)
-        # Checks if load_markets() have already been ran once.
-        if not self.exchange.markets == None: return
-        print(f"Loading exchange {self.exchange} for API data")
-        self.exchange.load_markets()
-        print(f'Loaded exchange {self.exchange} for API data')
+        # One ccxt client per API key, shared by every component trading the account
+        key = (self.exchange_id, exchange_params['options'].get('defaultType'), self.api_key)
+        self.account = Exchange.account_clients.get(key, lambda: self._create_client(exchange_class, exchange_params))
+        self.exchange = self.account.client
+
+    def _create_client(self, exchange_class, exchange_params):
+        client = exchange_class(exchange_params)
+        # Markets come from the shared snapshot; only a missing or expired one is downloaded
+        Exchange.market_snapshots.attach(client)
+        return client
 
     def get_mfirsi_ema_secondary_ema(self, symbol: str, limit: int = 100, lookback: int = 1, ema_period: int = 5, secondary_ema_period: int = 3) -> str:
+        return indicator_cache.get(
+            symbol, '1m', 'mfirsi_ema_secondary_ema', (self.exchange_id, limit, lookback, ema_period, secondary_ema_period),
+            lambda: self._mfirsi_ema_secondary_ema(symbol, limit, lookback, ema_period, secondary_ema_period)
+        )
+
+    def _mfirsi_ema_secondary_ema(self, symbol, limit, lookback, ema_period, secondary_ema_period):
         # Fetch OHLCV data
-        ohlcv_data = self.exchange.fetch_ohlcv(symbol=symbol, timeframe='1m', limit=limit)
-        df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
+        ohlcv_data = self.fetch_candles(symbol, '1m', limit)
 
-        # Calculate MFI and RSI
-        df['mfi'] = ta.volume.MFIIndicator(high=df['high'], low=df['low'], close=df['close'], volume=df['volume'], window=14, fillna=False).money_flow_index()
-        df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
+        # MFI/RSI and their EMAs are kept per symbol and only advanced by the candles
+        # that closed since the last call; the candle in progress is evaluated on top
+        key = (symbol, ema_period, secondary_ema_period)
+        with self.indicator_streams_lock:
+            stream = self.indicator_streams.get(key)
+            if stream is None:
+                stream = self.indicator_streams[key] = MfiRsiEmaSignal(ema_period, secondary_ema_period)
 
-        # Calculate EMAs for MFI and RSI
-        df['mfi_ema'] = df['mfi'].ewm(span=ema_period, adjust=False).mean()
-        df['rsi_ema'] = df['rsi'].ewm(span=ema_period, adjust=False).mean()
-
-        # Calculate secondary EMAs for MFI and RSI
-        df['mfi_ema_secondary'] = df['mfi'].ewm(span=secondary_ema_period, adjust=False).mean()
-        df['rsi_ema_secondary'] = df['rsi'].ewm(span=secondary_ema_period, adjust=False).mean()
-
-        # Determine conditions using EMAs and secondary EMAs
-        df['buy_condition'] = (
-            (df['mfi_ema'] < 30) &
-            (df['rsi_ema'] < 40) &
-            (df['mfi_ema_secondary'] < df['mfi_ema']) &
-            (df['rsi_ema_secondary'] < df['rsi_ema']) &
-            (df['open'] < df['close'])
-        ).astype(int)
-        df['sell_condition'] = (
-            (df['mfi_ema'] > 70) &
-            (df['rsi_ema'] > 60) &
-            (df['mfi_ema_secondary'] > df['mfi_ema']) &
-            (df['rsi_ema_secondary'] > df['rsi_ema']) &
-            (df['open'] > df['close'])
-        ).astype(int)
+        with stream.lock:
+            conditions = stream.sync(ohlcv_data)
 
         # Evaluate conditions over the lookback period
-        recent_conditions = df.iloc[-lookback:]
-        if recent_conditions['buy_condition'].sum() > 0:
+        recent_conditions = conditions[-lookback:]
+        if any(buy_condition for buy_condition, _ in recent_conditions):
             return 'long'
-        elif recent_conditions['sell_condition'].sum() > 0:
+        elif any(sell_condition for _, sell_condition in recent_conditions):
             return 'short'
         else:
             return 'neutral'
 
+    def fetch_candles(self, symbol, timeframe='1m', limit=100):
+        """
+        OHLCV rows (ccxt format, candle in progress last) built from the shared 1m
+        series, so every timeframe of a symbol costs one small incremental 1m request.
+        Timeframes the store can't build fall back to a direct fetch.
+        """
+        if not self.candle_store.supports(timeframe, limit):
+            return self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+
+        def fetch_1m(since):
+            with self.rate_limiter:
+                return self.exchange.fetch_ohlcv(symbol, '1m', since=since, limit=FETCH_LIMIT)
+
+        return self.candle_store.get((self.exchange_id, symbol), timeframe, limit, fetch_1m)
+
     # Fetch OHLCV data for calculating ZigZag
     def fetch_ohlcv_data(self, symbol, timeframe='5m', limit=5000):
         return self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
 
     # Calculate ZigZag indicator
     def calculate_zigzag(self, ohlcv, length=4):
-        highs = [candle[2] for candle in ohlcv]
-        lows = [candle[3] for candle in ohlcv]
-
-        def highest_high(index):
-            return max(highs[max(0, index-length):index+length+1])
-
-        def lowest_low(index):
-            return min(lows[max(0, index-length):index+length+1])
-
-        direction_up = False
-        last_low = max(highs) * 100
-        last_high = 0.0
-        peaks_and_troughs = []
-
-        for i in range(length, len(ohlcv) - length):
-            h = highest_high(i)
-            l = lowest_low(i)
-
-            is_min = l == lows[i]
-            is_max = h == highs[i]
-
-            if direction_up:
-                if is_min and lows[i] < last_low:
-                    last_low = lows[i]
-                    peaks_and_troughs.append(last_low)
-                if is_max and highs[i] > last_low:
-                    last_high = highs[i]
-                    direction_up = False
-                    peaks_and_troughs.append(last_high)
-            else:
-                if is_max and highs[i] > last_high:
-                    last_high = highs[i]
-                    peaks_and_troughs.append(last_high)
-                if is_min and lows[i] < last_high:
-                    last_low = lows[i]
-                    direction_up = True
-                    peaks_and_troughs.append(last_low)
-
-        return peaks_and_troughs
+        return ZigZag(length).pivots_for(ohlcv)
 
     # Normalize prices for clustering
     def normalize_prices(self, prices):
@@ -217,50 +217,13 @@ class Exchange:
 
     # Function to identify significant support and resistance levels
     def get_significant_levels_dbscan(self, zigzag, ohlcv_data):
-        normalized_zigzag = self.normalize_prices(zigzag)
-        average_deviation = self.mean_deviation(normalized_zigzag)
-        epsilon = average_deviation * 0.04
-        minimum_points = 2
-
-        data_points = np.array(normalized_zigzag).reshape(-1, 1)
-        db = DBSCAN(eps=epsilon, min_samples=minimum_points).fit(data_points)
-        labels = db.labels_
-
-        clusters = {}
-        for idx, label in enumerate(labels):
-            if label not in clusters:
-                clusters[label] = []
-            clusters[label].append(idx)
-
-        def median(numbers):
-            sorted_numbers = sorted(numbers)
-            middle = len(sorted_numbers) // 2
-            if len(sorted_numbers) % 2 == 0:
-                return (sorted_numbers[middle - 1] + sorted_numbers[middle]) / 2
-            else:
-                return sorted_numbers[middle]
-
-        support_resistance_levels = []
-        for cluster in clusters.values():
-            if cluster:
-                cluster_prices = [zigzag[idx] for idx in cluster]
-                cluster_volumes = [ohlcv_data[idx][5] for idx in cluster]
-                level = median(cluster_prices)
-                strength = len(cluster_prices)
-                average_volume = sum(cluster_volumes) / len(cluster_volumes)
-                support_resistance_levels.append({
-                    'level': level,
-                    'strength': strength,
-                    'average_volume': average_volume,
-                })
-
-        support_resistance_levels.sort(key=lambda x: x['level'], reverse=True)
-        return support_resistance_levels
+        # Sort-based 1-D clustering, same groups as DBSCAN(eps, min_samples=2) without fitting a model
+        return support_resistance_levels(zigzag, ohlcv_data)
 
     def normalize(self, series):
         if not isinstance(series, pd.Series):
             series = pd.Series(series)
-        scaler = MinMaxScaler()
+        scaler = sklearn_preprocessing.MinMaxScaler()
         series_values = series.values.reshape(-1, 1)
         normalized_values = scaler.fit_transform(series_values).flatten()
         return pd.Series(normalized_values, index=series.index)
@@ -273,59 +236,46 @@ class Exchange:
         return pd.Series(rescaled_values, index=series.index)
 
     def n_rsi(self, series, n1, n2):
-        rsi = RSIIndicator(series, window=n1).rsi()
+        rsi = ta.momentum.RSIIndicator(series, window=n1).rsi()
         return self.rescale(rsi.ewm(span=n2, adjust=False).mean())
 
     def n_cci(self, high, low, close, n1, n2):
-        cci = CCIIndicator(high, low, close, window=n1).cci()
+        cci = ta.trend.CCIIndicator(high, low, close, window=n1).cci()
         return self.normalize(cci.ewm(span=n2, adjust=False).mean())
 
     def n_wt(self, hlc3, n1=10, n2=11):
-        ema1 = EMAIndicator(hlc3, window=n1).ema_indicator()
-        ema2 = EMAIndicator(abs(hlc3 - ema1), window=n1).ema_indicator()
+        ema1 = ta.trend.EMAIndicator(hlc3, window=n1).ema_indicator()
+        ema2 = ta.trend.EMAIndicator(abs(hlc3 - ema1), window=n1).ema_indicator()
         ci = (hlc3 - ema1) / (0.015 * ema2)
-        wt1 = EMAIndicator(ci, window=n2).ema_indicator()
-        wt2 = SMAIndicator(wt1, window=4).sma_indicator()
+        wt1 = ta.trend.EMAIndicator(ci, window=n2).ema_indicator()
+        wt2 = ta.trend.SMAIndicator(wt1, window=4).sma_indicator()
         return self.normalize(wt1 - wt2)
 
     def n_adx(self, high, low, close, n1):
-        adx = ADXIndicator(high, low, close, window=n1).adx()
+        adx = ta.trend.ADXIndicator(high, low, close, window=n1).adx()
         return self.rescale(adx)
 
     def regime_filter(self, series, high, low, use_regime_filter, threshold):
         if not use_regime_filter:
             return pd.Series([True] * len(series))
 
-        def klmf(series, high, low):
-            value1 = pd.Series(0, index=series.index)
-            value2 = pd.Series(0, index=series.index)
-            klmf = pd.Series(0, index=series.index)
-            for i in range(1, len(series)):
-                value1[i] = 0.2 * (series[i] - series[i - 1]) + 0.8 * value1[i - 1]
-                value2[i] = 0.1 * (high[i] - low[i]) + 0.8 * value2[i - 1]
-            omega = abs(value1 / value2)
-            alpha = (-omega ** 2 + np.sqrt(omega ** 4 + 16 * omega ** 2)) / 8
-            for i in range(1, len(series)):
-                klmf[i] = alpha[i] * series[i] + (1 - alpha[i]) * klmf[i - 1]
-            return klmf
-
-        klmf_values = klmf(series, high, low)
+        klmf_values = pd.Series(klmf(series.to_numpy(dtype=float), high.to_numpy(dtype=float), low.to_numpy(dtype=float)), index=series.index)
         abs_curve_slope = abs(klmf_values.diff())
-        exponential_average_abs_curve_slope = EMAIndicator(abs_curve_slope, window=200).ema_indicator()
+        exponential_average_abs_curve_slope = ta.trend.EMAIndicator(abs_curve_slope, window=200).ema_indicator()
         normalized_slope_decline = (abs_curve_slope - exponential_average_abs_curve_slope) / exponential_average_abs_curve_slope
         return normalized_slope_decline >= threshold
 
     def filter_adx(self, close, high, low, adx_threshold, use_adx_filter=False, length=14):
         if not use_adx_filter:
             return pd.Series([True] * len(close))
-        adx = ADXIndicator(high, low, close, window=length).adx()
+        adx = ta.trend.ADXIndicator(high, low, close, window=length).adx()
         return adx > adx_threshold
 
     def filter_volatility(self, high, low, close, use_volatility_filter, min_length=1, max_length=10):
         if not use_volatility_filter:
             return pd.Series([True] * len(close))
-        recent_atr = AverageTrueRange(high, low, close, window=min_length).average_true_range()
-        historical_atr = AverageTrueRange(high, low, close, window=max_length).average_true_range()
+        recent_atr = ta.volatility.AverageTrueRange(high, low, close, window=min_length).average_true_range()
+        historical_atr = ta.volatility.AverageTrueRange(high, low, close, window=max_length).average_true_range()
         return recent_atr > historical_atr
 
     def lorentzian_distance(self, feature_series, feature_arrays):
@@ -334,77 +284,83 @@ class Exchange:
 
     def generate_l_signals(self, symbol, limit=3000, neighbors_count=8, use_adx_filter=False, adx_threshold=20):
         try:
-            # Fetch OHLCV data
-            ohlcv_data = self.fetch_ohlcv(symbol=symbol, timeframe='3m', limit=limit)
-            df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
-            df.set_index('timestamp', inplace=True)
-
-            # Calculate technical indicators
-            df['rsi'] = self.n_rsi(df['close'], 14, 1)
-            df['adx'] = self.n_adx(df['high'], df['low'], df['close'], 14)  # ADX is always calculated
-            df['cci'] = self.n_cci(df['high'], df['low'], df['close'], 20, 1)
-            df['wt'] = self.n_wt((df['high'] + df['low'] + df['close']) / 3, 10, 11)
-
-            # Feature engineering
-            features = df[['rsi', 'adx', 'cci', 'wt']].values  # ADX included in feature set
-            feature_series = features[-1]
-            feature_arrays = features[:-1]
-
-            # Calculate Lorentzian distances and predictions
-            y_train_series = np.where(df['close'].shift(-4) > df['close'], 1, -1)
-            y_train_series = y_train_series[:-1]
-
-            predictions = []
-            distances = []
-            lastDistance = -1
-
-            for i in range(len(feature_arrays)):
-                if i % 4 == 0:
-                    d = np.log(1 + np.abs(feature_series - feature_arrays[i])).sum()
-                    if d >= lastDistance:
-                        lastDistance = d
-                        distances.append(d)
-                        predictions.append(y_train_series[i])
-                        if len(predictions) > neighbors_count:
-                            lastDistance = distances[int(neighbors_count * 3 / 4)]
-                            distances.pop(0)
-                            predictions.pop(0)
-
-            prediction = np.sum(predictions)
-
-            # Calculate EMA and SMA
-            df['ema'] = EMAIndicator(df['close'], window=200).ema_indicator()
-            df['sma'] = SMAIndicator(df['close'], window=200).sma_indicator()
-
-            # Determine trends
-            is_ema_uptrend = df['close'] > df['ema']
-            is_ema_downtrend = df['close'] < df['ema']
-            is_sma_uptrend = df['close'] > df['sma']
-            is_sma_downtrend = df['close'] < df['sma']
-
-            # Apply ADX filter if enabled
-            adx_filter = self.filter_adx(df['close'], df['high'], df['low'], adx_threshold, use_adx_filter)
-
-            # Generate signal based on prediction and trends
-            new_signal = 'neutral'
-            if prediction > 0 and is_ema_uptrend.iloc[-1] and is_sma_uptrend.iloc[-1] and adx_filter.iloc[-1]:
-                new_signal = 'long'
-            elif prediction < 0 and is_ema_downtrend.iloc[-1] and is_sma_downtrend.iloc[-1] and adx_filter.iloc[-1]:
-                new_signal = 'short'
-
-            # Avoid double entries and ensure signal change
-            if hasattr(self, 'last_signal'):
-                if self.last_signal == new_signal:
+            # The 3m candle in progress is part of the input, so the signal is refreshed every minute
+            new_signal = indicator_cache.get(
+                symbol, '3m', 'l_signal', (self.exchange_id, limit, neighbors_count, use_adx_filter, adx_threshold),
+                lambda: self._l_signal(symbol, limit, neighbors_count, use_adx_filter, adx_threshold),
+                candle_timeframe='1m'
+            )
+
+            # Avoid double entries and ensure signal change; symbols are evaluated concurrently
+            with self.last_signal_lock:
+                if self.last_signal.get(symbol) == new_signal:
                     return 'neutral'
-                else:
-                    self.last_signal = new_signal
-                    return new_signal
-            else:
-                self.last_signal = new_signal
+                self.last_signal[symbol] = new_signal
                 return new_signal
         except Exception as e:
             logging.info(f"Error in calculating signal: {e}")
             return 'neutral'
+
+    def _l_signal(self, symbol, limit, neighbors_count, use_adx_filter, adx_threshold):
+        # Fetch OHLCV data
+        ohlcv_data = self.fetch_candles(symbol, '3m', limit)
+        df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
+        df.set_index('timestamp', inplace=True)
+
+        # Calculate technical indicators
+        df['rsi'] = self.n_rsi(df['close'], 14, 1)
+        df['adx'] = self.n_adx(df['high'], df['low'], df['close'], 14)  # ADX is always calculated
+        df['cci'] = self.n_cci(df['high'], df['low'], df['close'], 20, 1)
+        df['wt'] = self.n_wt((df['high'] + df['low'] + df['close']) / 3, 10, 11)
+
+        # Feature engineering
+        features = df[['rsi', 'adx', 'cci', 'wt']].values  # ADX included in feature set
+        feature_series = features[-1]
+        feature_arrays = features[:-1]
+
+        # Calculate Lorentzian distances and predictions
+        y_train_series = np.where(df['close'].shift(-4) > df['close'], 1, -1)
+        y_train_series = y_train_series[:-1]
+
+        predictions = []
+        distances = []
+        lastDistance = -1
+
+        for i in range(len(feature_arrays)):
+            if i % 4 == 0:
+                d = np.log(1 + np.abs(feature_series - feature_arrays[i])).sum()
+                if d >= lastDistance:
+                    lastDistance = d
+                    distances.append(d)
+                    predictions.append(y_train_series[i])
+                    if len(predictions) > neighbors_count:
+                        lastDistance = distances[int(neighbors_count * 3 / 4)]
+                        distances.pop(0)
+                        predictions.pop(0)
+
+        prediction = np.sum(predictions)
+
+        # Calculate EMA and SMA
+        df['ema'] = ta.trend.EMAIndicator(df['close'], window=200).ema_indicator()
+        df['sma'] = ta.trend.SMAIndicator(df['close'], window=200).sma_indicator()
+
+        # Determine trends
+        is_ema_uptrend = df['close'] > df['ema']
+        is_ema_downtrend = df['close'] < df['ema']
+        is_sma_uptrend = df['close'] > df['sma']
+        is_sma_downtrend = df['close'] < df['sma']
+
+        # Apply ADX filter if enabled
+        adx_filter = self.filter_adx(df['close'], df['high'], df['low'], adx_threshold, use_adx_filter)
+
+        # Generate signal based on prediction and trends
+        new_signal = 'neutral'
+        if prediction > 0 and is_ema_uptrend.iloc[-1] and is_sma_uptrend.iloc[-1] and adx_filter.iloc[-1]:
+            new_signal = 'long'
+        elif prediction < 0 and is_ema_downtrend.iloc[-1] and is_sma_downtrend.iloc[-1] and adx_filter.iloc[-1]:
+            new_signal = 'short'
+
+        return new_signal
         
     # def normalize(self, series):
     #     if not isinstance(series, pd.Series):
@@ -1206,14 +1162,15 @@ class Exchange:
             logging.error(f"Error fetching trades for {symbol}: {e}")
             return []
 
-    def retry_api_call(self, function, *args, max_retries=100, delay=10, **kwargs):
-        for i in range(max_retries):
-            try:
-                return function(*args, **kwargs)
-            except Exception as e:
-                logging.info(f"Error occurred during API call: {e}. Retrying in {delay} seconds...")
-                time.sleep(delay)
-        raise Exception(f"Failed to execute the API function after {max_retries} retries.")
+    def retry_api_call(self, function, *args, max_retries=None, delay=None, deadline=None, **kwargs):
+        """
+        Call function(*args, **kwargs) under the account's retry policy: transient errors are
+        retried with backoff until `deadline` seconds (the policy's default if None) or
+        max_retries attempts; auth and invalid order errors are raised at once.
+        """
+        return self.retry_policy.execute(
+            function, args, kwargs, deadline=deadline, max_attempts=max_retries, base_delay=delay
+        )
     
     def get_price_precision(self, symbol):
         market = self.exchange.market(symbol)
@@ -1570,6 +1527,10 @@ class Exchange:
                         if len(data["bids"][0]) > 0 and len(data["asks"][0]) > 0:
                             values["bids"] = data["bids"]
                             values["asks"] = data["asks"]
+                            # Identifies the book version for get_orderbook_analytics()
+                            values["symbol"] = symbol
+                            values["timestamp"] = data.get("timestamp")
+                            values["nonce"] = data.get("nonce")
                 break  # if the fetch was successful, break out of the loop
 
             except HTTPError as http_err:
@@ -1676,7 +1637,9 @@ class Exchange:
                 
                 # Check if bid and ask are numeric
                 if isinstance(bid, (int, float)) and isinstance(ask, (int, float)):
-                    return (bid + ask) / 2
+                    price = (bid + ask) / 2
+                    self.risk_engine.update_price(symbol, price)
+                    return price
                 else:
                     raise TypeError(f"Bid or ask price is not numeric: bid={bid}, ask={ask}")
             else:
@@ -1761,10 +1724,19 @@ class Exchange:
         return None
 
     def get_moving_averages(self, symbol: str, timeframe: str = "1m", num_bars: int = 20, max_retries=100, retry_delay=5) -> dict:
+        # The last value includes the candle in progress, so entries refresh every minute;
+        # incomplete results are not cached
+        return indicator_cache.get(
+            symbol, timeframe, 'moving_averages', (self.exchange_id, num_bars),
+            lambda: self._get_moving_averages(symbol, timeframe, num_bars, max_retries, retry_delay),
+            candle_timeframe='1m', cacheable=lambda values: None not in values.values()
+        )
+
+    def _get_moving_averages(self, symbol, timeframe, num_bars, max_retries, retry_delay):
         values = {"MA_3_H": 0.0, "MA_3_L": 0.0, "MA_6_H": 0.0, "MA_6_L": 0.0}
         for i in range(max_retries):
             try:
-                bars = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=num_bars)
+                bars = self.fetch_candles(symbol, timeframe, num_bars)
                 if not bars:
                     logging.info(f"No data returned for {symbol} on {timeframe}. Retrying...")
                     time.sleep(retry_delay)
@@ -1890,9 +1862,11 @@ class Exchange:
         for retry in range(max_retries):
             try:
                 if derivatives:
-                    return self.exchange.cancel_all_derivatives_orders(None, params)
+                    result = self.exchange.cancel_all_derivatives_orders(None, params)
                 else:
-                    return self.exchange.cancel_all_orders(None, params)
+                    result = self.exchange.cancel_all_orders(None, params)
+                self.open_orders_book.apply_cancelled_all()
+                return result
             except ccxt.RateLimitExceeded as e:
                 # If rate limit error and not the last retry, then wait and try again
                 if retry < max_retries - 1:
@@ -1956,6 +1930,7 @@ class Exchange:
                     if order['reduceOnly']:
                         order_id = order['id']
                         self.exchange.cancel_order(order_id, symbol)
+                        self.open_orders_book.apply_cancelled(order_id)
                         logging.info(f"Cancelling reduce-only order: {order_id}")
 
         except Exception as e:
@@ -1974,6 +1949,7 @@ class Exchange:
                     if not order['reduceOnly']:
                         order_id = order['id']
                         self.exchange.cancel_order(order_id, symbol)
+                        self.open_orders_book.apply_cancelled(order_id)
                         logging.info(f"Cancelling order: {order_id}")
 
         except Exception as e:
@@ -0,0 +1,105 @@
+"""
+Pure grid construction for the lingrid strategy family.
+
+Every function here takes plain numbers/arrays and returns NumPy arrays, with no
+exchange or strategy state, so a grid can be rebuilt from an order-book update
+without any API calls. The arithmetic follows the original BybitStrategy loops term
+for term, so the results are identical to the list-based versions.
+"""
+
+import numpy as np
+
+
+def grid_levels(current_price, buffer_distance, max_outer_price_distance, levels, side, fresh_entry):
+    """
+    Evenly spaced grid prices starting `buffer_distance` away from current_price.
+
+    fresh_entry=True (no open position) spreads the levels so the last one sits on the
+    outer price distance; otherwise the spacing is split into `levels` steps. Long
+    levels ('buy') step down from the price, short levels ('sell') step up.
+    """
+    if levels <= 0:
+        return np.empty(0)
+    outer_distance = max_outer_price_distance * current_price - buffer_distance
+    if fresh_entry:
+        if levels == 1:
+            step = 0.0  # Only the initial entry level
+        else:
+            step = outer_distance / (levels - 1)
+    else:
+        step = outer_distance / levels
+    offsets = np.arange(levels, dtype=float) * step
+    if side == 'buy':
+        return (current_price - buffer_distance) - offsets
+    return (current_price + buffer_distance) + offsets
+
+
+def snap_to_significant_levels(grid, significant_levels, current_price, min_outer_price_distance, max_outer_price_distance, levels, tolerance=0.01, keep_within=None):
+    """
+    Move each grid level onto the first significant level within `tolerance` (relative)
+    that lies inside the outer price band, skipping candidates closer than one grid step
+    to the previously placed level.
+
+    keep_within=(low, high) drops snapped levels outside that price range; the spacing
+    check then refers to the last level that was kept.
+    """
+    grid = np.asarray(grid, dtype=float)
+    significant = np.asarray(significant_levels, dtype=float)
+    if grid.size == 0:
+        return grid
+
+    in_band = (current_price - max_outer_price_distance * current_price <= significant) & (significant <= current_price - min_outer_price_distance * current_price)
+    # Candidate matrix: grid level x significant level, independent of earlier placements
+    near = (np.abs(grid[:, None] - significant[None, :]) / grid[:, None] < tolerance) & in_band[None, :]
+    min_gap = max_outer_price_distance * current_price / levels
+
+    adjusted = []
+    for index, level in enumerate(grid.tolist()):
+        candidates = significant[near[index]]
+        if adjusted and candidates.size:
+            candidates = candidates[np.abs(candidates - adjusted[-1]) > min_gap]
+        level = candidates[0].item() if candidates.size else level
+        if keep_within is None or keep_within[0] <= level <= keep_within[1]:
+            adjusted.append(level)
+    return np.asarray(adjusted, dtype=float)
+
+
+def fill_grid(grid, levels, current_price, buffer_distance, max_outer_price_distance, side):
+    """
+    Pad a grid with evenly spaced levels out to the outer price distance until it has
+    `levels` entries, then sort it away from the price (descending for 'buy').
+    """
+    grid = np.asarray(grid, dtype=float)
+    if grid.size < levels:
+        if side == 'buy':
+            start = grid[-1] if grid.size else current_price - buffer_distance
+            stop = current_price - max_outer_price_distance * current_price
+        else:
+            start = grid[-1] if grid.size else current_price + buffer_distance
+            stop = current_price + max_outer_price_distance * current_price
+        grid = np.concatenate((grid, np.linspace(start, stop, levels - grid.size + 1)[1:]))
+    grid = np.sort(grid)
+    return grid[::-1] if side == 'buy' else grid
+
+
+def order_amounts(total_amount, levels, strength, qty_precision, current_price, min_quantity, current_position_qty=0, enforce_full_grid=False):
+    """
+    Split total_amount (plus the notional of the current position) over `levels`
+    orders weighted by (i + 1) ** strength, rounded to qty_precision and floored at
+    min_quantity. Without enforce_full_grid any rounding shortfall goes to the last level.
+    """
+    if levels <= 0:
+        return np.empty(0)
+    weights = np.arange(1, levels + 1, dtype=float) ** strength
+    total_ratio = np.cumsum(weights)[-1]
+    total_amount_adjusted = total_amount + (current_position_qty * current_price)
+
+    quantities = (weights / total_ratio) * total_amount_adjusted / current_price
+    amounts = np.maximum(np.round(quantities / qty_precision) * qty_precision, min_quantity)
+
+    if not enforce_full_grid:
+        total_distributed_amount = np.cumsum(amounts)[-1] * current_price
+        if total_distributed_amount < total_amount_adjusted:
+            amounts[-1] += (total_amount_adjusted - total_distributed_amount) / current_price
+    return amounts
+
@@ -0,0 +1,112 @@
+"""
+Process-wide memoisation of indicator results per candle.
+
+Indicator inputs only change when a candle closes, so results are cached under
+(symbol, timeframe, indicator, params, last closed candle open time). The first
+thread to ask for a key computes it while later callers for the same key wait for
+that result instead of computing it again, for up to WAIT_TIMEOUT seconds before
+computing it themselves. Entries are evicted least recently used.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+TIMEFRAME_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '12h': 43200,
+    '1d': 86400,
+}
+
+
+def timeframe_seconds(timeframe):
+    return TIMEFRAME_SECONDS[timeframe]
+
+
+def last_closed_candle(timeframe, now=None):
+    """Open time (ms) of the most recent closed candle; candles are aligned to the epoch."""
+    seconds = timeframe_seconds(timeframe)
+    now = time.time() if now is None else now
+    return (int(now // seconds) - 1) * seconds * 1000
+
+
+WAIT_TIMEOUT = 30  # Seconds to wait on another thread's computation before doing it ourselves
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.completed = False
+        self.result = None
+        self.error = None
+
+
+class IndicatorCache:
+    def __init__(self, max_entries=4096, wait_timeout=WAIT_TIMEOUT):
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol, timeframe, indicator, params, compute, candle_timeframe=None, cacheable=None):
+        """
+        Return compute() for the current candle, computing it at most once per key.
+
+        candle_timeframe sets which candle close invalidates the entry (default:
+        timeframe); results that read the candle still in progress pass '1m' so they
+        refresh every minute. cacheable(result) returning False hands the result back
+        without storing it. Exceptions from compute() reach every waiting caller and
+        are not cached. A caller that waits longer than wait_timeout, or whose leader
+        was interrupted (e.g. KeyboardInterrupt), computes the result itself.
+        """
+        key = (symbol, timeframe, indicator, params, last_closed_candle(candle_timeframe or timeframe))
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            flight = self.in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.in_flight[key] = _Flight()
+                self.misses += 1
+
+        if not leader:
+            if flight.done.wait(self.wait_timeout):
+                if flight.error is not None:
+                    raise flight.error
+                if flight.completed:
+                    return flight.result
+            # The leader is stuck or died without a result: don't depend on it
+            return compute()
+
+        try:
+            flight.result = compute()
+            flight.completed = True
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+                if flight.completed and (cacheable is None or cacheable(flight.result)):
+                    self.entries[key] = flight.result
+                    while len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+            flight.done.set()
+        return flight.result
+
+    def invalidate(self, symbol=None):
+        """Drop every entry, or only those for one symbol."""
+        with self.lock:
+            if symbol is None:
+                self.entries.clear()
+            else:
+                for key in [key for key in self.entries if key[0] == symbol]:
+                    del self.entries[key]
+
+
+indicator_cache = IndicatorCache()
@@ -0,0 +1,291 @@
+"""
+Streaming technical indicators.
+
+Every indicator keeps only the state it needs to advance by one bar. `warmup()` feeds
+whole input arrays and returns the full output series (same length and warm-up NaNs
+as the `ta` indicator), after which `update()` costs O(1) per closed bar. `peek()`
+evaluates an unfinished candle without committing it.
+
+Only what get_mfirsi_ema_secondary_ema needs is here (EMA, RSI, MFI). ATR, ADX, CCI,
+WaveTrend and HMA are not ported: n_rsi/n_cci/n_wt/n_adx rescale their output over
+the whole window on every call, so they still use ta, and calculate_atr is a plain
+mean of the last `period` true ranges rather than ta's ATR.
+
+The EMA and RSI recursions repeat pandas' and ta's arithmetic operation for operation
+and match ta exactly. MFI keeps running sums of the money flow and re-sums them every
+`window` bars, so it can differ from ta in the last bits; every output is within
+ABSOLUTE_TOLERANCE of ta's (tests/test_indicators.py).
+"""
+
+import math
+import threading
+from collections import deque
+
+import numpy as np
+
+from directionalscalper.core.registry import lazy_import
+
+scipy_signal = lazy_import('scipy.signal')  # Only klmf needs it
+
+NaN = float('nan')
+ABSOLUTE_TOLERANCE = 1e-10  # Largest difference of MFI from ta's, on its 0-100 scale
+
+
+def _div(numerator, denominator):
+    # Float division with NumPy semantics: x/0 gives +-inf or nan instead of raising
+    if denominator == 0:
+        if numerator == 0 or numerator != numerator:
+            return NaN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+def _pairwise_sum(values):
+    """Sum in the same order as NumPy's pairwise summation of a float64 array."""
+    n = len(values)
+    if n < 8:
+        total = 0.0
+        for value in values:
+            total += value
+        return total
+    if n <= 128:
+        r = list(values[:8])
+        i = 8
+        while i < n - (n % 8):
+            for j in range(8):
+                r[j] += values[i + j]
+            i += 8
+        total = ((r[0] + r[1]) + (r[2] + r[3])) + ((r[4] + r[5]) + (r[6] + r[7]))
+        for value in values[i:]:
+            total += value
+        return total
+    half = n // 2
+    half -= half % 8
+    return _pairwise_sum(values[:half]) + _pairwise_sum(values[half:])
+
+
+def _ewm_alpha(span=None, alpha=None):
+    # pandas converts span/alpha to a centre of mass and back; do the same so alpha is bit-identical
+    com = (span - 1) / 2.0 if span is not None else (1 - alpha) / alpha
+    return 1.0 / (1.0 + com)
+
+
+class Indicator:
+    """Base class: subclasses implement update(); warm-up and peek come for free."""
+
+    def update(self, *bar):
+        raise NotImplementedError
+
+    def warmup(self, *series):
+        """Feed whole input arrays bar by bar and return the output for every bar."""
+        return np.array([self.update(*map(float, bar)) for bar in zip(*series)], dtype=float)
+
+    def peek(self, *bar):
+        """Value the indicator would have after `bar`, without committing it."""
+        state = self._save()
+        try:
+            return self.update(*bar)
+        finally:
+            self._restore(state)
+
+    def _save(self):
+        state = {}
+        for name, value in self.__dict__.items():
+            if isinstance(value, Indicator):
+                state[name] = value._save()
+            elif isinstance(value, (deque, list)):
+                state[name] = value.copy()
+            else:
+                state[name] = value
+        return state
+
+    def _restore(self, state):
+        for name, value in state.items():
+            current = self.__dict__.get(name)
+            if isinstance(current, Indicator):
+                current._restore(value)
+            else:
+                self.__dict__[name] = value
+
+
+class EMA(Indicator):
+    """
+    pandas ewm(adjust=False).mean(), by default with ta's min_periods=window.
+    Leading NaNs are skipped and later gaps decay the old weight, as in pandas.
+    """
+
+    def __init__(self, window=None, alpha=None, min_periods=None):
+        self.alpha = _ewm_alpha(span=window) if alpha is None else _ewm_alpha(alpha=alpha)
+        self.min_periods = max(window if min_periods is None else min_periods, 1)
+        self.weighted = NaN
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.value = NaN
+
+    def update(self, x):
+        is_observation = x == x
+        if is_observation:
+            self.nobs += 1
+        if self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+            if is_observation:
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * x) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif is_observation:
+            self.weighted = x
+        self.value = self.weighted if self.nobs >= self.min_periods else NaN
+        return self.value
+
+
+class RSI(Indicator):
+    """ta.momentum.RSIIndicator: Wilder smoothing of gains and losses."""
+
+    def __init__(self, window=14):
+        self.prev_close = None
+        self.ema_up = EMA(window, alpha=1 / window, min_periods=window)
+        self.ema_down = EMA(window, alpha=1 / window, min_periods=window)
+        self.value = NaN
+
+    def update(self, close):
+        diff = close - self.prev_close if self.prev_close is not None else NaN
+        self.prev_close = close
+        up = diff if diff > 0 else 0.0
+        down = -(diff if diff < 0 else 0.0)
+        emaup = self.ema_up.update(up)
+        emadn = self.ema_down.update(down)
+        self.value = 100.0 if emadn == 0 else 100 - (100 / (1 + _div(emaup, emadn)))
+        return self.value
+
+
+class MFI(Indicator):
+    """ta.volume.MFIIndicator (money flow index)."""
+
+    def __init__(self, window=14):
+        self.window = window
+        self.prev_typical_price = None
+        self.flows = deque()
+        self.positive = 0.0
+        self.negative = 0.0
+        self.updates_since_resum = 0
+        self.value = NaN
+
+    def update(self, high, low, close, volume):
+        typical_price = (high + low + close) / 3.0
+        prev = self.prev_typical_price
+        up_down = 0 if prev is None else 1 if typical_price > prev else -1 if typical_price < prev else 0
+        self.prev_typical_price = typical_price
+        flow = typical_price * volume * up_down
+
+        self.flows.append(flow)
+        if flow >= 0.0:
+            self.positive += flow
+        else:
+            self.negative += flow
+        if len(self.flows) > self.window:
+            old = self.flows.popleft()
+            if old >= 0.0:
+                self.positive -= old
+            else:
+                self.negative -= old
+
+        # Re-sum periodically so add/remove rounding can't accumulate
+        self.updates_since_resum += 1
+        if self.updates_since_resum >= self.window:
+            self.positive = _pairwise_sum([f if f >= 0.0 else 0.0 for f in self.flows])
+            self.negative = _pairwise_sum([f if f < 0.0 else 0.0 for f in self.flows])
+            self.updates_since_resum = 0
+
+        if len(self.flows) < self.window:
+            self.value = NaN
+        else:
+            self.value = 100 - (100 / (1 + _div(self.positive, abs(self.negative))))
+        return self.value
+
+
+def klmf(close, high, low):
+    """
+    Kalman-style smoother behind regime_filter, for whole arrays.
+
+    value1/value2 are fixed first-order IIR filters (of the close change and the bar
+    range) and run through lfilter; only the smoother itself, whose gain changes every
+    bar, needs a Python recurrence. Bar 0 is 0, as in the original loop.
+    """
+    close = np.asarray(close, dtype=float)
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    if close.size == 0:
+        return np.empty(0)
+
+    change = np.concatenate(([0.0], np.diff(close)))
+    bar_range = np.concatenate(([0.0], (high - low)[1:]))
+    value1 = scipy_signal.lfilter([0.2], [1.0, -0.8], change)
+    value2 = scipy_signal.lfilter([0.1], [1.0, -0.8], bar_range)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        omega = np.abs(value1 / value2)
+        alpha = (-omega ** 2 + np.sqrt(omega ** 4 + 16 * omega ** 2)) / 8
+
+    values = [0.0]
+    previous = 0.0
+    for a, x in zip(alpha[1:].tolist(), close[1:].tolist()):
+        previous = a * x + (1 - a) * previous
+        values.append(previous)
+    return np.array(values, dtype=float)
+
+
+class MfiRsiEmaSignal(Indicator):
+    """
+    Incremental state behind Exchange.get_mfirsi_ema_secondary_ema.
+
+    Closed candles are committed once; the in-progress candle is only peeked, so each
+    call costs one update per new candle instead of recomputing the whole window.
+    """
+
+    HISTORY = 256
+
+    def __init__(self, ema_period=5, secondary_ema_period=3, window=14):
+        self.lock = threading.Lock()
+        self.ema_period = ema_period
+        self.secondary_ema_period = secondary_ema_period
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.mfi = MFI(self.window)
+        self.rsi = RSI(self.window)
+        # Plain ewm(span, adjust=False) on the indicators, so min_periods is 1
+        self.mfi_ema = EMA(self.ema_period, min_periods=1)
+        self.rsi_ema = EMA(self.ema_period, min_periods=1)
+        self.mfi_ema_secondary = EMA(self.secondary_ema_period, min_periods=1)
+        self.rsi_ema_secondary = EMA(self.secondary_ema_period, min_periods=1)
+        self.conditions = deque(maxlen=self.HISTORY)
+        self.last_timestamp = None
+
+    def update(self, candle):
+        timestamp, open_, high, low, close, volume = (float(v) for v in candle[:6])
+        mfi = self.mfi.update(high, low, close, volume)
+        rsi = self.rsi.update(close)
+        mfi_ema = self.mfi_ema.update(mfi)
+        rsi_ema = self.rsi_ema.update(rsi)
+        mfi_ema_secondary = self.mfi_ema_secondary.update(mfi)
+        rsi_ema_secondary = self.rsi_ema_secondary.update(rsi)
+
+        buy_condition = (mfi_ema < 30 and rsi_ema < 40 and mfi_ema_secondary < mfi_ema and rsi_ema_secondary < rsi_ema and open_ < close)
+        sell_condition = (mfi_ema > 70 and rsi_ema > 60 and mfi_ema_secondary > mfi_ema and rsi_ema_secondary > rsi_ema and open_ > close)
+        self.conditions.append((buy_condition, sell_condition))
+        self.last_timestamp = timestamp
+        return buy_condition, sell_condition
+
+    def sync(self, ohlcv):
+        """
+        Bring the state up to date with an OHLCV window whose last row is the candle in
+        progress. Returns the (buy, sell) conditions for every known bar, oldest first.
+        """
+        closed, current = ohlcv[:-1], ohlcv[-1]
+        if self.last_timestamp is None or not closed or closed[0][0] > self.last_timestamp:
+            # First call or a gap since the last call: rebuild from this window
+            self.reset()
+        for candle in closed:
+            if self.last_timestamp is None or candle[0] > self.last_timestamp:
+                self.update(candle)
+        return list(self.conditions) + [self.peek(current)]
@@ -0,0 +1,158 @@
+"""
+Zigzag pivots and support/resistance levels.
+
+ZigZag confirms a pivot once `length` bars have closed on either side of it, using
+monotonic deques for the rolling high/low, so each bar is O(1) instead of a max/min
+over a sliced window. support_resistance_levels groups pivot prices with a
+sort-and-split pass that gives the same groups as DBSCAN(min_samples=2) on one
+dimension.
+"""
+
+import math
+from collections import deque
+
+from directionalscalper.core.indicators import Indicator
+
+
+class ZigZag(Indicator):
+    """
+    Incremental form of Exchange.calculate_zigzag.
+
+    Bar i is a swing high (low) when its high (low) is the extreme of bars
+    i - length .. i + length; the direction rules are the same as the batch loop.
+    Confirmed pivots are kept as (timestamp, price) in `pivots`.
+    """
+
+    MAX_PIVOTS = 2000
+
+    def __init__(self, length=4):
+        self.length = length
+        self.reset()
+
+    def reset(self):
+        self.bars = deque(maxlen=2 * self.length + 1)  # (timestamp, high, low)
+        self.max_queue = deque()  # (bar index, high), decreasing
+        self.min_queue = deque()  # (bar index, low), increasing
+        self.count = 0
+        self.direction_up = False
+        self.last_low = math.inf
+        self.last_high = 0.0
+        self.pivots = deque(maxlen=self.MAX_PIVOTS)
+
+    def update(self, high, low, timestamp=None):
+        """Add one closed bar; returns the pivots it confirmed (usually none)."""
+        index = self.count
+        self.count += 1
+        self.bars.append((timestamp, high, low))
+
+        while self.max_queue and self.max_queue[-1][1] <= high:
+            self.max_queue.pop()
+        self.max_queue.append((index, high))
+        while self.min_queue and self.min_queue[-1][1] >= low:
+            self.min_queue.pop()
+        self.min_queue.append((index, low))
+
+        window_start = index - 2 * self.length
+        while self.max_queue[0][0] < window_start:
+            self.max_queue.popleft()
+        while self.min_queue[0][0] < window_start:
+            self.min_queue.popleft()
+        if window_start < 0:
+            return []
+
+        # The bar in the middle of the window now has `length` bars on both sides
+        center_timestamp, center_high, center_low = self.bars[self.length]
+        is_max = self.max_queue[0][1] == center_high
+        is_min = self.min_queue[0][1] == center_low
+
+        confirmed = []
+        if self.direction_up:
+            if is_min and center_low < self.last_low:
+                self.last_low = center_low
+                confirmed.append((center_timestamp, self.last_low))
+            if is_max and center_high > self.last_low:
+                self.last_high = center_high
+                self.direction_up = False
+                confirmed.append((center_timestamp, self.last_high))
+        else:
+            if is_max and center_high > self.last_high:
+                self.last_high = center_high
+                confirmed.append((center_timestamp, self.last_high))
+            if is_min and center_low < self.last_high:
+                self.last_low = center_low
+                self.direction_up = True
+                confirmed.append((center_timestamp, self.last_low))
+
+        self.pivots.extend(confirmed)
+        return confirmed
+
+    def pivots_for(self, ohlcv):
+        """Pivot prices for a whole OHLCV list, from a fresh state (same as the batch loop)."""
+        self.reset()
+        for candle in ohlcv:
+            self.update(candle[2], candle[3], candle[0])
+        return [price for _, price in self.pivots]
+
+
+def _median(numbers):
+    sorted_numbers = sorted(numbers)
+    middle = len(sorted_numbers) // 2
+    if len(sorted_numbers) % 2 == 0:
+        return (sorted_numbers[middle - 1] + sorted_numbers[middle]) / 2
+    return sorted_numbers[middle]
+
+
+def cluster_1d(values, eps):
+    """
+    Group values whose sorted neighbours are at most `eps` apart.
+
+    Returns (clusters, noise) as lists of indices into `values`; single values with no
+    neighbour are noise. This is DBSCAN(eps, min_samples=2) on one dimension: every
+    point with a neighbour is a core point, so clusters are the runs between gaps > eps.
+    """
+    order = sorted(range(len(values)), key=values.__getitem__)
+    runs = []
+    for idx in order:
+        if runs and values[idx] - values[runs[-1][-1]] <= eps:
+            runs[-1].append(idx)
+        else:
+            runs.append([idx])
+    clusters = [run for run in runs if len(run) > 1]
+    noise = [run[0] for run in runs if len(run) == 1]
+    return clusters, noise
+
+
+def support_resistance_levels(zigzag, ohlcv_data):
+    """
+    Support/resistance levels from zigzag pivot prices, one
+    {'level', 'strength', 'average_volume'} per cluster, sorted by level, highest first.
+
+    Matches Exchange.get_significant_levels_dbscan: prices are min-max normalised,
+    eps is 4% of their mean deviation, unclustered pivots form one extra group, and
+    the volume of pivot n is read from ohlcv_data[n].
+    """
+    min_price = min(zigzag)
+    max_price = max(zigzag)
+    normalized = [(price - min_price) / (max_price - min_price) for price in zigzag]
+    mean = sum(normalized) / len(normalized)
+    average_deviation = sum(abs(price - mean) for price in normalized) / len(normalized)
+    epsilon = average_deviation * 0.04
+
+    clusters, noise = cluster_1d(normalized, epsilon)
+    if noise:
+        clusters.append(noise)
+    # DBSCAN numbers clusters (and the noise group) in order of their first pivot
+    groups = sorted((sorted(cluster) for cluster in clusters), key=lambda cluster: cluster[0])
+
+    levels = []
+    for cluster in groups:
+        cluster_prices = [zigzag[idx] for idx in cluster]
+        cluster_volumes = [ohlcv_data[idx][5] for idx in cluster]
+        levels.append({
+            'level': _median(cluster_prices),
+            'strength': len(cluster_prices),
+            'average_volume': sum(cluster_volumes) / len(cluster_volumes),
+        })
+
+    levels.sort(key=lambda x: x['level'], reverse=True)
+    return levels
@@ -0,0 +1,112 @@
+"""
+Leverage tiers (Bybit risk limits) per symbol, loaded once and looked up by notional.
+
+A symbol's tiers change rarely, so they are fetched once per ttl and shared by every
+strategy thread. Each tier covers a notional range with its own max leverage and
+maintenance margin rate; tier_at() finds the tier for a position size with a binary
+search over the tier floors instead of scanning the list.
+
+Tiers are ccxt leverage tier dicts (fetch_market_leverage_tiers output):
+{'tier', 'minNotional', 'maxNotional', 'maxLeverage', 'maintenanceMarginRate', 'info'}.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="LeverageTiers", filename="LeverageTiers.log", stream=True)
+
+
+def _to_float(value, default=0.0):
+    try:
+        return float(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        return default
+
+
+class _SymbolTiers:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tiers = None
+        self.floors = []  # minNotional of each tier, ascending
+        self.fetched_at = 0.0
+
+    def set(self, tiers):
+        tiers = sorted(tiers, key=lambda tier: _to_float(tier.get('minNotional')))
+        self.tiers = tiers
+        self.floors = [_to_float(tier.get('minNotional')) for tier in tiers]
+        self.fetched_at = time.time()
+
+
+class LeverageTierStore:
+    def __init__(self, ttl=6 * 3600):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}  # (exchange id, symbol) -> _SymbolTiers
+
+    def _entry(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = _SymbolTiers()
+            return entry
+
+    def tiers(self, exchange_id, symbol, fetch):
+        """
+        Tiers for symbol, calling fetch() (which returns the tier list) only when none
+        are cached or they are older than ttl. A failed refresh keeps serving the old
+        tiers; with nothing cached the error propagates.
+        """
+        entry = self._entry((exchange_id, symbol))
+        if entry.tiers is not None and time.time() - entry.fetched_at < self.ttl:
+            return entry.tiers
+        with entry.lock:
+            # Another thread may have loaded them while we waited
+            if entry.tiers is not None and time.time() - entry.fetched_at < self.ttl:
+                return entry.tiers
+            try:
+                tiers = fetch()
+            except Exception as e:
+                if entry.tiers is None:
+                    raise
+                logging.warning(f"Could not refresh leverage tiers for {symbol}, keeping cached ones: {e}")
+                entry.fetched_at = time.time()
+                return entry.tiers
+            if not tiers and entry.tiers:
+                return entry.tiers
+            entry.set(tiers or [])
+            logging.info(f"Loaded {len(entry.tiers)} leverage tiers for {symbol}")
+            return entry.tiers
+
+    def invalidate(self, exchange_id, symbol=None):
+        with self.lock:
+            for key in list(self.entries):
+                if key[0] == exchange_id and symbol in (None, key[1]):
+                    del self.entries[key]
+
+    def tier_at(self, exchange_id, symbol, notional, fetch):
+        """The tier whose notional range holds `notional` (the last tier above the top range), or None."""
+        tiers = self.tiers(exchange_id, symbol, fetch)
+        if not tiers:
+            return None
+        entry = self._entry((exchange_id, symbol))
+        floors = entry.floors if entry.tiers is tiers else [_to_float(tier.get('minNotional')) for tier in tiers]
+        index = max(bisect_right(floors, max(notional, 0.0)) - 1, 0)
+        return tiers[index]
+
+    def max_leverage(self, exchange_id, symbol, fetch, notional=0.0):
+        """Max leverage allowed for a position of `notional`; the first tier's when notional is 0."""
+        tier = self.tier_at(exchange_id, symbol, notional, fetch)
+        return _to_float(tier.get('maxLeverage'), None) if tier is not None else None
+
+    def maintenance_margin(self, exchange_id, symbol, notional, fetch):
+        """(maintenance margin rate, maintenance margin) for a position of `notional`, or (None, None)."""
+        tier = self.tier_at(exchange_id, symbol, notional, fetch)
+        if tier is None:
+            return None, None
+        rate = _to_float(tier.get('maintenanceMarginRate'))
+        # Bybit tiers above the first carry a deduction so the margin is continuous across tiers
+        deduction = _to_float((tier.get('info') or {}).get('mmDeduction'))
+        return rate, max(notional * rate - deduction, 0.0)
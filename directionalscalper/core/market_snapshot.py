@@ -0,0 +1,180 @@
+"""
+On-disk market metadata shared by every ccxt client of an exchange.
+
+load_markets() downloads the full market list (several MB on Bybit) for each new
+ccxt client. MarketSnapshotStore keeps one copy per exchange in memory and in
+data/markets/<exchange>.json, tagged with a format version, the ccxt version and the
+time it was downloaded. A new client is populated with set_markets() from memory or
+from a valid snapshot; only a missing, mismatched or expired snapshot is downloaded
+before the client can be used. Snapshots older than refresh_interval are refreshed
+by a background thread, which pushes the new markets to every attached client.
+"""
+
+import json
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import ccxt
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="MarketSnapshot", filename="MarketSnapshot.log", stream=True)
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR = Path("data", "markets")
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.markets = None
+        self.currencies = None
+        self.fetched_at = 0.0
+        self.clients = weakref.WeakSet()
+
+
+class MarketSnapshotStore:
+    def __init__(self, directory=SNAPSHOT_DIR, max_age=24 * 3600, refresh_interval=3600):
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.refresher = None
+        self.refresh_now = threading.Event()
+
+    def path(self, exchange_id):
+        return self.directory / f"{exchange_id}.json"
+
+    def _entry(self, exchange_id):
+        with self.lock:
+            entry = self.entries.get(exchange_id)
+            if entry is None:
+                entry = self.entries[exchange_id] = _Entry()
+            return entry
+
+    # Snapshot file
+
+    def read(self, exchange_id):
+        """(markets, currencies, fetched_at) from disk, or None if missing or not valid for this process."""
+        path = self.path(exchange_id)
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Unreadable market snapshot {path}: {e}")
+            return None
+
+        if data.get('version') != SNAPSHOT_VERSION or data.get('ccxt_version') != ccxt.__version__:
+            logging.info(f"Market snapshot {path} was written by another format or ccxt version, ignoring it")
+            return None
+        if data.get('exchange') != exchange_id or not data.get('markets'):
+            logging.warning(f"Market snapshot {path} does not hold {exchange_id} markets, ignoring it")
+            return None
+        age = time.time() - data.get('fetched_at', 0)
+        if age > self.max_age or age < -60:
+            logging.info(f"Market snapshot {path} is {age / 3600:.1f}h old, ignoring it")
+            return None
+        return data['markets'], data.get('currencies'), data['fetched_at']
+
+    def write(self, exchange_id, markets, currencies, fetched_at):
+        path = self.path(exchange_id)
+        data = {
+            'version': SNAPSHOT_VERSION,
+            'ccxt_version': ccxt.__version__,
+            'exchange': exchange_id,
+            'fetched_at': fetched_at,
+            'markets': markets,
+            'currencies': currencies,
+        }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix('.tmp')
+            with open(temporary, 'w') as file:
+                json.dump(data, file)
+            os.replace(temporary, path)  # Readers never see a partial file
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning(f"Could not write market snapshot {path}: {e}")
+
+    # Clients
+
+    def attach(self, client, exchange_id=None):
+        """
+        Give a ccxt client its markets without downloading them when a fresh enough
+        copy exists, and keep it updated by the background refresh.
+        """
+        exchange_id = exchange_id or client.id
+        entry = self._entry(exchange_id)
+        with entry.lock:
+            if entry.markets is None:
+                snapshot = self.read(exchange_id)
+                if snapshot is not None:
+                    entry.markets, entry.currencies, entry.fetched_at = snapshot
+                    logging.info(f"Loaded {len(entry.markets)} {exchange_id} markets from snapshot ({(time.time() - entry.fetched_at) / 60:.0f} min old)")
+            if entry.markets is None or time.time() - entry.fetched_at > self.max_age:
+                self._download(exchange_id, entry, client)
+            else:
+                client.set_markets(entry.markets, entry.currencies)
+                self._sync_time(client)
+            entry.clients.add(client)
+
+        self._start_refresher()
+        if time.time() - entry.fetched_at > self.refresh_interval:
+            self.refresh_now.set()
+        return client.markets
+
+    def _sync_time(self, client):
+        # load_markets() also measures the clock offset when adjustForTimeDifference is set
+        if client.options.get('adjustForTimeDifference') and hasattr(client, 'load_time_difference'):
+            try:
+                client.load_time_difference()
+            except Exception as e:
+                logging.warning(f"Could not load time difference for {client.id}: {e}")
+
+    def _download(self, exchange_id, entry, client):
+        started = time.time()
+        markets = client.load_markets(reload=True)
+        entry.markets = markets
+        entry.currencies = client.currencies
+        entry.fetched_at = time.time()
+        logging.info(f"Downloaded {len(markets)} {exchange_id} markets in {entry.fetched_at - started:.2f}s")
+        self.write(exchange_id, entry.markets, entry.currencies, entry.fetched_at)
+
+    def refresh(self, exchange_id):
+        """Download the markets again through one attached client and update every other client."""
+        entry = self._entry(exchange_id)
+        with entry.lock:
+            clients = list(entry.clients)
+            if not clients:
+                return False
+            self._download(exchange_id, entry, clients[0])
+            for client in clients[1:]:
+                client.set_markets(entry.markets, entry.currencies)
+        return True
+
+    # Background refresh
+
+    def _start_refresher(self):
+        with self.lock:
+            if self.refresher is None:
+                self.refresher = threading.Thread(target=self._refresh_loop, name="market-snapshot", daemon=True)
+                self.refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            self.refresh_now.wait(timeout=60)
+            self.refresh_now.clear()
+            with self.lock:
+                due = [exchange_id for exchange_id, entry in self.entries.items()
+                       if time.time() - entry.fetched_at > self.refresh_interval]
+            for exchange_id in due:
+                try:
+                    self.refresh(exchange_id)
+                except Exception as e:
+                    logging.warning(f"Background market refresh failed for {exchange_id}: {e}")
+
@@ -0,0 +1,236 @@
+import threading
+import time
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="OpenOrdersBook", filename="OpenOrdersBook.log", stream=True)
+
+
+def _normalize_symbol(symbol):
+    # 'BTC/USDT:USDT' and 'BTCUSDT' both map to 'BTCUSDT'
+    return symbol.split(':')[0].replace('/', '') if symbol else ''
+
+
+def _link_id(order):
+    return order.get('clientOrderId') or order.get('info', {}).get('orderLinkId') or None
+
+
+class OpenOrdersBook:
+    """
+    Account-level view of open orders, indexed by symbol, side and orderLinkId.
+
+    One fetch of every open order on the account serves all symbols for max_age
+    seconds; concurrent readers that find the book stale wait for a single refresh
+    instead of each fetching their symbol. The bot's own creates, amends and cancels
+    are applied to the book as soon as the exchange confirms them, and re-applied on
+    top of any snapshot whose request started before them, so a read right after our
+    own action sees it without another fetch.
+
+    Orders are ccxt order dicts, the same shape fetch_open_orders returns.
+    """
+
+    OVERLAY_TTL = 30  # Seconds a local change is kept for re-applying to older snapshots
+
+    def __init__(self, max_age=2.0):
+        self.max_age = max_age
+        self.lock = threading.RLock()
+        self.refresh_lock = threading.Lock()
+        self.version = 0
+        self.updated_at = None
+        self.orders = {}      # order id -> order
+        self.by_symbol = {}   # symbol -> {order id -> order}
+        self.by_link_id = {}  # orderLinkId -> order id
+        self.overlays = []    # (applied_at, kind, payload), newest last
+        self.listeners = []   # Called with (kind, payload) after every change
+
+    def subscribe(self, listener):
+        """
+        Call listener(kind, payload) after every local change (kinds as in _apply) and
+        listener('snapshot', (orders, requested_at)) after every snapshot.
+        """
+        self.listeners.append(listener)
+
+    def _notify(self, kind, payload):
+        for listener in list(self.listeners):
+            try:
+                listener(kind, payload)
+            except Exception as e:
+                logging.warning(f"Open orders listener failed on {kind}: {e}")
+
+    # Index maintenance (callers hold self.lock)
+
+    def _add(self, order):
+        order_id = order.get('id')
+        if not order_id:
+            return
+        self._remove(order_id)
+        self.orders[order_id] = order
+        self.by_symbol.setdefault(_normalize_symbol(order.get('symbol')), {})[order_id] = order
+        link_id = _link_id(order)
+        if link_id:
+            self.by_link_id[link_id] = order_id
+
+    def _remove(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        symbol = _normalize_symbol(order.get('symbol'))
+        symbol_orders = self.by_symbol.get(symbol)
+        if symbol_orders is not None:
+            symbol_orders.pop(order_id, None)
+            if not symbol_orders:
+                del self.by_symbol[symbol]
+        link_id = _link_id(order)
+        if link_id and self.by_link_id.get(link_id) == order_id:
+            del self.by_link_id[link_id]
+        return order
+
+    def _resolve(self, order_id=None, link_id=None):
+        if order_id in self.orders:
+            return order_id
+        return self.by_link_id.get(link_id) if link_id else None
+
+    def _apply(self, kind, payload):
+        if kind == 'created':
+            if payload.get('status') in (None, 'open'):
+                self._add(payload)
+        elif kind == 'amended':
+            order_id = self._resolve(payload.get('id'), payload.get('link_id'))
+            if order_id is not None:
+                order = dict(self.orders[order_id])
+                info = dict(order.get('info') or {})
+                for field, info_field in (('price', 'price'), ('amount', 'qty')):
+                    if payload.get(field) is not None:
+                        order[field] = payload[field]
+                        info[info_field] = str(payload[field])
+                order['info'] = info
+                if payload.get('amount') is not None:
+                    order['remaining'] = max(payload['amount'] - (order.get('filled') or 0), 0)
+                self._add(order)
+        elif kind == 'cancelled':
+            order_id = self._resolve(payload.get('id'), payload.get('link_id'))
+            if order_id is not None:
+                self._remove(order_id)
+        elif kind == 'cancelled_all':
+            self.orders, self.by_symbol, self.by_link_id = {}, {}, {}
+        elif kind == 'cancelled_symbol':
+            symbol, side = payload
+            for order in list(self.by_symbol.get(symbol, {}).values()):
+                if side is None or order.get('side') == side:
+                    self._remove(order['id'])
+
+    def _record(self, kind, payload):
+        with self.lock:
+            now = time.time()
+            self._apply(kind, payload)
+            self.overlays = [overlay for overlay in self.overlays if now - overlay[0] < self.OVERLAY_TTL]
+            self.overlays.append((now, kind, payload))
+            self.version += 1
+        self._notify(kind, payload)
+
+    # Snapshots
+
+    def update_from_snapshot(self, orders, requested_at):
+        """Replace the book with a full open-orders list fetched by a request sent at requested_at."""
+        with self.lock:
+            self.orders, self.by_symbol, self.by_link_id = {}, {}, {}
+            for order in orders:
+                self._add(order)
+            # Our own changes after the request went out aren't in the snapshot yet
+            for applied_at, kind, payload in self.overlays:
+                if applied_at >= requested_at:
+                    self._apply(kind, payload)
+            self.updated_at = requested_at
+            self.version += 1
+        self._notify('snapshot', (orders, requested_at))
+
+    def refresh(self, fetch_all, force=False):
+        """
+        Bring the book up to date with fetch_all() (every open order on the account) if
+        it is older than max_age. fetch_all's exceptions propagate and leave the book as is.
+        """
+        if not force and not self.is_stale():
+            return
+        with self.refresh_lock:
+            # Another thread may have refreshed while we waited
+            if not force and not self.is_stale():
+                return
+            requested_at = time.time()
+            orders = fetch_all()
+            self.update_from_snapshot(orders, requested_at)
+
+    def is_stale(self):
+        updated_at = self.updated_at
+        return updated_at is None or time.time() - updated_at > self.max_age
+
+    def invalidate(self):
+        with self.lock:
+            self.updated_at = None
+
+    # Reads
+
+    def get(self, symbol, side=None, fetch_all=None):
+        """Open orders for symbol, optionally one side ('buy'/'sell'), refreshing first if stale."""
+        if fetch_all is not None:
+            self.refresh(fetch_all)
+        with self.lock:
+            orders = list(self.by_symbol.get(_normalize_symbol(symbol), {}).values())
+        if side is not None:
+            orders = [order for order in orders if order.get('side') == side]
+        return orders
+
+    def get_by_link_id(self, link_id):
+        with self.lock:
+            order_id = self.by_link_id.get(link_id)
+            return self.orders.get(order_id) if order_id is not None else None
+
+    def symbols(self):
+        with self.lock:
+            return list(self.by_symbol)
+
+    # Local changes
+
+    def apply_created(self, order, symbol, side, amount, price, reduce_only=False, position_idx=0, link_id=None, time_in_force='GTC'):
+        """
+        Record an order the exchange just accepted. Bybit's create response carries
+        little more than the ids, so the fields readers use are filled in from the
+        request, in the layout fetch_open_orders returns.
+        """
+        if not isinstance(order, dict) or not order.get('id') or 'error' in order:
+            return
+        link_id = link_id or _link_id(order)
+        info = dict(order.get('info') or {})
+        info.setdefault('orderId', order['id'])
+        info.setdefault('orderLinkId', link_id or '')
+        info.setdefault('symbol', _normalize_symbol(symbol))
+        info.setdefault('side', side.capitalize())
+        info.setdefault('price', str(price))
+        info.setdefault('qty', str(amount))
+        info.setdefault('reduceOnly', bool(reduce_only))
+        info.setdefault('positionIdx', position_idx)
+        info.setdefault('timeInForce', time_in_force)
+        info.setdefault('orderStatus', 'New')
+        record = dict(order)
+        defaults = {
+            'symbol': symbol, 'side': side, 'price': price, 'amount': amount, 'remaining': amount,
+            'filled': 0.0, 'type': 'limit', 'status': 'open', 'reduceOnly': bool(reduce_only),
+            'clientOrderId': link_id, 'timestamp': int(time.time() * 1000),
+        }
+        for field, value in defaults.items():
+            if record.get(field) is None:
+                record[field] = value
+        record['info'] = info
+        self._record('created', record)
+
+    def apply_amended(self, order_id=None, link_id=None, price=None, amount=None):
+        self._record('amended', {'id': order_id, 'link_id': link_id, 'price': price, 'amount': amount})
+
+    def apply_cancelled(self, order_id=None, link_id=None):
+        self._record('cancelled', {'id': order_id, 'link_id': link_id})
+
+    def apply_cancelled_symbol(self, symbol, side=None):
+        """Record a cancel-all for symbol (one side if given)."""
+        self._record('cancelled_symbol', (_normalize_symbol(symbol), side))
+
+    def apply_cancelled_all(self):
+        """Record a cancel-all across every symbol."""
+        self._record('cancelled_all', None)
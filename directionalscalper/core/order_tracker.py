@@ -0,0 +1,285 @@
+"""
+Local lifecycle of the orders the bot places, keyed by orderLinkId.
+
+new_link_id() hands out ids that never repeat, within a process (a shared sequence)
+or across restarts and processes (a session prefix from the start second, the pid
+modulo 36**2 and two random characters; two processes started in the same second share
+it only if both their pids and the 1 in 36**2 random part coincide), and that can be
+decoded back to the strategy, side, grid level and sequence:
+
+    <strategy>_<side><level>_<session><sequence>_<symbol>
+    e.g. BDGS_b03_lk7x2q1fa90004_BTC
+
+Bybit allows 36 characters, so the symbol is stored without its USDT suffix and
+truncated if needed; the tracker keeps the full symbol locally.
+
+Each order moves through
+
+    pending -> open -> partially_filled -> filled
+                    \\-> cancelled, rejected
+
+and closed when a snapshot shows it is gone without saying whether it filled or was
+cancelled. The tracker follows the account's OpenOrdersBook (our creates, amends,
+cancels and every open-orders snapshot) and Bybit order events passed to
+apply_event(), so "is level N live?" is answered locally.
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="OrderTracker", filename="OrderTracker.log", stream=True)
+
+PENDING = 'pending'
+OPEN = 'open'
+PARTIALLY_FILLED = 'partially_filled'
+FILLED = 'filled'
+CANCELLED = 'cancelled'
+REJECTED = 'rejected'
+CLOSED = 'closed'
+
+LIVE_STATES = (PENDING, OPEN, PARTIALLY_FILLED)
+
+# Bybit v5 orderStatus -> tracker state
+BYBIT_STATUSES = {
+    'New': OPEN,
+    'Untriggered': OPEN,
+    'Triggered': OPEN,
+    'PartiallyFilled': PARTIALLY_FILLED,
+    'Filled': FILLED,
+    'Cancelled': CANCELLED,
+    'PartiallyFilledCanceled': CANCELLED,
+    'Deactivated': CANCELLED,
+    'Rejected': REJECTED,
+}
+
+MAX_LINK_ID_LENGTH = 36
+NO_LEVEL = 'zz'  # Level field of orders that aren't on a grid level
+_BASE36 = '0123456789abcdefghijklmnopqrstuvwxyz'
+_LINK_ID = re.compile(r'^([A-Za-z0-9]{1,4})_([bs])([0-9a-z]{2})_([0-9a-z]{10})([0-9a-z]{4,})_([A-Za-z0-9]*)$')
+
+
+def _base36(number, width):
+    digits = ''
+    while number:
+        number, remainder = divmod(number, 36)
+        digits = _BASE36[remainder] + digits
+    return digits.rjust(width, '0')
+
+
+def _normalize_symbol(symbol):
+    # 'BTC/USDT:USDT' and 'BTCUSDT' both map to 'BTCUSDT'
+    return symbol.split(':')[0].replace('/', '') if symbol else ''
+
+
+def strategy_code(name):
+    """Up to four alphanumeric characters identifying a strategy, e.g. its class name's capitals."""
+    capitals = ''.join(character for character in name if character.isupper() or character.isdigit())
+    code = capitals or re.sub(r'[^A-Za-z0-9]', '', name)
+    return code[:4] or 'ds'
+
+
+def decode_link_id(link_id):
+    """{'strategy', 'side', 'level', 'session', 'sequence', 'symbol'} for ids made by new_link_id(), else None."""
+    match = _LINK_ID.match(link_id or '')
+    if match is None:
+        return None
+    strategy, side, level, session, sequence, symbol = match.groups()
+    return {
+        'strategy': strategy,
+        'side': 'buy' if side == 'b' else 'sell',
+        'level': None if level == NO_LEVEL else int(level, 36),
+        'session': session,
+        'sequence': int(sequence, 36),
+        'symbol': symbol,  # Without the USDT suffix, possibly truncated
+    }
+
+
+class TrackedOrder:
+    def __init__(self, link_id, strategy, symbol, side, level, sequence):
+        self.link_id = link_id
+        self.strategy = strategy
+        self.symbol = symbol
+        self.side = side
+        self.level = level
+        self.sequence = sequence
+        self.state = PENDING
+        self.order_id = None
+        self.price = None
+        self.amount = None
+        self.filled = 0.0
+        self.reason = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    def transition(self, state, reason=None):
+        if state != self.state:
+            logging.info(f"{self.link_id} ({self.symbol} {self.side} level {self.level}): {self.state} -> {state}")
+            self.state = state
+        if reason is not None:
+            self.reason = reason
+        self.updated_at = time.time()
+
+    @property
+    def is_live(self):
+        return self.state in LIVE_STATES
+
+
+class OrderTracker:
+    TERMINAL_TTL = 3600  # Seconds finished orders are kept for lookups
+    PENDING_TIMEOUT = 60  # Seconds a create may stay unconfirmed before its level is freed
+
+    def __init__(self, book=None):
+        self.lock = threading.RLock()
+        self.session = (
+            _base36(int(time.time()), 6)[-6:] + _base36(os.getpid() % 36 ** 2, 2)
+            + ''.join(random.choice(_BASE36) for _ in range(2))
+        )
+        self.sequence = 0
+        self.orders = {}       # orderLinkId -> TrackedOrder
+        self.by_order_id = {}  # exchange order id -> orderLinkId
+        if book is not None:
+            book.subscribe(self.on_book_change)
+
+    # Ids
+
+    def new_link_id(self, strategy, symbol, side, level=None):
+        """A new orderLinkId for an order about to be sent, tracked as pending from now on."""
+        symbol = _normalize_symbol(symbol)
+        side = side.lower()
+        level_field = _base36(level, 2)[-2:] if level is not None and 0 <= level < 36 ** 2 else NO_LEVEL
+        with self.lock:
+            self.sequence += 1
+            sequence = self.sequence
+            prefix = f"{strategy_code(strategy)}_{side[0]}{level_field}_{self.session}{_base36(sequence, 4)}_"
+            short_symbol = symbol[:-4] if symbol.endswith('USDT') else symbol
+            link_id = (prefix + short_symbol)[:MAX_LINK_ID_LENGTH]
+            self.orders[link_id] = TrackedOrder(link_id, strategy, symbol, side, level, sequence)
+            self._prune()
+        return link_id
+
+    # Queries
+
+    def get(self, link_id):
+        with self.lock:
+            return self.orders.get(link_id)
+
+    def live_orders(self, symbol=None, side=None):
+        symbol = _normalize_symbol(symbol) if symbol else None
+        with self.lock:
+            return [
+                order for order in self.orders.values()
+                if order.is_live and symbol in (None, order.symbol) and side in (None, order.side)
+            ]
+
+    def live_levels(self, symbol, side):
+        """Grid levels of symbol/side ('buy'/'sell') with a live order."""
+        return {order.level for order in self.live_orders(symbol, side.lower()) if order.level is not None}
+
+    def live_level_prices(self, symbol, side):
+        """{grid level: price} of symbol/side's live orders; price is None until the order is known."""
+        return {order.level: order.price for order in self.live_orders(symbol, side.lower()) if order.level is not None}
+
+    def is_level_live(self, symbol, side, level):
+        return level in self.live_levels(symbol, side)
+
+    # Updates
+
+    def mark_rejected(self, link_id, reason=None):
+        """The create request for link_id failed or was refused."""
+        with self.lock:
+            order = self.orders.get(link_id)
+            if order is not None and order.is_live:
+                order.transition(REJECTED, reason)
+
+    def apply_event(self, info):
+        """Apply a Bybit v5 order update (REST order info or a websocket 'order' message)."""
+        state = BYBIT_STATUSES.get(info.get('orderStatus'))
+        if state is None:
+            return
+        with self.lock:
+            order = self._lookup(info.get('orderId'), info.get('orderLinkId'))
+            if order is None:
+                return
+            self._update_fields(order, info.get('orderId'), info.get('price'), info.get('qty'), info.get('cumExecQty'))
+            order.transition(state, info.get('rejectReason') if state == REJECTED else None)
+
+    def on_book_change(self, kind, payload):
+        """OpenOrdersBook listener."""
+        with self.lock:
+            if kind == 'snapshot':
+                self._reconcile(*payload)
+            elif kind == 'created':
+                order = self._lookup(payload.get('id'), payload.get('clientOrderId'))
+                if order is not None:
+                    self._update_fields(order, payload.get('id'), payload.get('price'), payload.get('amount'), payload.get('filled'))
+                    if order.state == PENDING:
+                        order.transition(OPEN)
+            elif kind == 'amended':
+                order = self._lookup(payload.get('id'), payload.get('link_id'))
+                if order is not None:
+                    self._update_fields(order, None, payload.get('price'), payload.get('amount'), None)
+            elif kind == 'cancelled':
+                order = self._lookup(payload.get('id'), payload.get('link_id'))
+                if order is not None and order.is_live:
+                    order.transition(CANCELLED)
+            elif kind == 'cancelled_symbol':
+                symbol, side = payload
+                for order in self.orders.values():
+                    if order.is_live and order.state != PENDING and order.symbol == symbol and side in (None, order.side):
+                        order.transition(CANCELLED)
+            elif kind == 'cancelled_all':
+                for order in self.orders.values():
+                    if order.is_live and order.state != PENDING:
+                        order.transition(CANCELLED)
+
+    # Internals (callers hold self.lock)
+
+    def _lookup(self, order_id=None, link_id=None):
+        if link_id and link_id in self.orders:
+            return self.orders[link_id]
+        link_id = self.by_order_id.get(order_id) if order_id else None
+        return self.orders.get(link_id) if link_id else None
+
+    def _update_fields(self, order, order_id, price, amount, filled):
+        if order_id:
+            order.order_id = order_id
+            self.by_order_id[order_id] = order.link_id
+        for field, value in (('price', price), ('amount', amount), ('filled', filled)):
+            if value not in (None, ''):
+                try:
+                    setattr(order, field, float(value))
+                except (TypeError, ValueError):
+                    pass
+
+    def _reconcile(self, orders, requested_at):
+        seen = set()
+        for snapshot_order in orders:
+            link_id = snapshot_order.get('clientOrderId') or snapshot_order.get('info', {}).get('orderLinkId')
+            order = self._lookup(snapshot_order.get('id'), link_id)
+            if order is None:
+                continue
+            seen.add(order.link_id)
+            self._update_fields(order, snapshot_order.get('id'), snapshot_order.get('price'),
+                                snapshot_order.get('amount'), snapshot_order.get('filled'))
+            if order.state in LIVE_STATES:
+                order.transition(PARTIALLY_FILLED if order.filled else OPEN)
+        for order in self.orders.values():
+            if order.link_id in seen:
+                continue
+            if order.state in (OPEN, PARTIALLY_FILLED) and order.updated_at < requested_at:
+                order.transition(CLOSED)
+            # A pending create may not have reached the exchange when the snapshot was taken,
+            # but one that never got an answer shouldn't hold its level forever
+            elif order.state == PENDING and order.created_at < requested_at - self.PENDING_TIMEOUT:
+                order.transition(REJECTED, 'no confirmation')
+
+    def _prune(self):
+        cutoff = time.time() - self.TERMINAL_TTL
+        for link_id in [link_id for link_id, order in self.orders.items() if not order.is_live and order.updated_at < cutoff]:
+            order = self.orders.pop(link_id)
+            if order.order_id:
+                self.by_order_id.pop(order.order_id, None)
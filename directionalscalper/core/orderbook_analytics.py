@@ -0,0 +1,177 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+
+HISTOGRAM_BINS = 100
+WALL_THRESHOLD = 5.0
+
+
+def _levels_to_array(levels):
+    # ccxt books are [[price, amount], ...]; some feeds append extra fields per level
+    if not levels:
+        return np.empty((0, 2), dtype=float)
+    return np.asarray([level[:2] for level in levels], dtype=float)
+
+
+class OrderBookAnalytics:
+    """
+    NumPy view of a single order book snapshot.
+
+    The ccxt list-of-lists book is converted to (n, 2) float arrays once, and every
+    derived result (depth, volume profile, walls, ...) is memoised on the instance, so
+    several strategies asking about the same snapshot only pay for the conversion once.
+    All results are computed in the same order as the original Python loops so they
+    match them exactly.
+    """
+
+    def __init__(self, order_book):
+        self.bids = _levels_to_array(order_book.get('bids'))
+        self.asks = _levels_to_array(order_book.get('asks'))
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def _side(self, side):
+        return self.bids if side in ('bids', 'buy', 'long') else self.asks
+
+    def _memo(self, key, compute):
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+        result = compute()
+        with self._lock:
+            self._results[key] = result
+        return result
+
+    def cumulative_depth(self, side):
+        """Running total of size from the top of the book outwards."""
+        return self._memo(('cumulative_depth', side), lambda: np.cumsum(self._side(side)[:, 1]))
+
+    def depth(self, side, levels):
+        """Total size resting in the top `levels` price levels of a side."""
+        cumulative = self.cumulative_depth(side)
+        if levels <= 0 or cumulative.size == 0:
+            return 0
+        return float(cumulative[min(levels, cumulative.size) - 1])
+
+    def strength(self, depth=10):
+        """Bid share of the top-of-book size, 0.5 when the book is empty."""
+        total_bid_quantity = self.depth('bids', depth)
+        total_ask_quantity = self.depth('asks', depth)
+        if (total_bid_quantity + total_ask_quantity) == 0:
+            return 0.5  # Neutral strength
+        return total_bid_quantity / (total_bid_quantity + total_ask_quantity)
+
+    def imbalance(self, depth):
+        """'buy_wall', 'sell_wall' or 'neutral' depending on which side has more size."""
+        total_bids = self.depth('bids', depth)
+        total_asks = self.depth('asks', depth)
+        if total_bids > total_asks:
+            return "buy_wall"
+        elif total_asks > total_bids:
+            return "sell_wall"
+        return "neutral"
+
+    def walls(self, side, threshold=WALL_THRESHOLD, sample_size=10):
+        """
+        Levels whose size exceeds `threshold` times the average size of the top
+        `sample_size` levels. Returns a list of (price, size) tuples.
+        """
+        def compute():
+            orders = self._side(side)
+            avg_size = self.depth(side, sample_size) / sample_size
+            mask = orders[:, 1] > avg_size * threshold
+            return [tuple(level) for level in orders[mask].tolist()]
+        return self._memo(('walls', side, threshold, sample_size), compute)
+
+    def significant_walls(self, side, current_price, size_threshold, base_threshold_factor, proximity_threshold, sample_size=20):
+        """
+        Walls that are both larger than max(size_threshold, avg_size * base_threshold_factor)
+        and within proximity_threshold of current_price.
+        """
+        orders = self._side(side)
+        avg_size = self.depth(side, sample_size) / sample_size
+        mask = (orders[:, 1] > max(size_threshold, avg_size * base_threshold_factor)) & (np.abs(orders[:, 0] - current_price) <= proximity_threshold)
+        return [tuple(level) for level in orders[mask].tolist()]
+
+    def volume_profile(self, current_price, max_outer_price_distance, bins=HISTOGRAM_BINS):
+        """
+        Bid volume below and ask volume above current_price, binned over
+        current_price +/- max_outer_price_distance.
+
+        Returns (min_price, max_price, price_range, volume_histogram_long, volume_histogram_short).
+        """
+        def compute():
+            min_price = current_price - max_outer_price_distance * current_price
+            max_price = current_price + max_outer_price_distance * current_price
+            price_range = np.arange(min_price, max_price, (max_price - min_price) / bins)
+
+            def histogram(orders, low, high):
+                prices, volumes = orders[:, 0], orders[:, 1]
+                mask = (prices >= low) & (prices <= high)
+                index = ((prices[mask] - min_price) / (max_price - min_price) * bins).astype(int)
+                # A level sitting exactly on the upper edge falls outside the last bin
+                in_range = index < price_range.size
+                return np.bincount(index[in_range], weights=volumes[mask][in_range], minlength=price_range.size)[:price_range.size]
+
+            volume_histogram_long = histogram(self.bids, min_price, current_price)
+            volume_histogram_short = histogram(self.asks, current_price, max_price)
+            return min_price, max_price, price_range, volume_histogram_long, volume_histogram_short
+        return self._memo(('volume_profile', current_price, max_outer_price_distance, bins), compute)
+
+    def volume_weighted_levels(self, side, levels, current_price, buffer_percentage, reverse=False):
+        """
+        Prices walked while accumulating size up to np.linspace(0.1, 1, levels) of the
+        side's total volume, keeping the first level and those within buffer_percentage
+        of current_price.
+        """
+        orders = self._side(side)
+        if reverse:
+            orders = orders[::-1]
+        if levels <= 0 or orders.shape[0] == 0:
+            return []
+        prices, volumes = orders[:, 0], orders[:, 1]
+        cumulative = np.cumsum(volumes)
+        last_threshold = (np.linspace(0.1, 1, levels) * cumulative[-1])[-1]
+        # A level is consumed while the volume before it is still below the last threshold
+        volume_before = np.concatenate(([0.0], cumulative[:-1]))
+        consumed = volume_before < last_threshold
+        within_buffer = np.abs(prices - current_price) / current_price <= buffer_percentage
+        within_buffer[0] = True
+        return prices[consumed & within_buffer].tolist()
+
+
+def significant_levels(volume_histogram, price_range, factor=1.5):
+    """Bins holding at least `factor` times the mean binned volume."""
+    volume_threshold = np.mean(volume_histogram) * factor
+    return volume_threshold, price_range[volume_histogram >= volume_threshold]
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_CACHE_SIZE = 256
+
+
+def get_orderbook_analytics(order_book):
+    """
+    Return the OrderBookAnalytics for a book, reusing it for the same book version.
+
+    Books returned by Exchange.get_orderbook carry symbol/timestamp/nonce, which is used
+    as the version key; books without them are analysed without caching.
+    """
+    symbol, timestamp, nonce = order_book.get('symbol'), order_book.get('timestamp'), order_book.get('nonce')
+    if symbol is None or (timestamp is None and nonce is None):
+        return OrderBookAnalytics(order_book)
+
+    key = (symbol, timestamp, nonce)
+    with _cache_lock:
+        analytics = _cache.get(key)
+        if analytics is not None:
+            _cache.move_to_end(key)
+            return analytics
+
+    analytics = OrderBookAnalytics(order_book)
+    with _cache_lock:
+        _cache[key] = analytics
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return analytics
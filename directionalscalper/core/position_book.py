@@ -0,0 +1,226 @@
+import threading
+import time
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="PositionBook", filename="PositionBook.log", stream=True)
+
+
+def _to_float(value, default=0.0):
+    try:
+        return float(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _normalize_symbol(symbol):
+    # 'BTC/USDT:USDT' and 'BTCUSDT' both map to 'BTCUSDT'
+    return symbol.split(':')[0].replace('/', '') if symbol else ''
+
+
+class PositionBook:
+    """
+    Account-level view of open positions keyed by (symbol, side).
+
+    The book is rebuilt once per positions snapshot (or patched by a single position
+    event) and every strategy thread reads from it, so per-iteration lookups cost one
+    dict access no matter how many positions are open. `version` is bumped on every
+    change; readers can compare it to skip work when nothing moved.
+
+    Sides are 'long' and 'short', matching the position_details layout the strategies
+    already use.
+    """
+
+    EMPTY_RECORD = {'qty': 0, 'avg_price': 0, 'upnl': 0, 'leverage': None, 'liq_price': None, 'position_balance': 0, 'mark_price': 0}
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.changed = threading.Condition(self.lock)
+        self.version = 0
+        self.updated_at = None
+        self.positions = []           # Raw snapshot the book was built from
+        self.records = {}             # (symbol, side) -> record
+        self.position_details = {}    # symbol -> {'long': record, 'short': record}
+        self.open_symbols = []        # Symbols with an open position, in snapshot order
+        self.open_symbol_set = frozenset()
+
+    @staticmethod
+    def _side_from_info(info):
+        side = (info.get('side') or '').lower()
+        if side == 'buy':
+            return 'long'
+        if side == 'sell':
+            return 'short'
+        return None
+
+    @staticmethod
+    def _record_from_position(position):
+        info = position.get('info', {})
+        return {
+            'qty': _to_float(info.get('size')),
+            'avg_price': _to_float(info.get('avgPrice')),
+            'upnl': _to_float(info.get('unrealisedPnl')),
+            'leverage': _to_float(info.get('leverage'), None),
+            'liq_price': info.get('liqPrice', None),
+            'position_balance': _to_float(info.get('positionBalance')),
+            'mark_price': _to_float(info.get('markPrice')),
+        }
+
+    def _rebuild_views(self):
+        details = {}
+        for (symbol, side), record in self.records.items():
+            entry = details.get(symbol)
+            if entry is None:
+                entry = details[symbol] = {'long': dict(self.EMPTY_RECORD), 'short': dict(self.EMPTY_RECORD)}
+            entry[side] = record
+        self.position_details = details
+        self.open_symbols = [symbol for symbol in details if any(entry['qty'] for entry in details[symbol].values())]
+        self.open_symbol_set = frozenset(self.open_symbols)
+
+    def _publish(self):
+        self.version += 1
+        self.updated_at = time.time()
+        self.changed.notify_all()
+
+    def update_from_snapshot(self, positions):
+        """Replace the book with a full positions snapshot (ccxt fetch_positions output)."""
+        records = {}
+        for position in positions:
+            info = position.get('info', {})
+            side = self._side_from_info(info)
+            if side is None or 'size' not in info or 'avgPrice' not in info:
+                logging.warning(f"Missing required keys in position info for {info.get('symbol')}")
+                continue
+            symbol = _normalize_symbol(info.get('symbol') or position.get('symbol'))
+            record = self._record_from_position(position)
+            existing = records.get((symbol, side))
+            if existing is not None:
+                # Hedge-mode duplicates of the same side are summed, like the old per-thread scan
+                record['qty'] += existing['qty']
+            records[(symbol, side)] = record
+
+        with self.lock:
+            self.positions = positions
+            self.records = records
+            self._rebuild_views()
+            self._publish()
+
+    @classmethod
+    def from_positions(cls, positions):
+        """Build a standalone book for a positions list that didn't come from the shared snapshot."""
+        book = cls()
+        book.update_from_snapshot(positions)
+        return book
+
+    def snapshot(self):
+        """Return (positions, position_details, open_symbols) from the same version."""
+        with self.lock:
+            return self.positions, self.position_details, self.open_symbols
+
+    def apply_position_event(self, info):
+        """
+        Patch a single (symbol, side) from a position update in Bybit v5 format
+        (e.g. a websocket 'position' message), without waiting for the next snapshot.
+        """
+        side = self._side_from_info(info)
+        symbol = _normalize_symbol(info.get('symbol'))
+        if side is None or not symbol:
+            return
+        record = self._record_from_position({'info': info})
+        with self.lock:
+            if record['qty']:
+                self.records[(symbol, side)] = record
+            else:
+                self.records.pop((symbol, side), None)
+            self._rebuild_views()
+            self._publish()
+
+    def get(self, symbol, side):
+        """Return the record for symbol and side ('long'/'short'), or an empty record."""
+        record = self.records.get((_normalize_symbol(symbol), side))
+        return record if record is not None else dict(self.EMPTY_RECORD)
+
+    def get_details(self, symbol):
+        """Return {'long': record, 'short': record} for symbol."""
+        details = self.position_details.get(_normalize_symbol(symbol))
+        if details is None:
+            return {'long': dict(self.EMPTY_RECORD), 'short': dict(self.EMPTY_RECORD)}
+        return details
+
+    def position_balance(self, symbol, side):
+        """Position balance for a Bybit side ('Buy'/'Sell') or book side ('long'/'short')."""
+        side = {'buy': 'long', 'sell': 'short'}.get(side.lower(), side.lower())
+        return self.get(symbol, side)['position_balance']
+
+    def is_open(self, symbol):
+        return _normalize_symbol(symbol) in self.open_symbol_set
+
+    def wait_for_update(self, seen_version, timeout=None):
+        """Block until the book moves past seen_version; returns the current version."""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != seen_version, timeout=timeout)
+            return self.version
+
+    def watch(self, symbol, side, timeout=None, cancel=None):
+        """A PositionWatch on symbol/side starting from the current quantity."""
+        return PositionWatch(self, symbol, side, timeout, cancel)
+
+
+class PositionWatch:
+    """
+    Resolves when the book shows a different quantity for symbol/side than when the
+    watch started (a fill or any other position change), when `timeout` seconds pass,
+    or when `cancel` (a threading.Event or a callable returning True) is set.
+
+    poll() never blocks, so a strategy can check the watch once per iteration and keep
+    managing the other side and its take profits meanwhile; wait() blocks on the book's
+    update signal instead of sleeping in fixed slices.
+    """
+
+    CHANGED = 'changed'
+    TIMED_OUT = 'timed_out'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, book, symbol, side, timeout=None, cancel=None):
+        self.book = book
+        self.symbol = symbol
+        self.side = side
+        self.timeout = timeout
+        self.cancel = cancel
+        self.started_at = time.monotonic()
+        self.baseline = book.get(symbol, side)['qty']
+        self.qty = self.baseline
+        self.result = None
+
+    def _cancelled(self):
+        if self.cancel is None:
+            return False
+        return self.cancel.is_set() if hasattr(self.cancel, 'is_set') else bool(self.cancel())
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def poll(self):
+        """The result if the watch has resolved, otherwise None."""
+        if self.result is None:
+            self.qty = self.book.get(self.symbol, self.side)['qty']
+            if abs(self.qty - self.baseline) > 1e-12:
+                self.result = self.CHANGED
+            elif self._cancelled():
+                self.result = self.CANCELLED
+            elif self.timeout is not None and self.elapsed() >= self.timeout:
+                self.result = self.TIMED_OUT
+        return self.result
+
+    def wait(self, timeout=None, check_interval=1.0):
+        """
+        Block until the watch resolves or `timeout` seconds pass; returns poll(). Wakes on
+        every book update, and at least every check_interval seconds to see `cancel`.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        version = self.book.version
+        while self.poll() is None:
+            remaining = check_interval if deadline is None else min(check_interval, deadline - time.monotonic())
+            if remaining <= 0:
+                break
+            version = self.book.wait_for_update(version, remaining)
+        return self.result
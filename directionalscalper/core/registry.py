@@ -0,0 +1,166 @@
+"""
+Name-based lookup of strategy and exchange classes, plus lazy imports of heavy modules.
+
+A run trades one strategy on one exchange, so classes are registered as
+"module:ClassName" strings and only the requested module is imported, on first use.
+lazy_import() stands in for numeric libraries (pandas, ta, scikit-learn, scipy) at
+module level and imports them the first time an attribute is read, so code that
+never touches them never pays for them. startup_report() logs elapsed time, resident
+memory and which heavy modules are loaded.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="Registry", filename="Registry.log", stream=True)
+
+HEAVY_MODULES = ('pandas', 'numpy', 'scipy', 'sklearn', 'ta', 'ccxt')
+
+_import_lock = threading.RLock()
+
+
+class LazyModule:
+    """Module proxy that imports `name` on first attribute access."""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _import_lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    self.__dict__['_module'] = module
+                    logging.info(f"Lazily imported {self._name} in {time.perf_counter() - started:.3f}s")
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """The module itself if it is already imported, otherwise a LazyModule for it."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
+
+
+class PluginRegistry:
+    """Maps names to "module:ClassName" targets and imports a target the first time it is asked for."""
+
+    def __init__(self, kind, entries=None):
+        self.kind = kind
+        self.lock = threading.RLock()
+        self.entries = dict(entries or {})
+        self.loaded = {}
+
+    def register(self, name, target):
+        with self.lock:
+            self.entries[name.lower()] = target
+            self.loaded.pop(name.lower(), None)
+
+    def names(self):
+        return list(self.entries)
+
+    def __contains__(self, name):
+        return name.lower() in self.entries
+
+    def get(self, name, default=None):
+        """The class registered under `name`, importing its module if needed; `default` if unknown."""
+        name = name.lower()
+        with self.lock:
+            if name in self.loaded:
+                return self.loaded[name]
+            target = self.entries.get(name)
+            if target is None:
+                return default
+            module_name, class_name = target.split(':')
+            started = time.perf_counter()
+            with _import_lock:
+                cls = getattr(importlib.import_module(module_name), class_name)
+            self.loaded[name] = cls
+        logging.info(f"Loaded {self.kind} '{name}' ({class_name}) in {time.perf_counter() - started:.3f}s")
+        return cls
+
+
+_INSTANT_SIGNALS = 'directionalscalper.core.strategies.bybit.notional.instantsignals'
+_SCALPING = 'directionalscalper.core.strategies.bybit.scalping'
+_HEDGING = 'directionalscalper.core.strategies.bybit.hedging'
+
+strategies = PluginRegistry('strategy', {
+    'bybit_1m_qfl_mfi_eri_walls': f'{_SCALPING}.bybit_mm_onemin_qfl_mfi_eri_walls:BybitMMOneMinuteQFLMFIERIWalls',
+    'bybit_1m_qfl_mfi_eri_autohedge_walls_atr': f'{_HEDGING}.bybit_mm_onemin_qfl_mfi_eri_walls_autohedge_atr:BybitMMOneMinuteQFLMFIERIAutoHedgeWallsATR',
+    'bybit_mfirsi_imbalance': f'{_SCALPING}.mfirsi_eri_ob_imbalance:BybitMFIRSIERIOBImbalance',
+    'bybit_mfirsi_quickscalp': f'{_SCALPING}.mfi_quickscalp:BybitMFIRSIQuickScalp',
+    'qsematrend': f'{_SCALPING}.quickscalp_ematrend:BybitQuickScalpEMATrend',
+    'qstrend_dca': f'{_SCALPING}.quickscalp_trend_dca:BybitQuickScalpTrendDCA',
+    'mfieritrend': f'{_SCALPING}.mfi_eri_long_short_trend:BybitMFIERILongShortTrend',
+    'qstrendlongonly': f'{_SCALPING}.mfi_quickscalp_long:BybitMFIRSIQuickScalpLong',
+    'qstrendshortonly': f'{_SCALPING}.mfi_quickscalp_short:BybitMFIRSIQuickScalpShort',
+    'qstrend_unified': f'{_SCALPING}.quickscalp_trend_unified:BybitQuickScalpUnified',
+    'basicgrid': f'{_SCALPING}.basicgrid:BybitBasicGrid',
+    'qstrendspot': f'{_SCALPING}.quickscalp_trend_spot:BybitQuickScalpTrendSpot',
+    'qsgridinstantsignal': f'{_INSTANT_SIGNALS}.dynamicgrid_sr_ob_instantsignal:BybitDynamicGridSpanOBSRStaticIS',
+    'qsgriddynmaicgridspaninstant': f'{_INSTANT_SIGNALS}.dynamicgrid_dynamictp_gridspan:BybitDynamicGridSpanIS',
+    'qstrendobdynamictp': f'{_INSTANT_SIGNALS}.qstrendob_dynamictp:BybitQuickScalpTrendDynamicTP',
+    'qsgridob': f'{_INSTANT_SIGNALS}.dynamicgrid_oblevels_l:BybitDynamicGridSpanOBLevelsLSignal',
+})
+
+exchanges = PluginRegistry('exchange', {
+    'exchange': 'directionalscalper.core.exchanges.exchange:Exchange',
+    'bybit': 'directionalscalper.core.exchanges.bybit:BybitExchange',
+    'bybit_spot': 'directionalscalper.core.exchanges.bybit:BybitExchange',
+    'hyperliquid': 'directionalscalper.core.exchanges.hyperliquid:HyperLiquidExchange',
+    'huobi': 'directionalscalper.core.exchanges.huobi:HuobiExchange',
+    'bitget': 'directionalscalper.core.exchanges.bitget:BitgetExchange',
+    'binance': 'directionalscalper.core.exchanges.binance:BinanceExchange',
+    'mexc': 'directionalscalper.core.exchanges.mexc:MexcExchange',
+    'lbank': 'directionalscalper.core.exchanges.lbank:LBankExchange',
+    'blofin': 'directionalscalper.core.exchanges.blofin:BlofinExchange',
+})
+
+
+def resident_memory_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except (ImportError, OSError):
+        return None
+
+
+def startup_report(label, started):
+    """Log time since `started` (a time.perf_counter() value), RSS and the heavy modules loaded so far."""
+    rss = resident_memory_mb()
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    rss_text = f"{rss:.1f} MB" if rss is not None else "unknown"
+    logging.info(
+        f"{label}: {time.perf_counter() - started:.2f}s since start, RSS {rss_text}, "
+        f"heavy modules loaded: {', '.join(loaded) or 'none'} (pid {os.getpid()})"
+    )
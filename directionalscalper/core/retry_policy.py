@@ -0,0 +1,235 @@
+"""
+One retry policy for every exchange call, with per-call deadlines and per-endpoint circuit breakers.
+
+Errors are sorted into classes before anything is retried:
+
+- rate_limit: the exchange is throttling us (ccxt RateLimitExceeded, DDoSProtection)
+- maintenance: the exchange is down or in maintenance (ExchangeNotAvailable, OnMaintenance)
+- network: timeouts, dropped connections and other transport failures
+- auth: bad keys, missing permissions, suspended account
+- invalid_order: the request itself is wrong (InvalidOrder, InsufficientFunds, BadRequest, BadSymbol)
+- exchange: any other error reported by the exchange
+- unknown: anything else
+
+auth and invalid_order are raised at once, since sending the same request again gives
+the same answer. The other classes are retried with jittered exponential backoff until
+the call's deadline; a retry that would end past the deadline is not started.
+
+Each endpoint (the name of the function called) has a CircuitBreaker. After
+failure_threshold consecutive network or maintenance failures it opens, and calls to
+that endpoint raise CircuitOpenError straight away instead of waiting out their
+deadline. After reset_timeout one probe call is let through (half-open): success closes
+the breaker, failure opens it for another reset_timeout.
+
+The clock and sleep are injectable, so a stand-in function that raises chosen errors
+can drive the policy without real delays.
+"""
+
+import random
+import threading
+import time
+
+import ccxt
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="RetryPolicy", filename="RetryPolicy.log", stream=True)
+
+RATE_LIMIT = 'rate_limit'
+MAINTENANCE = 'maintenance'
+NETWORK = 'network'
+AUTH = 'auth'
+INVALID_ORDER = 'invalid_order'
+EXCHANGE = 'exchange'
+UNKNOWN = 'unknown'
+
+RETRYABLE = (RATE_LIMIT, MAINTENANCE, NETWORK, EXCHANGE, UNKNOWN)
+# Failures that say the endpoint is unhealthy, rather than this one request
+BREAKER_FAILURES = (MAINTENANCE, NETWORK)
+
+# First backoff step per class, in seconds; doubled on every retry up to max_delay
+BASE_DELAYS = {
+    RATE_LIMIT: 1.0,
+    MAINTENANCE: 5.0,
+    NETWORK: 0.5,
+    EXCHANGE: 1.0,
+    UNKNOWN: 1.0,
+}
+
+# Checked in order: several ccxt classes derive from NetworkError
+_CLASSES = (
+    ((ccxt.RateLimitExceeded, ccxt.DDoSProtection), RATE_LIMIT),
+    ((ccxt.OnMaintenance, ccxt.ExchangeNotAvailable), MAINTENANCE),
+    ((ccxt.NetworkError, RequestsConnectionError, RequestsTimeout, ConnectionError, TimeoutError), NETWORK),
+    ((ccxt.AuthenticationError, ccxt.PermissionDenied, ccxt.AccountSuspended), AUTH),
+    ((ccxt.InvalidOrder, ccxt.InsufficientFunds, ccxt.BadRequest, ccxt.BadSymbol, ccxt.ArgumentsRequired), INVALID_ORDER),
+    ((ccxt.ExchangeError,), EXCHANGE),
+)
+
+
+def classify(error):
+    """The class of `error`, one of the constants above."""
+    for types, error_class in _CLASSES:
+        if isinstance(error, types):
+            return error_class
+    return UNKNOWN
+
+
+class RetryError(Exception):
+    """A call failed and was not retried further; `error` is the last failure and `error_class` its class."""
+
+    def __init__(self, message, error=None, error_class=None):
+        super().__init__(message)
+        self.error = error
+        self.error_class = error_class
+
+
+class CircuitOpenError(RetryError):
+    """The endpoint's circuit breaker is open; the call was not sent."""
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go out now; in half-open only one probe may."""
+        with self.lock:
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"Circuit open for {self.name}, retry in {self.retry_in():.1f}s")
+                self._transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self.probing:
+                    raise CircuitOpenError(f"Circuit half-open for {self.name}, probe in flight")
+                self.probing = True
+
+    def retry_in(self):
+        if self.state != self.OPEN:
+            return 0.0
+        return max(self.reset_timeout - (self.clock() - self.opened_at), 0.0)
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.probing = False
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self, counts=True):
+        """A failed call; `counts` is False for failures that say nothing about the endpoint's health."""
+        with self.lock:
+            was_probe = self.probing
+            self.probing = False
+            if not counts:
+                if was_probe:
+                    self._transition(self.CLOSED)  # The endpoint answered
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+                if self.state != self.OPEN:
+                    self._transition(self.OPEN)
+
+    def _transition(self, state):
+        logging.warning(f"Circuit for {self.name}: {self.state} -> {state} ({self.failures} consecutive failures)")
+        self.state = state
+        if state == self.CLOSED:
+            self.failures = 0
+
+
+class RetryPolicy:
+    def __init__(self, deadline=30, max_delay=10, failure_threshold=5, reset_timeout=30,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.deadline = deadline
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.breakers = {}
+
+    def breaker(self, endpoint):
+        with self.lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                breaker = self.breakers[endpoint] = CircuitBreaker(
+                    endpoint, self.failure_threshold, self.reset_timeout, self.clock
+                )
+            return breaker
+
+    def open_circuits(self):
+        """{endpoint: seconds until the next probe} for every breaker not closed."""
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return {breaker.name: breaker.retry_in() for breaker in breakers if breaker.state != CircuitBreaker.CLOSED}
+
+    def backoff(self, error_class, attempt, base_delay=None, max_delay=None):
+        """Delay before retry number `attempt` (1-based): half the exponential step plus up to as much jitter."""
+        base = base_delay if base_delay is not None else BASE_DELAYS.get(error_class, 1.0)
+        step = min(base * (2 ** (attempt - 1)), max_delay if max_delay is not None else self.max_delay)
+        return step / 2 + random.uniform(0, step / 2)
+
+    def execute(self, function, args=(), kwargs=None, endpoint=None, deadline=None, max_attempts=None,
+                base_delay=None, max_delay=None, rate_limiter=None):
+        """
+        Call function(*args, **kwargs) under the policy and return its result.
+
+        Raises the original error for auth and invalid_order failures, CircuitOpenError when
+        the endpoint's breaker is open, and RetryError once the deadline or max_attempts is
+        used up. A RetryError raised by function itself (a nested execute) is passed on
+        without another round of retries. A rate_limiter (RateLimit) is entered around
+        every attempt.
+        """
+        kwargs = kwargs or {}
+        endpoint = endpoint or getattr(function, '__name__', None) or type(function).__name__
+        breaker = self.breaker(endpoint)
+        deadline_at = self.clock() + (deadline if deadline is not None else self.deadline)
+        attempt = 0
+
+        while True:
+            attempt += 1
+            breaker.before_call()
+            try:
+                if rate_limiter is not None:
+                    with rate_limiter:
+                        result = function(*args, **kwargs)
+                else:
+                    result = function(*args, **kwargs)
+            except RetryError:
+                # A nested call already retried this under its own deadline; don't multiply the waits
+                breaker.record_failure(counts=False)
+                raise
+            except Exception as e:
+                error_class = classify(e)
+                breaker.record_failure(counts=error_class in BREAKER_FAILURES)
+                if error_class not in RETRYABLE:
+                    logging.info(f"{endpoint} failed with a {error_class} error, not retrying: {e}")
+                    raise
+                if max_attempts is not None and attempt >= max_attempts:
+                    raise RetryError(f"{endpoint} failed after {attempt} attempts: {e}", e, error_class) from e
+                delay = self.backoff(error_class, attempt, base_delay, max_delay)
+                remaining = deadline_at - self.clock()
+                if delay > remaining:
+                    raise RetryError(
+                        f"{endpoint} failed after {attempt} attempts, deadline reached: {e}", e, error_class
+                    ) from e
+                logging.info(f"{endpoint} {error_class} error (attempt {attempt}): {e}. Retrying in {delay:.2f}s")
+                self.sleep(delay)
+            else:
+                breaker.record_success()
+                return result
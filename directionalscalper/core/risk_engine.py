@@ -0,0 +1,236 @@
+"""
+Account-level risk for every open position, evaluated in one vectorised pass.
+
+Each strategy thread used to work out exposure, uPnL and its auto-reduce and failsafe
+triggers for its own symbol, with its own positions, ticker and balance calls, so
+threads could judge the same account differently and the cost grew with the symbol
+count. RiskEngine reads the shared PositionBook and the latest price of every symbol
+(fed by get_current_price; the positions snapshot's mark price until one arrives) and
+evaluates all positions as NumPy arrays. A pass runs only when a position, a price or
+the equity changed; in between every thread gets the same RiskReport.
+
+Limits can differ per symbol, so they are not stored on the shared engine: each
+caller passes its own, and the trigger masks are computed (vectorised, and cached per
+set of limits on the report) from the shared columns. actions(symbol, limits) lists
+the reduce actions for that symbol's thread to carry out, for as long as they hold.
+
+Limits (a dict; missing or None disables a check):
+
+- auto_reduce_start_pct: adverse price move from entry, as a fraction
+- upnl_auto_reduce_threshold_long/short: loss as a percentage of equity
+- failsafe_start_pct, long/short_failsafe_upnl_pct: the same for the failsafe
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="RiskEngine", filename="RiskEngine.log", stream=True)
+
+AUTO_REDUCE = 'auto_reduce'
+FAILSAFE = 'failsafe'
+
+DEFAULT_LIMITS = {
+    'auto_reduce_start_pct': None,
+    'upnl_auto_reduce_threshold_long': None,
+    'upnl_auto_reduce_threshold_short': None,
+    'failsafe_start_pct': None,
+    'long_failsafe_upnl_pct': None,
+    'short_failsafe_upnl_pct': None,
+}
+
+
+def _to_float(value, default=0.0):
+    try:
+        return float(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _normalize_symbol(symbol):
+    # 'BTC/USDT:USDT' and 'BTCUSDT' both map to 'BTCUSDT'
+    return symbol.split(':')[0].replace('/', '') if symbol else ''
+
+
+def _limit(value):
+    # Comparisons against NaN are always False, so a missing limit never triggers
+    return np.nan if value is None else float(value)
+
+
+class RiskReport:
+    """One evaluation of every open position; columns are arrays aligned with `keys`."""
+
+    def __init__(self, keys, columns, equity, created_at=None):
+        self.keys = keys  # [(symbol, side)]
+        self.columns = columns
+        self.index = {key: position for position, key in enumerate(keys)}
+        self.equity = equity
+        self.created_at = created_at or time.time()
+        self.total_notional = float(columns['notional'].sum()) if keys else 0.0
+        self.total_upnl = float(columns['upnl'].sum()) if keys else 0.0
+        self.exposure_pct = self.total_notional / equity * 100 if equity else None
+        self.lock = threading.Lock()
+        self.trigger_cache = {}  # limits key -> {kind: mask}
+
+    def triggers(self, limits):
+        """{AUTO_REDUCE: mask, FAILSAFE: mask} over every position for these limits."""
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        key = tuple(sorted(limits.items()))
+        with self.lock:
+            cached = self.trigger_cache.get(key)
+        if cached is not None:
+            return cached
+        if not self.keys:
+            return {AUTO_REDUCE: np.zeros(0, dtype=bool), FAILSAFE: np.zeros(0, dtype=bool)}
+
+        is_long = self.columns['is_long']
+        adverse_move = self.columns['adverse_move']
+        upnl_pct = self.columns['upnl_pct']
+        with np.errstate(invalid='ignore'):
+            auto_reduce_threshold = np.where(
+                is_long, _limit(limits['upnl_auto_reduce_threshold_long']), _limit(limits['upnl_auto_reduce_threshold_short'])
+            )
+            auto_reduce = (adverse_move > _limit(limits['auto_reduce_start_pct'])) & (upnl_pct < -auto_reduce_threshold)
+
+            failsafe_threshold = np.where(
+                is_long, _limit(limits['long_failsafe_upnl_pct']), _limit(limits['short_failsafe_upnl_pct'])
+            )
+            failsafe = (adverse_move > _limit(limits['failsafe_start_pct'])) & (upnl_pct < -failsafe_threshold)
+
+        masks = {AUTO_REDUCE: auto_reduce, FAILSAFE: failsafe}
+        with self.lock:
+            self.trigger_cache[key] = masks
+        return masks
+
+    def get(self, symbol, side, limits=None):
+        """
+        {column: value} for symbol and side ('long'/'short'), or None without an open
+        position; with limits, also each check's result under them.
+        """
+        position = self.index.get((_normalize_symbol(symbol), side))
+        if position is None:
+            return None
+        row = {name: column[position].item() for name, column in self.columns.items()}
+        row['symbol'], row['side'] = self.keys[position]
+        if limits is not None:
+            for kind, mask in self.triggers(limits).items():
+                row[kind] = bool(mask[position])
+        return row
+
+    def triggered(self, kind, limits):
+        """[(symbol, side)] whose `kind` check (AUTO_REDUCE or FAILSAFE) fires under limits."""
+        if not self.keys:
+            return []
+        return [self.keys[position] for position in np.flatnonzero(self.triggers(limits)[kind])]
+
+
+class RiskEngine:
+    def __init__(self, book):
+        self.book = book
+        self.lock = threading.Lock()
+        self.prices = {}  # symbol -> latest price
+        self.price_version = 0
+        self.equity = None
+        self.report = None
+        self.report_key = None
+
+    # Inputs
+
+    def update_price(self, symbol, price):
+        price = _to_float(price, None)
+        if not price or price <= 0:
+            return
+        symbol = _normalize_symbol(symbol)
+        with self.lock:
+            if self.prices.get(symbol) != price:
+                self.prices[symbol] = price
+                self.price_version += 1
+
+    def update_equity(self, equity):
+        equity = _to_float(equity, None)
+        if equity is None or equity <= 0:
+            return
+        with self.lock:
+            self.equity = equity
+
+    # Evaluation
+
+    def evaluate(self, equity=None):
+        """The RiskReport for the current positions, prices and equity, recomputed only if one changed."""
+        if equity is not None:
+            self.update_equity(equity)
+        with self.book.lock:
+            records = dict(self.book.records)
+            book_version = self.book.version
+        with self.lock:
+            key = (book_version, self.price_version, self.equity)
+            if self.report is not None and self.report_key == key:
+                return self.report
+            report = self._evaluate(records)
+            self.report, self.report_key = report, key
+            return report
+
+    def _evaluate(self, records):
+        keys = [key for key, record in records.items() if record['qty']]
+        if not keys:
+            return RiskReport([], {}, self.equity)
+        rows = [records[key] for key in keys]
+
+        qty = np.array([record['qty'] for record in rows], dtype=float)
+        entry = np.array([record['avg_price'] for record in rows], dtype=float)
+        price = np.array([
+            self.prices.get(symbol) or record.get('mark_price') or record['avg_price']
+            for (symbol, _), record in zip(keys, rows)
+        ], dtype=float)
+        liq_price = np.array([_to_float(record['liq_price']) for record in rows], dtype=float)
+        is_long = np.array([side == 'long' for _, side in keys])
+        sign = np.where(is_long, 1.0, -1.0)
+        equity = self.equity if self.equity else np.nan
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            notional = qty * price
+            upnl = sign * (price - entry) * qty
+            upnl_pct = upnl / equity * 100
+            exposure_pct = notional / equity * 100
+            # Positive when the price has moved against the position
+            adverse_move = np.where(entry > 0, sign * (entry - price) / entry, 0.0)
+            liq_distance = np.where(liq_price > 0, sign * (price - liq_price) / price, np.inf)
+
+        columns = {
+            'qty': qty,
+            'entry_price': entry,
+            'price': price,
+            'notional': notional,
+            'upnl': upnl,
+            'upnl_pct': upnl_pct,
+            'exposure_pct': exposure_pct,
+            'adverse_move': adverse_move,
+            'liq_price': liq_price,
+            'liq_distance': liq_distance,
+            'is_long': is_long,
+        }
+        return RiskReport(keys, columns, self.equity)
+
+    # Dispatch
+
+    def actions(self, symbol, limits, kind=None):
+        """Reduce actions for symbol's positions under the caller's limits, optionally only one kind."""
+        report = self.evaluate()
+        actions = []
+        for side in ('long', 'short'):
+            row = report.get(symbol, side, limits)
+            if row is None:
+                continue
+            for action_kind in (AUTO_REDUCE, FAILSAFE):
+                if row[action_kind] and kind in (None, action_kind):
+                    actions.append({
+                        'kind': action_kind, 'symbol': row['symbol'], 'side': side, 'qty': row['qty'],
+                        'price': row['price'], 'upnl_pct': row['upnl_pct'], 'at': report.created_at,
+                    })
+        return actions
+
+    def is_triggered(self, symbol, side, kind, limits):
+        return any(action['side'] == side for action in self.actions(symbol, limits, kind))
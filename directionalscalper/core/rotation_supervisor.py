@@ -0,0 +1,211 @@
+import queue
+import threading
+import time
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="RotationSupervisor", filename="RotationSupervisor.log", stream=True)
+
+CANDIDATE = 'candidate'
+STARTING = 'starting'
+RUNNING = 'running'
+DRAINING = 'draining'
+STOPPED = 'stopped'
+
+# States that hold one of the symbols_allowed slots
+ACTIVE_STATES = (STARTING, RUNNING, DRAINING)
+
+
+class SymbolSlot:
+    def __init__(self, symbol, side):
+        self.symbol = symbol
+        self.side = side
+        self.state = CANDIDATE
+        self.signal = None
+        self.is_open_position = False
+        self.thread = None
+        self.stop_event = None
+        self.changed_at = time.time()
+
+    def transition(self, state):
+        logging.info(f"{self.symbol} {self.side}: {self.state} -> {state}")
+        self.state = state
+        self.changed_at = time.time()
+
+
+class RotationSupervisor:
+    """
+    Lifecycle of every (symbol, side) strategy thread in the auto-rotation loop:
+
+        candidate -> starting -> running -> draining -> stopped
+
+    Admission is decided synchronously in propose(), which reserves a symbols_allowed
+    slot and returns at once; the thread itself is launched by the supervisor's worker.
+    Threads report back with mark_running()/mark_stopped(), and drain() only signals a
+    stop. The lock guards the slot table alone and is never held across a thread start,
+    join, network call or sleep, so symbol churn never blocks the rotation loop.
+
+    launch(symbol, side, signal, stop_event) must start the strategy thread and return
+    it; on_stopped(symbol, side, thread) runs on the worker after a thread has exited.
+    """
+
+    def __init__(self, symbols_allowed, launch, on_stopped=None):
+        self.symbols_allowed = symbols_allowed
+        self.launch = launch
+        self.on_stopped = on_stopped
+        self.lock = threading.Lock()
+        self.slots = {}  # (symbol, side) -> SymbolSlot
+        self.messages = queue.Queue()
+        self.worker = threading.Thread(target=self._run, name="rotation-supervisor", daemon=True)
+        self.worker.start()
+
+    # Queries
+
+    def state(self, symbol, side):
+        with self.lock:
+            slot = self.slots.get((symbol, side))
+            return slot.state if slot is not None else None
+
+    def is_active(self, symbol, side=None):
+        with self.lock:
+            return self._is_active(symbol, side)
+
+    def _is_active(self, symbol, side=None):
+        sides = (side,) if side is not None else ('long', 'short')
+        return any(
+            (symbol, s) in self.slots and self.slots[(symbol, s)].state in ACTIVE_STATES
+            for s in sides
+        )
+
+    def _active_symbols(self):
+        return {symbol for (symbol, _), slot in self.slots.items() if slot.state in ACTIVE_STATES}
+
+    def active_symbols(self, side=None):
+        with self.lock:
+            if side is None:
+                return self._active_symbols()
+            return {symbol for (symbol, s), slot in self.slots.items() if s == side and slot.state in ACTIVE_STATES}
+
+    def free_slots(self):
+        with self.lock:
+            return max(self.symbols_allowed - len(self._active_symbols()), 0)
+
+    def snapshot(self):
+        """{(symbol, side): state} for logging and display."""
+        with self.lock:
+            return {key: slot.state for key, slot in self.slots.items()}
+
+    # Transitions
+
+    def set_symbols_allowed(self, symbols_allowed):
+        with self.lock:
+            self.symbols_allowed = symbols_allowed
+
+    def set_candidates(self, symbols):
+        """Record the current rotator candidates; stale candidates and stopped slots are dropped."""
+        with self.lock:
+            for key in [key for key, slot in self.slots.items() if slot.state in (CANDIDATE, STOPPED)]:
+                del self.slots[key]
+            for symbol in symbols:
+                for side in ('long', 'short'):
+                    self.slots.setdefault((symbol, side), SymbolSlot(symbol, side))
+
+    def propose(self, symbol, side, signal=None, is_open_position=False):
+        """
+        Admit (symbol, side) if it isn't active yet and a slot is free. Open positions and
+        the other side of an already active symbol don't need a new slot. Returns True
+        when the thread will be started.
+        """
+        with self.lock:
+            slot = self.slots.get((symbol, side))
+            if slot is not None and slot.state in ACTIVE_STATES:
+                return False
+            if not is_open_position and not self._is_active(symbol) and len(self._active_symbols()) >= self.symbols_allowed:
+                logging.info(f"Admission denied for {symbol} {side}: {self.symbols_allowed} symbols already active")
+                return False
+            if slot is None:
+                slot = self.slots[(symbol, side)] = SymbolSlot(symbol, side)
+            slot.signal = signal
+            slot.is_open_position = is_open_position
+            slot.stop_event = threading.Event()
+            slot.transition(STARTING)
+            stop_event = slot.stop_event
+        self.messages.put(('launch', symbol, side, signal, stop_event))
+        return True
+
+    def mark_running(self, symbol, side):
+        with self.lock:
+            slot = self.slots.get((symbol, side))
+            if slot is not None and slot.state == STARTING:
+                slot.transition(RUNNING)
+
+    def mark_stopped(self, symbol, side):
+        """Called by the strategy thread as it exits."""
+        self.messages.put(('stopped', symbol, side, threading.current_thread()))
+
+    def drain(self, symbol, side=None):
+        """Ask the thread(s) for symbol to stop; returns without waiting for them."""
+        with self.lock:
+            for s in ((side,) if side is not None else ('long', 'short')):
+                slot = self.slots.get((symbol, s))
+                if slot is not None and slot.state in (STARTING, RUNNING):
+                    slot.transition(DRAINING)
+                    slot.stop_event.set()
+
+    def reap(self):
+        """Move slots whose thread died without reporting to stopped."""
+        with self.lock:
+            dead = [
+                (slot.symbol, slot.side, slot.thread) for slot in self.slots.values()
+                if slot.state in (RUNNING, DRAINING) and slot.thread is not None and not slot.thread.is_alive()
+            ]
+        for symbol, side, thread in dead:
+            self.messages.put(('stopped', symbol, side, thread))
+
+    def stop(self):
+        self.messages.put(('shutdown',))
+
+    # Worker
+
+    def _run(self):
+        while True:
+            message = self.messages.get()
+            kind = message[0]
+            try:
+                if kind == 'shutdown':
+                    return
+                elif kind == 'launch':
+                    self._launch(*message[1:])
+                elif kind == 'stopped':
+                    self._stopped(*message[1:])
+            except Exception as e:
+                logging.error(f"Rotation supervisor failed handling {kind} for {message[1:3]}: {e}")
+
+    def _launch(self, symbol, side, signal, stop_event):
+        with self.lock:
+            slot = self.slots.get((symbol, side))
+            if slot is None or slot.state != STARTING or slot.stop_event is not stop_event:
+                return
+        try:
+            thread = self.launch(symbol, side, signal, stop_event)
+        except Exception as e:
+            logging.error(f"Failed to start {symbol} {side}: {e}")
+            thread = None
+        with self.lock:
+            slot = self.slots.get((symbol, side))
+            if slot is None or slot.stop_event is not stop_event:
+                return
+            slot.thread = thread
+            if thread is None:
+                slot.transition(STOPPED)
+
+    def _stopped(self, symbol, side, thread):
+        with self.lock:
+            slot = self.slots.get((symbol, side))
+            if slot is None or slot.state == STOPPED:
+                return
+            if slot.thread is not None and thread is not slot.thread:
+                return  # A newer thread owns this slot
+            slot.transition(STOPPED)
+        if self.on_stopped is not None:
+            self.on_stopped(symbol, side, thread)
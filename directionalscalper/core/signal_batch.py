@@ -0,0 +1,74 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="SignalBatch", filename="SignalBatch.log", stream=True)
+
+ACTIONABLE_SIGNALS = ('long', 'short')
+
+
+class SignalEvaluator:
+    """
+    Evaluate entry signals for a whole candidate set at once.
+
+    get_signal runs for every symbol on a small worker pool. Pacing comes from the rate
+    limiters inside get_signal and the exchange fetches, not from fixed sleeps, so a
+    sweep takes as long as the rate-limit budget allows and no longer. Candles and
+    indicator results are shared through the exchange's candle store and indicator
+    cache, so symbols that were evaluated recently cost little.
+    """
+
+    def __init__(self, get_signal, max_workers=8, rate_limiter=None):
+        self.get_signal = get_signal
+        self.rate_limiter = rate_limiter
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="signal")
+        self.lock = threading.Lock()
+        self.last_results = []
+
+    def _evaluate_one(self, symbol):
+        started = time.time()
+        try:
+            if self.rate_limiter is not None:
+                with self.rate_limiter:
+                    signal = self.get_signal(symbol)
+            else:
+                signal = self.get_signal(symbol)
+            error = None
+        except Exception as e:
+            logging.info(f"Signal evaluation failed for {symbol}: {e}")
+            signal, error = 'neutral', e
+        return {
+            'symbol': symbol,
+            'signal': (signal or 'neutral').lower(),
+            'error': error,
+            'elapsed': time.time() - started,
+        }
+
+    def evaluate(self, symbols, open_symbols=()):
+        """
+        Return one result dict per symbol ({'symbol', 'signal', 'error', 'elapsed',
+        'is_open_position'}), ranked: open positions first, then actionable signals,
+        then input order.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return []
+        started = time.time()
+        results = list(self.executor.map(self._evaluate_one, symbols))
+
+        open_symbols = set(open_symbols)
+        for position, result in enumerate(results):
+            result['is_open_position'] = result['symbol'] in open_symbols
+            result['rank'] = (not result['is_open_position'], result['signal'] not in ACTIONABLE_SIGNALS, position)
+        results.sort(key=lambda result: result['rank'])
+
+        actionable = sum(1 for result in results if result['signal'] in ACTIONABLE_SIGNALS)
+        logging.info(f"Evaluated {len(results)} signals in {time.time() - started:.2f}s, {actionable} actionable")
+        with self.lock:
+            self.last_results = results
+        return results
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -1,12 +1,10 @@
 from colorama import Fore
 from typing import Optional, Tuple, List, Dict, Union
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP, ROUND_HALF_DOWN, ROUND_DOWN
-import pandas as pd
 import time
 import math
 import numpy as np
 import random
-import ta as ta
 import uuid
 import os
 import uuid
@@ -14,17 +12,23 @@ import logging
 import json
 import threading
 import traceback
-import ccxt
 import pytz
 import sqlite3
-from sklearn.preprocessing import MinMaxScaler
 from .logger import Logger
 from datetime import datetime, timedelta
 from threading import Thread, Lock
 
 from ..bot_metrics import BotDatabase
+from ..indicators import klmf
 
 from rate_limit import RateLimit
+from directionalscalper.core.registry import lazy_import
+from directionalscalper.core.risk_engine import AUTO_REDUCE, FAILSAFE
+
+# Imported on first use
+pd = lazy_import('pandas')
+ta = lazy_import('ta')
+sklearn_preprocessing = lazy_import('sklearn.preprocessing')
 
 
 logging = Logger(logger_name="BaseStrategy", filename="BaseStrategy.log", stream=True)
@@ -118,19 +122,11 @@ class BaseStrategy:
         Calculate the Average Daily Gain over a specified number of days.
         """
         try:
-            # Fetch closed trade history or daily balance history
+            # Daily realized PnL from the local ledger, synced incrementally by the exchange
             history = self.exchange.fetch_closed_trades_history(days)
 
-            # Calculate daily gains
-            daily_gains = []
-            for day in range(1, days + 1):
-                # Assuming history data has 'date' and 'profit_loss' fields
-                day_data = [trade for trade in history if trade['date'] == day]
-                daily_gain = sum(trade['profit_loss'] for trade in day_data)
-                daily_gains.append(daily_gain)
-
             # Calculate ADG
-            adg = sum(daily_gains) / days
+            adg = sum(trade['profit_loss'] for trade in history) / days
             return adg
 
         except Exception as e:
@@ -140,10 +136,9 @@ class BaseStrategy:
     def fetch_closed_trades_history(self, days):
         """
         Fetch the closed trades history for the specified number of days.
-        This method should be implemented in the Exchange class.
+        Delegates to the exchange, which serves it from the local PnL ledger.
         """
-        # This is a placeholder. You need to implement this method based on your exchange's API.
-        pass
+        return self.exchange.fetch_closed_trades_history(days)
 
     def get_position_balance(self, symbol, side, open_position_data):
         """
@@ -154,6 +149,10 @@ class BaseStrategy:
         :param open_position_data: The data containing information about open positions.
         :return: The position balance for the specified symbol and side, or 0 if not found.
         """
+        position_book = getattr(self.exchange, 'position_book', None)
+        if position_book is not None and open_position_data is position_book.positions:
+            return position_book.position_balance(symbol, side)
+
         for position in open_position_data:
             # Extract info from each position
             info = position.get('info', {})
@@ -1229,23 +1228,13 @@ class BaseStrategy:
         symbols = [pos.get('symbol').split(':')[0] for pos in positions if isinstance(pos, dict) and pos.get('symbol')]
         return symbols
 
-    def retry_api_call(self, function, *args, max_retries=100, base_delay=10, max_delay=60, **kwargs):
-        retries = 0
-        while retries < max_retries:
-            try:
-                with self.rate_limiter:
-                    return function(*args, **kwargs)
-            except ccxt.RateLimitExceeded as e:
-                retries += 1
-                delay = min(base_delay * (2 ** retries) + random.uniform(0, 0.1 * (2 ** retries)), max_delay)
-                logging.info(f"Rate limit exceeded: {e}. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-            except Exception as e:
-                retries += 1
-                delay = min(base_delay * (2 ** retries) + random.uniform(0, 0.1 * (2 ** retries)), max_delay)
-                logging.info(f"Error occurred: {e}. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-        raise Exception(f"Failed to execute the API function after {max_retries} retries.")
+    def retry_api_call(self, function, *args, max_retries=None, base_delay=None, max_delay=None, deadline=None, **kwargs):
+        # Retried under the exchange's account-wide policy: bounded by a deadline and
+        # failing fast while the endpoint's circuit breaker is open
+        return self.exchange.retry_policy.execute(
+            function, args, kwargs, deadline=deadline, max_attempts=max_retries,
+            base_delay=base_delay, max_delay=max_delay, rate_limiter=self.rate_limiter
+        )
 
     # def retry_api_call(self, function, *args, max_retries=100, base_delay=10, max_delay=60, **kwargs):
     #     retries = 0
@@ -1263,7 +1252,11 @@ class BaseStrategy:
         """
         Checks if the bot can trade a given symbol.
         """
-        unique_open_symbols = set(open_symbols)  # Convert to set to get unique symbols
+        position_book = getattr(self.exchange, 'position_book', None)
+        if position_book is not None and open_symbols is position_book.open_symbols:
+            unique_open_symbols = position_book.open_symbol_set  # Already deduplicated by the book
+        else:
+            unique_open_symbols = set(open_symbols)  # Convert to set to get unique symbols
         self.open_symbols_count = len(unique_open_symbols)  # Count unique symbols
         logging.info(f"Symbols allowed amount: {symbols_allowed}")
         logging.info(f"Open symbols count (unique): {self.open_symbols_count}")
@@ -1352,6 +1345,10 @@ class BaseStrategy:
             return 0
 
     def process_position_data(self, open_position_data):
+        position_book = getattr(self.exchange, 'position_book', None)
+        if position_book is not None and open_position_data is position_book.positions:
+            return position_book.position_details
+
         position_details = {}
 
         for position in open_position_data:
@@ -2670,7 +2667,7 @@ class BaseStrategy:
 
     # Credit to 53RG0
     def normalize(self, series):
-        scaler = MinMaxScaler()
+        scaler = sklearn_preprocessing.MinMaxScaler()
         series = series.values.reshape(-1, 1)
         normalized_series = scaler.fit_transform(series).flatten()
         return pd.Series(normalized_series, index=series.index)
@@ -2704,20 +2701,7 @@ class BaseStrategy:
         if not use_regime_filter:
             return pd.Series([True] * len(series))
 
-        def klmf(series, high, low):
-            value1 = pd.Series(0, index=series.index)
-            value2 = pd.Series(0, index=series.index)
-            klmf = pd.Series(0, index=series.index)
-            for i in range(1, len(series)):
-                value1[i] = 0.2 * (series[i] - series[i - 1]) + 0.8 * value1[i - 1]
-                value2[i] = 0.1 * (high[i] - low[i]) + 0.8 * value2[i - 1]
-            omega = abs(value1 / value2)
-            alpha = (-omega ** 2 + np.sqrt(omega ** 4 + 16 * omega ** 2)) / 8
-            for i in range(1, len(series)):
-                klmf[i] = alpha[i] * series[i] + (1 - alpha[i]) * klmf[i - 1]
-            return klmf
-
-        klmf_values = klmf(series, high, low)
+        klmf_values = pd.Series(klmf(series.to_numpy(dtype=float), high.to_numpy(dtype=float), low.to_numpy(dtype=float)), index=series.index)
         abs_curve_slope = abs(klmf_values.diff())
         exponential_average_abs_curve_slope = ta.trend.EMAIndicator(abs_curve_slope, window=200).ema_indicator()
         normalized_slope_decline = (abs_curve_slope - exponential_average_abs_curve_slope) / exponential_average_abs_curve_slope
@@ -2907,25 +2891,26 @@ class BaseStrategy:
                 return
 
             try:
-                long_upnl_pct_equity = (long_upnl / total_equity) * 100
-                short_upnl_pct_equity = (short_upnl / total_equity) * 100
-
-                logging.info(f"{symbol} Long uPNL % of Equity: {long_upnl_pct_equity:.2f}, Short uPNL % of Equity: {short_upnl_pct_equity:.2f}")
-
-                long_loss_exceeded = long_pos_price is not None and long_pos_price != 0 and current_market_price < long_pos_price * (1 - auto_reduce_start_pct)
-                short_loss_exceeded = short_pos_price is not None and short_pos_price != 0 and current_market_price > short_pos_price * (1 + auto_reduce_start_pct)
-
-                logging.info(f"{symbol} Price Loss Exceeded - Long: {long_loss_exceeded}, Short: {short_loss_exceeded}")
+                # Triggers come from the account-level risk engine, evaluated for every position at once
+                risk_engine = self.exchange.risk_engine
+                limits = {
+                    'auto_reduce_start_pct': auto_reduce_start_pct,
+                    'upnl_auto_reduce_threshold_long': upnl_auto_reduce_threshold_long,
+                    'upnl_auto_reduce_threshold_short': upnl_auto_reduce_threshold_short,
+                }
+                risk_engine.update_price(symbol, current_market_price)
+                report = risk_engine.evaluate(total_equity)
+                long_risk = report.get(symbol, 'long')
+                short_risk = report.get(symbol, 'short')
 
                 logging.info(f"Loss thresholds - Long: {upnl_auto_reduce_threshold_long}%, Short: {upnl_auto_reduce_threshold_short}%")
+                if long_risk:
+                    logging.info(f"{symbol} Long uPNL % of Equity: {long_risk['upnl_pct']:.2f}, adverse move: {long_risk['adverse_move']:.4f}")
+                if short_risk:
+                    logging.info(f"{symbol} Short uPNL % of Equity: {short_risk['upnl_pct']:.2f}, adverse move: {short_risk['adverse_move']:.4f}")
 
-                upnl_long_exceeded = long_upnl_pct_equity < -upnl_auto_reduce_threshold_long
-                upnl_short_exceeded = short_upnl_pct_equity < -upnl_auto_reduce_threshold_short
-
-                logging.info(f"{symbol} UPnL Exceeded - Long: {upnl_long_exceeded}, Short: {upnl_short_exceeded}")
-
-                trigger_auto_reduce_long = long_pos_qty > 0 and long_loss_exceeded and upnl_long_exceeded
-                trigger_auto_reduce_short = short_pos_qty > 0 and short_loss_exceeded and upnl_short_exceeded
+                trigger_auto_reduce_long = long_pos_qty > 0 and risk_engine.is_triggered(symbol, 'long', AUTO_REDUCE, limits)
+                trigger_auto_reduce_short = short_pos_qty > 0 and risk_engine.is_triggered(symbol, 'short', AUTO_REDUCE, limits)
 
                 logging.info(f"{symbol} Trigger Auto-Reduce - Long: {trigger_auto_reduce_long}, Short: {trigger_auto_reduce_short}")
 
@@ -3156,22 +3141,21 @@ class BaseStrategy:
             logging.info(f"Short failsafe UPNL %: {short_failsafe_upnl_pct}")
             logging.info(f"Failsafe start %: {failsafe_start_pct}")
             
-            long_upnl_pct_equity = (long_upnl / total_equity) * 100
-            short_upnl_pct_equity = (short_upnl / total_equity) * 100
-
-            logging.info(f"FAILSAFE: {symbol} Long UPNL % of Equity: {long_upnl_pct_equity:.2f}, Short UPNL % of Equity: {short_upnl_pct_equity:.2f}")
+            risk_engine = self.exchange.risk_engine
+            limits = {
+                'failsafe_start_pct': failsafe_start_pct,
+                'long_failsafe_upnl_pct': long_failsafe_upnl_pct,
+                'short_failsafe_upnl_pct': short_failsafe_upnl_pct,
+            }
+            risk_engine.update_price(symbol, current_price)
+            report = risk_engine.evaluate(total_equity)
+            long_risk = report.get(symbol, 'long') or {'upnl_pct': 0.0}
+            short_risk = report.get(symbol, 'short') or {'upnl_pct': 0.0}
 
-            long_failsafe_triggered = (
-                long_pos_qty > 0
-                and current_price < long_pos_price * (1 - failsafe_start_pct)
-                and long_upnl_pct_equity < long_failsafe_upnl_pct
-            )
+            logging.info(f"FAILSAFE: {symbol} Long UPNL % of Equity: {long_risk['upnl_pct']:.2f}, Short UPNL % of Equity: {short_risk['upnl_pct']:.2f}")
 
-            short_failsafe_triggered = (
-                short_pos_qty > 0
-                and current_price > short_pos_price * (1 + failsafe_start_pct)
-                and short_upnl_pct_equity < -short_failsafe_upnl_pct
-            )
+            long_failsafe_triggered = long_pos_qty > 0 and risk_engine.is_triggered(symbol, 'long', FAILSAFE, limits)
+            short_failsafe_triggered = short_pos_qty > 0 and risk_engine.is_triggered(symbol, 'short', FAILSAFE, limits)
 
 
             if long_failsafe_triggered:
@@ -3358,23 +3342,36 @@ class BaseStrategy:
             # Fetch total profits for the symbol
             total_profit = self.fetch_profits(symbol)
 
-            # Fetch current positions
-            positions = self.exchange.fetch_positions(symbol)
-            current_price = self.exchange.fetch_ticker(symbol)['last']
-            long_pos_qty = positions['long']['contracts']
-            short_pos_qty = positions['short']['contracts']
-            long_pos_price = positions['long']['entryPrice']
-            short_pos_price = positions['short']['entryPrice']
-
-            # Fetch total equity
-            total_equity = self.exchange.fetch_balance()['total']['USDT']
-            profit_pct_equity = (total_profit / total_equity) * 100 if total_equity else 0
-
-            # Calculate UPNL as percentage of the total equity
-            long_upnl = (current_price - long_pos_price) * long_pos_qty
-            short_upnl = (short_pos_price - current_price) * short_pos_qty
-            long_upnl_pct_equity = abs((long_upnl / total_equity) * 100) if total_equity else 0
-            short_upnl_pct_equity = abs((short_upnl / total_equity) * 100) if total_equity else 0
+            # Positions, price and equity from the shared risk report instead of per-thread fetches
+            report = self.exchange.risk_engine.evaluate()
+            total_equity = report.equity
+            if not total_equity:
+                # Equity is held in the settlement currency of the symbol's market
+                settle_currency = self.exchange.exchange.market(symbol)['settle']
+                snapshot = self.exchange.account_equity.get(settle_currency)
+                if snapshot is not None:
+                    report = self.exchange.risk_engine.evaluate(snapshot.total)
+                    total_equity = report.equity
+            if not total_equity:
+                logging.info(f"No account equity known yet, skipping autoreduction for {symbol}")
+                return
+            long_risk = report.get(symbol, 'long')
+            short_risk = report.get(symbol, 'short')
+            if long_risk is None and short_risk is None:
+                logging.info(f"No open position for {symbol}, skipping autoreduction")
+                return
+            current_price = (long_risk or short_risk)['price']
+            long_pos_qty = long_risk['qty'] if long_risk else 0
+            short_pos_qty = short_risk['qty'] if short_risk else 0
+            long_pos_price = long_risk['entry_price'] if long_risk else 0
+            short_pos_price = short_risk['entry_price'] if short_risk else 0
+            profit_pct_equity = (total_profit / total_equity) * 100
+
+            # UPNL as percentage of the total equity
+            long_upnl = long_risk['upnl'] if long_risk else 0
+            short_upnl = short_risk['upnl'] if short_risk else 0
+            long_upnl_pct_equity = abs(long_risk['upnl_pct']) if long_risk else 0
+            short_upnl_pct_equity = abs(short_risk['upnl_pct']) if short_risk else 0
 
             logging.info(f"Profit % of Total Equity for {symbol}: {profit_pct_equity:.2f}")
             logging.info(f"FAILSAFE: {symbol} Long UPNL % of Total Equity: {long_upnl_pct_equity:.2f}, Short UPNL % of Total Equity: {short_upnl_pct_equity:.2f}")
@@ -1,12 +1,10 @@
 from colorama import Fore
 from typing import Optional, Tuple, List, Dict, Union
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP, ROUND_HALF_DOWN, ROUND_DOWN
-import pandas as pd
 import time
 import math
 import numpy as np
 import random
-import ta as ta
 import uuid
 import os
 import uuid
@@ -19,6 +17,7 @@ import pytz
 import sqlite3
 import keyboard
 from collections import defaultdict
+from types import SimpleNamespace
 from ..logger import Logger
 from datetime import datetime, timedelta
 from threading import Thread, Lock
@@ -27,8 +26,17 @@ from ...bot_metrics import BotDatabase
 
 from directionalscalper.core.config_initializer import ConfigInitializer
 from directionalscalper.core.strategies.base_strategy import BaseStrategy
+from directionalscalper.core.orderbook_analytics import get_orderbook_analytics, significant_levels
+from directionalscalper.core import grid_kernel
+from directionalscalper.core.indicator_cache import indicator_cache
 
 from rate_limit import RateLimit
+from config import current_config_service
+from directionalscalper.core.registry import lazy_import
+
+# Imported on first use
+pd = lazy_import('pandas')
+ta = lazy_import('ta')
 
 logging = Logger(logger_name="BybitBaseStrategy", filename="BybitBaseStrategy.log", stream=True)
 
@@ -39,6 +47,8 @@ class BybitStrategy(BaseStrategy):
         self.general_rate_limiter = RateLimit(50, 1)
         self.order_rate_limiter = RateLimit(5, 1) 
         self.symbol_max_leverage = {}
+        self.pending_entries = {}  # (symbol, 'long'/'short') -> entry waiting for its first fill
+        self.grid_versions = {}  # (symbol, 'buy'/'sell') -> times the grid was cancelled or issued
         self.grid_levels = {}
         self.linear_grid_orders = {}
         self.last_price = {}
@@ -73,6 +83,7 @@ class BybitStrategy(BaseStrategy):
         self.next_long_tp_update = datetime.now() - timedelta(seconds=1)
         self.next_short_tp_update = datetime.now() - timedelta(seconds=1)
         ConfigInitializer.initialize_config_attributes(self, config)
+        self.config_version = 0
 
         try:
             # Hotkey-related attributes
@@ -89,6 +100,41 @@ class BybitStrategy(BaseStrategy):
         except Exception as e:
             logging.info(f"Exception caught in hotkeys {e}")
 
+    def refresh_config(self):
+        """
+        Swap in the latest bot config if the config files were reloaded since this
+        strategy last looked. Returns True when self.config changed; self.config_version
+        moves with every swap so run loops can re-read their settings.
+
+        Only the settings whose value changed in the files are reapplied, so state the
+        strategy changed at runtime (long_mode/short_mode, graceful_stop_*) survives a
+        reload that didn't touch it.
+        """
+        service = current_config_service()
+        if service is None:
+            return False
+        config = service.config.bot
+        if config is self.config:
+            return False
+        previous, self.config = self.config, config
+        self.config_version = service.version
+        changed = self.config_changes(previous, config)
+        for name, value in changed.items():
+            setattr(self, name, value)
+        logging.info(f"Picked up config version {service.version}, changed: {sorted(changed) or 'nothing'}")
+        return True
+
+    @staticmethod
+    def config_changes(previous, config):
+        """{attribute: new value} for the ConfigInitializer attributes that differ between two configs."""
+        old, new = SimpleNamespace(logger=logging), SimpleNamespace(logger=logging)
+        ConfigInitializer.initialize_config_attributes(old, previous)
+        ConfigInitializer.initialize_config_attributes(new, config)
+        return {
+            name: value for name, value in vars(new).items()
+            if name != 'logger' and (not hasattr(old, name) or getattr(old, name) != value)
+        }
+
     def start_hotkey_listener(self):
         hotkey_thread = threading.Thread(target=self.listen_hotkeys, daemon=True)
         hotkey_thread.start()
@@ -546,11 +592,82 @@ class BybitStrategy(BaseStrategy):
         except Exception as e:
             logging.info(f"An error occurred while canceling entry orders: {e}")
 
+    def maintain_take_profit(self, symbol, order_side, qty, price, positionIdx, tp_orders, post_only=True):
+        """
+        Make the take profit for one side of a position sell/buy qty at price.
+
+        Desired and live values are compared at the market's tick size and qty step: an
+        identical TP is left alone, a differing one is amended in place, and a new one is
+        placed only when there is none. Time in force can't be amended, so a TP that
+        should switch between post-only and a normal limit is replaced instead. A
+        replacement is always placed before the old order is cancelled, so the position
+        is never left without a TP. Returns 'unchanged', 'amended', 'created' or 'failed'.
+        """
+        price, qty = self.exchange.quantize_order_bybit(symbol, price, qty)
+        create = self.exchange.create_take_profit_order_bybit if post_only else self.exchange.create_normal_take_profit_order_bybit
+
+        def place():
+            order = create(symbol, "limit", order_side, qty, price, positionIdx=positionIdx, reduce_only=True)
+            return bool(order) and 'error' not in order
+
+        if not tp_orders:
+            if place():
+                logging.info(f"New {order_side} TP for {symbol}: {qty} at {price} ({'post-only' if post_only else 'normal limit'})")
+                return 'created'
+            logging.info(f"Failed to set new {order_side} TP for {symbol} at {price}")
+            return 'failed'
+
+        current, duplicates = tp_orders[0], tp_orders[1:]
+        for order in duplicates:
+            self.exchange.cancel_order_by_id(order['id'], symbol)
+            logging.info(f"Cancelled duplicate {order_side} TP order {order['id']} for {symbol}")
+
+        live_price, live_qty = self.exchange.quantize_order_bybit(symbol, current['price'], current['qty'])
+        same_time_in_force = current.get('post_only', post_only) == post_only
+        if live_price == price and live_qty == qty and same_time_in_force:
+            return 'unchanged'
+
+        if same_time_in_force:
+            amended = self.exchange.amend_order_bybit(
+                current['id'], symbol, order_side,
+                qty=qty if live_qty != qty else None,
+                price=price if live_price != price else None,
+            )
+            if amended is not None:
+                logging.info(f"Amended {order_side} TP {current['id']} for {symbol}: {live_qty} at {live_price} -> {qty} at {price}")
+                return 'amended'
+
+        if place():
+            self.exchange.cancel_order_by_id(current['id'], symbol)
+            logging.info(f"Replaced {order_side} TP {current['id']} for {symbol} with {qty} at {price}")
+            return 'created'
+        logging.info(f"Could not amend or replace {order_side} TP {current['id']} for {symbol}, keeping it")
+        return 'failed'
+
+    def _tp_update_due(self, symbol, pos_qty, order_side, last_tp_update, open_orders):
+        """(TP orders to maintain, whether an update is due) for one side of symbol's position; a wrong qty makes it due."""
+        long_tp_orders, short_tp_orders = self.exchange.get_open_tp_orders(open_orders)
+        auto_reduce_ids = self.auto_reduce_order_ids.get(symbol, [])
+        relevant_tp_orders = [
+            order for order in (long_tp_orders if order_side == "sell" else short_tp_orders)
+            if order['id'] not in auto_reduce_ids
+        ]
+        # Compare at the qty step, so a float that differs only past it isn't a change
+        desired_qty = self.exchange.quantize_order_bybit(symbol, 1.0, pos_qty)[1]
+        mismatched = any(
+            self.exchange.quantize_order_bybit(symbol, 1.0, order['qty'])[1] != desired_qty
+            for order in relevant_tp_orders
+        )
+        due = mismatched or datetime.now() >= last_tp_update
+        return relevant_tp_orders, due
+
     def update_quickscalp_tp_dynamic(self, symbol, pos_qty, upnl_profit_pct, max_upnl_profit_pct, short_pos_price, long_pos_price, positionIdx, order_side, last_tp_update, tp_order_counts, open_orders):
-        # Fetch the current open TP orders and TP order counts for the symbol
-        long_tp_orders, short_tp_orders = self.retry_api_call(self.exchange.get_open_tp_orders, open_orders)
-        long_tp_count = tp_order_counts['long_tp_count']
-        short_tp_count = tp_order_counts['short_tp_count']
+        # Deprecated: tp_order_counts is no longer read, the TP orders come from open_orders
+        # A due refresh always reaches maintain_take_profit, which compares price as well as qty
+        relevant_tp_orders, due = self._tp_update_due(symbol, pos_qty, order_side, last_tp_update, open_orders)
+        if not due:
+            logging.info(f"No immediate update needed for TP orders for {symbol}. Last update at: {last_tp_update}")
+            return last_tp_update
 
         # Determine the minimum notional value for dynamic scaling
         min_notional_value = self.min_notional(symbol)
@@ -569,126 +686,66 @@ class BybitStrategy(BaseStrategy):
         scaled_tp_pct = upnl_profit_pct + (max_upnl_profit_pct - upnl_profit_pct) * min(scaling_factor, 1)  # Cap scaling at 100% to avoid excessive TP targets
 
         # Calculate the new TP values using the quickscalp method
-        new_short_tp_min, new_short_tp_max = self.calculate_quickscalp_short_take_profit_dynamic_distance(short_pos_price, symbol, upnl_profit_pct, scaled_tp_pct)
-        new_long_tp_min, new_long_tp_max = self.calculate_quickscalp_long_take_profit_dynamic_distance(long_pos_price, symbol, upnl_profit_pct, scaled_tp_pct)
-
-        # Determine the relevant TP orders based on the order side
-        relevant_tp_orders = long_tp_orders if order_side == "sell" else short_tp_orders
-
-        # Check if there's an existing TP order with a mismatched quantity
-        mismatched_qty_orders = [order for order in relevant_tp_orders if order['qty'] != pos_qty and order['id'] not in self.auto_reduce_order_ids.get(symbol, [])]
-
-        # Cancel mismatched TP orders if any
-        for order in mismatched_qty_orders:
-            try:
-                self.exchange.cancel_order_by_id(order['id'], symbol)
-                logging.info(f"Cancelled TP order {order['id']} for update.")
-            except Exception as e:
-                logging.info(f"Error in cancelling {order_side} TP order {order['id']}. Error: {e}")
-
-        # Using datetime.now() for checking if update is needed
-        now = datetime.now()
-        if now >= last_tp_update or mismatched_qty_orders:
-            # Check if a TP order already exists
-            tp_order_exists = (order_side == "sell" and long_tp_count > 0) or (order_side == "buy" and short_tp_count > 0)
+        if order_side == "sell":
+            new_tp_price_min, new_tp_price_max = self.calculate_quickscalp_long_take_profit_dynamic_distance(long_pos_price, symbol, upnl_profit_pct, scaled_tp_pct)
+        else:
+            new_tp_price_min, new_tp_price_max = self.calculate_quickscalp_short_take_profit_dynamic_distance(short_pos_price, symbol, upnl_profit_pct, scaled_tp_pct)
+        if new_tp_price_min is None or new_tp_price_max is None:
+            logging.info(f"No TP price for {symbol} {order_side}, position price unavailable")
+            return last_tp_update
+        logging.info(f"New tp price min: {new_tp_price_min} with order side as {order_side}")
 
-            # Set new TP order with updated prices only if no TP order exists
-            if not tp_order_exists:
-                new_tp_price_min = new_long_tp_min if order_side == "sell" else new_short_tp_min
-                logging.info(f"New tp price min: {new_tp_price_min} with order side as {order_side}")
-                new_tp_price_max = new_long_tp_max if order_side == "sell" else new_short_tp_max
-                current_price = self.exchange.get_current_price(symbol)
+        # Ensure TP setting checks are correct for direction
+        if (order_side == "sell" and current_price >= new_tp_price_min) or (order_side == "buy" and current_price <= new_tp_price_max):
+            # Check if current price has already surpassed the max TP price
+            if (order_side == "sell" and current_price > new_tp_price_max) or (order_side == "buy" and current_price < new_tp_price_min):
                 order_book = self.exchange.get_orderbook(symbol)
                 best_ask_price = order_book['asks'][0][0] if 'asks' in order_book else self.last_known_ask.get(symbol)
                 best_bid_price = order_book['bids'][0][0] if 'bids' in order_book else self.last_known_bid.get(symbol)
-
-                # Ensure TP setting checks are correct for direction
-                if (order_side == "sell" and current_price >= new_tp_price_min) or (order_side == "buy" and current_price <= new_tp_price_max):
-                    # Check if current price has already surpassed the max TP price
-                    if (order_side == "sell" and current_price > new_tp_price_max) or (order_side == "buy" and current_price < new_tp_price_min):
-                        try:
-                            tp_price = best_ask_price if order_side == "sell" else best_bid_price
-                            self.exchange.create_normal_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, tp_price, positionIdx=positionIdx, reduce_only=True)
-                            logging.info(f"New {order_side.capitalize()} TP set at current/best price {tp_price} as current price has surpassed the max TP")
-                        except Exception as e:
-                            logging.info(f"Failed to set new {order_side} TP for {symbol} at current/best price. Error: {e}")
-                    else:
-                        try:
-                            self.exchange.create_normal_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, new_tp_price_min, positionIdx=positionIdx, reduce_only=True)
-                            logging.info(f"New {order_side.capitalize()} TP set at {new_tp_price_min} using a normal limit order")
-                        except Exception as e:
-                            logging.info(f"Failed to set new {order_side} TP for {symbol} using a normal limit order. Error: {e}")
-                else:
-                    try:
-                        self.exchange.create_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, new_tp_price_max, positionIdx=positionIdx, reduce_only=True)
-                        logging.info(f"New {order_side.capitalize()} TP set at {new_tp_price_max} using a post-only order")
-                    except Exception as e:
-                        logging.info(f"Failed to set new {order_side} TP for {symbol} using a post-only order. Error: {e}")
+                tp_price = best_ask_price if order_side == "sell" else best_bid_price
             else:
-                logging.info(f"Skipping TP update as a TP order already exists for {symbol}")
-
-            # Calculate and return the next update time
-            return self.calculate_next_update_time()
+                tp_price = new_tp_price_min
+            post_only = False
         else:
-            logging.info(f"No immediate update needed for TP orders for {symbol}. Last update at: {last_tp_update}")
-            return last_tp_update
-        
-    def update_quickscalp_tp(self, symbol, pos_qty, upnl_profit_pct, short_pos_price, long_pos_price, positionIdx, order_side, last_tp_update, tp_order_counts, open_orders, max_retries=10):
-        # Fetch the current open TP orders and TP order counts for the symbol
-        long_tp_orders, short_tp_orders = self.exchange.get_open_tp_orders(open_orders)
-        long_tp_count = tp_order_counts['long_tp_count']
-        short_tp_count = tp_order_counts['short_tp_count']
-
-        # Calculate the new TP values using quickscalp method
-        new_short_tp = self.calculate_quickscalp_short_take_profit(short_pos_price, symbol, upnl_profit_pct)
-        new_long_tp = self.calculate_quickscalp_long_take_profit(long_pos_price, symbol, upnl_profit_pct)
+            tp_price = new_tp_price_max
+            post_only = True
 
-        # Determine the relevant TP orders based on the order side
-        relevant_tp_orders = long_tp_orders if order_side == "sell" else short_tp_orders
+        try:
+            self.maintain_take_profit(symbol, order_side, pos_qty, tp_price, positionIdx, relevant_tp_orders, post_only=post_only)
+        except Exception as e:
+            logging.info(f"Failed to update {order_side} TP for {symbol}. Error: {e}")
 
-        # Check if there's an existing TP order with a mismatched quantity
-        mismatched_qty_orders = [order for order in relevant_tp_orders if order['qty'] != pos_qty and order['id'] not in self.auto_reduce_order_ids.get(symbol, [])]
+        # Calculate and return the next update time
+        return self.calculate_next_update_time()
 
-        # Cancel mismatched TP orders if any
-        for order in mismatched_qty_orders:
-            try:
-                self.exchange.cancel_order_by_id(order['id'], symbol)
-                logging.info(f"Cancelled TP order {order['id']} for update.")
-            except Exception as e:
-                logging.info(f"Error in cancelling {order_side} TP order {order['id']}. Error: {e}")
+    def update_quickscalp_tp(self, symbol, pos_qty, upnl_profit_pct, short_pos_price, long_pos_price, positionIdx, order_side, last_tp_update, tp_order_counts, open_orders, max_retries=10):
+        # Deprecated: tp_order_counts is no longer read, the TP orders come from open_orders
+        # A due refresh always reaches maintain_take_profit, which compares price as well as qty
+        relevant_tp_orders, due = self._tp_update_due(symbol, pos_qty, order_side, last_tp_update, open_orders)
+        if not due:
+            logging.info(f"No immediate update needed for TP orders for {symbol}. Last update at: {last_tp_update}")
+            return last_tp_update
 
-        now = datetime.now()
-        if now >= last_tp_update or mismatched_qty_orders:
-            # Check if a TP order already exists
-            tp_order_exists = (order_side == "sell" and long_tp_count > 0) or (order_side == "buy" and short_tp_count > 0)
+        # Calculate the new TP value using quickscalp method
+        if order_side == "sell":
+            new_tp_price = self.calculate_quickscalp_long_take_profit(long_pos_price, symbol, upnl_profit_pct)
+        else:
+            new_tp_price = self.calculate_quickscalp_short_take_profit(short_pos_price, symbol, upnl_profit_pct)
+        if new_tp_price is None:
+            logging.info(f"No TP price for {symbol} {order_side}, position price unavailable")
+            return last_tp_update
 
-            # Set new TP order with updated prices only if no TP order exists
-            if not tp_order_exists:
-                new_tp_price = new_long_tp if order_side == "sell" else new_short_tp
-                current_price = self.exchange.get_current_price(symbol)
+        # If the current price has surpassed the new TP price, use a normal limit order, otherwise post-only
+        current_price = self.exchange.get_current_price(symbol)
+        surpassed = (order_side == "sell" and current_price >= new_tp_price) or (order_side == "buy" and current_price <= new_tp_price)
 
-                if (order_side == "sell" and current_price >= new_tp_price) or (order_side == "buy" and current_price <= new_tp_price):
-                    # If the current price has surpassed the new TP price, use a normal limit order
-                    try:
-                        self.exchange.create_normal_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, new_tp_price, positionIdx=positionIdx, reduce_only=True)
-                        logging.info(f"New {order_side.capitalize()} TP set at {new_tp_price} using a normal limit order")
-                    except Exception as e:
-                        logging.info(f"Failed to set new {order_side} TP for {symbol} using a normal limit order. Error: {e}")
-                else:
-                    # If the current price hasn't surpassed the new TP price, use a post-only order
-                    try:
-                        self.exchange.create_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, new_tp_price, positionIdx=positionIdx, reduce_only=True)
-                        logging.info(f"New {order_side.capitalize()} TP set at {new_tp_price} using a post-only order")
-                    except Exception as e:
-                        logging.info(f"Failed to set new {order_side} TP for {symbol} using a post-only order. Error: {e}")
-            else:
-                logging.info(f"Skipping TP update as a TP order already exists for {symbol}")
+        try:
+            self.maintain_take_profit(symbol, order_side, pos_qty, new_tp_price, positionIdx, relevant_tp_orders, post_only=not surpassed)
+        except Exception as e:
+            logging.info(f"Failed to update {order_side} TP for {symbol}. Error: {e}")
 
-            # Calculate and return the next update time
-            return self.calculate_next_update_time()
-        else:
-            logging.info(f"No immediate update needed for TP orders for {symbol}. Last update at: {last_tp_update}")
-            return last_tp_update
+        # Calculate and return the next update time
+        return self.calculate_next_update_time()
 
     def calculate_quickscalp_long_take_profit_dynamic_distance(self, long_pos_price, symbol, min_upnl_profit_pct, max_upnl_profit_pct):
         if long_pos_price is None or long_pos_price <= 0:
@@ -864,14 +921,10 @@ class BybitStrategy(BaseStrategy):
         return rounded_tp
     def detect_order_book_walls(self, symbol, threshold=5.0):
         order_book = self.exchange.get_orderbook(symbol)
-        bids = order_book['bids']
-        asks = order_book['asks']
+        analytics = get_orderbook_analytics(order_book)
 
-        avg_bid_size = sum([bid[1] for bid in bids[:10]]) / 10
-        bid_walls = [(price, size) for price, size in bids if size > avg_bid_size * threshold]
-
-        avg_ask_size = sum([ask[1] for ask in asks[:10]]) / 10
-        ask_walls = [(price, size) for price, size in asks if size > avg_ask_size * threshold]
+        bid_walls = analytics.walls('bids', threshold)
+        ask_walls = analytics.walls('asks', threshold)
 
         if bid_walls:
             logging.info(f"Detected buy walls at {bid_walls} for {symbol}")
@@ -896,24 +949,16 @@ class BybitStrategy(BaseStrategy):
         # Calculate dynamic threshold based on ATR
         dynamic_threshold = base_threshold_factor * atr
 
-        # Calculate average order size for a larger sample of orders
-        sample_size = 20  # Increased sample size
-        avg_bid_size = sum([bid[1] for bid in bids[:sample_size]]) / sample_size
-        avg_ask_size = sum([ask[1] for ask in asks[:sample_size]]) / sample_size
-
         # Current market price
         current_price = self.exchange.get_current_price(symbol)
 
         # Calculate proximity threshold as a percentage of the current price
         proximity_threshold = (atr_proximity_percentage / 100) * current_price
 
-        # Function to check wall significance
-        def is_wall_significant(price, size, threshold, avg_size):
-            return size > max(threshold, avg_size * base_threshold_factor) and abs(price - current_price) <= proximity_threshold
-
-        # Detect significant bid and ask walls
-        significant_bid_walls = [(price, size) for price, size in bids if is_wall_significant(price, size, dynamic_threshold, avg_bid_size)]
-        significant_ask_walls = [(price, size) for price, size in asks if is_wall_significant(price, size, dynamic_threshold, avg_ask_size)]
+        # Walls must beat both the ATR threshold and the average size of the top 20 orders
+        analytics = get_orderbook_analytics(order_book)
+        significant_bid_walls = analytics.significant_walls('bids', current_price, dynamic_threshold, base_threshold_factor, proximity_threshold, sample_size=20)
+        significant_ask_walls = analytics.significant_walls('asks', current_price, dynamic_threshold, base_threshold_factor, proximity_threshold, sample_size=20)
 
         logging.info(f"Significant bid walls: {significant_bid_walls} for {symbol}")
         logging.info(f"Significant ask walls: {significant_ask_walls} for {symbol}")
@@ -944,19 +989,7 @@ class BybitStrategy(BaseStrategy):
 
     def calculate_orderbook_strength(self, symbol, depth=10):
         order_book = self.exchange.get_orderbook(symbol)
-        
-        top_bids = order_book['bids'][:depth]
-        total_bid_quantity = sum([bid[1] for bid in top_bids])
-        
-        top_asks = order_book['asks'][:depth]
-        total_ask_quantity = sum([ask[1] for ask in top_asks])
-        
-        if (total_bid_quantity + total_ask_quantity) == 0:
-            return 0.5  # Neutral strength
-        
-        strength = total_bid_quantity / (total_bid_quantity + total_ask_quantity)
-        
-        return strength
+        return get_orderbook_analytics(order_book).strength(depth)
 
     def initialize_symbol(self, symbol, total_equity, best_ask_price, max_leverage):
         with self.initialized_symbols_lock:
@@ -2580,9 +2613,6 @@ class BybitStrategy(BaseStrategy):
 
     def calculate_orderbook_based_grid_levels(self, order_book, current_price, long_pos_price, short_pos_price, levels, max_outer_price_distance, min_buffer_percentage, max_buffer_percentage):
         try:
-            asks = order_book['asks']
-            bids = order_book['bids']
-
             # Initialize buffer percentages
             buffer_percentage_long = min_buffer_percentage
             buffer_percentage_short = min_buffer_percentage
@@ -2593,27 +2623,10 @@ class BybitStrategy(BaseStrategy):
             if short_pos_price:
                 buffer_percentage_short += (max_buffer_percentage - min_buffer_percentage) * (abs(current_price - short_pos_price) / short_pos_price)
 
-            # Function to calculate volume-weighted price levels
-            def volume_weighted_price(levels, side, buffer_percentage):
-                weighted_prices = []
-                cumulative_volume = 0
-                total_volume = sum(float(level[1]) for level in side)
-                volume_thresholds = np.linspace(0.1, 1, levels) * total_volume
-                current_index = 0
-
-                for threshold in volume_thresholds:
-                    while cumulative_volume < threshold and current_index < len(side):
-                        price, volume = float(side[current_index][0]), float(side[current_index][1])
-                        cumulative_volume += volume
-                        if current_index == 0 or abs(price - current_price) / current_price <= buffer_percentage:
-                            weighted_prices.append(price)
-                        current_index += 1
-
-                return weighted_prices
-
-            # Calculate weighted prices for asks and bids considering the dynamic buffer
-            ask_prices = volume_weighted_price(levels, asks, buffer_percentage_short)
-            bid_prices = volume_weighted_price(levels, bids[::-1], buffer_percentage_long)  # Reverse bids for ascending order
+            # Calculate volume-weighted prices for asks and bids considering the dynamic buffer
+            analytics = get_orderbook_analytics(order_book)
+            ask_prices = analytics.volume_weighted_levels('asks', levels, current_price, buffer_percentage_short)
+            bid_prices = analytics.volume_weighted_levels('bids', levels, current_price, buffer_percentage_long, reverse=True)  # Reverse bids for ascending order
 
             # Determine grid levels within max distance and ensure they are within the max_outer_price_distance
             grid_levels = {
@@ -2749,8 +2762,15 @@ class BybitStrategy(BaseStrategy):
         :param limit: The number of data points to fetch
         :return: The ATRP value as a percentage of the current price
         """
+        return indicator_cache.get(
+            symbol, timeframe, 'atrp', (self.exchange.exchange_id, period, limit),
+            lambda: self._calculate_atrp(symbol, timeframe, period, limit),
+            candle_timeframe='1m'
+        )
+
+    def _calculate_atrp(self, symbol, timeframe, period, limit):
         # Fetch OHLCV data
-        ohlcv_data = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=limit)
+        ohlcv_data = self.exchange.fetch_candles(symbol, timeframe, limit)
         df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
         
         # Calculate the True Range (TR)
@@ -3050,16 +3070,24 @@ class BybitStrategy(BaseStrategy):
         return adjusted_grid_levels
 
     def get_30m_candle_spread(self, symbol: str, limit: int = 1) -> float:
-        ohlcv_data = self.exchange.fetch_ohlcv(symbol=symbol, timeframe='30m', limit=limit)
-        df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        spread = df['high'].iloc[0] - df['low'].iloc[0]
-        return spread
+        return indicator_cache.get(
+            symbol, '30m', 'candle_spread', (self.exchange.exchange_id, limit),
+            lambda: self._candle_spread(symbol, '30m', limit),
+            candle_timeframe='1m'
+        )
 
     def get_4h_candle_spread(self, symbol: str) -> float:
-        ohlcv_data = self.exchange.fetch_ohlcv(symbol=symbol, timeframe='4h', limit=1)
+        return indicator_cache.get(
+            symbol, '4h', 'candle_spread', (self.exchange.exchange_id, 1),
+            lambda: self._candle_spread(symbol, '4h', 1),
+            candle_timeframe='1m'
+        )
+
+    def _candle_spread(self, symbol, timeframe, limit):
+        # High-low range of the oldest candle returned; with limit=1 that is the candle in progress
+        ohlcv_data = self.exchange.fetch_candles(symbol, timeframe, limit)
         df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        high_low_spread = df['high'].iloc[0] - df['low'].iloc[0]
-        return high_low_spread
+        return df['high'].iloc[0] - df['low'].iloc[0]
     
     def linear_grid_hardened_gridspan_orderbook_maxposqty_properdca(
         self, symbol: str, open_symbols: list, total_equity: float, long_pos_price: float,
@@ -4758,6 +4786,93 @@ class BybitStrategy(BaseStrategy):
             logging.info(f"Error in executing grid strategy: {e}")
             logging.info("Traceback: %s", traceback.format_exc())
 
+    ENTRY_FILL_TIMEOUT = 75  # Seconds an entry is re-placed while waiting for its first fill
+
+    def wait_for_entry_fill(self, symbol, side, signal, timeout=None, reissue_interval=5, stop_event=None):
+        """
+        Wait for a new long/short position without blocking the thread. Every pass calls
+        process_pending_entries(symbol, reissue, current_signal), which re-places the entry
+        with that pass's levels and amounts every reissue_interval seconds until the
+        position book shows the position change. The wait is dropped after timeout seconds
+        (ENTRY_FILL_TIMEOUT by default), or as soon as the signal is no longer `signal`,
+        auto-reduce takes over the side, stop_event is set, or the side's grid is cancelled
+        or issued by anything else. Starting a new wait for the same symbol and side
+        replaces the old one.
+        """
+        entry = {
+            'signal': signal.lower(),
+            'current_signal': None,
+            'reissue_interval': reissue_interval,
+            'stop_event': stop_event,
+            'grid_version': self.grid_versions.get((symbol, self._grid_side(side))),
+            'reissues': 0,
+            'last_issued': time.monotonic(),
+        }
+        entry['watch'] = self.exchange.position_book.watch(
+            symbol, side, timeout=self.ENTRY_FILL_TIMEOUT if timeout is None else timeout,
+            cancel=lambda: self._pending_entry_cancel_reason(symbol, side, entry) is not None
+        )
+        self.pending_entries[(symbol, side)] = entry
+
+    def has_pending_entry(self, symbol, side):
+        return (symbol, side) in self.pending_entries
+
+    def _pending_entry_cancel_reason(self, symbol, side, entry):
+        if entry['stop_event'] is not None and entry['stop_event'].is_set():
+            return "stop requested"
+        current_signal = entry['current_signal']
+        if current_signal is not None and current_signal.lower() != entry['signal']:
+            return f"signal changed to {current_signal.lower()}"
+        auto_reduce_active = self.auto_reduce_active_long if side == 'long' else self.auto_reduce_active_short
+        if auto_reduce_active.get(symbol, False):
+            return "auto-reduce is active"
+        if self.grid_versions.get((symbol, self._grid_side(side))) != entry['grid_version']:
+            return "the grid was cancelled or issued elsewhere"
+        return None
+
+    def process_pending_entries(self, symbol, reissue, signal=None):
+        """
+        Move symbol's entry waits along. reissue(side) re-places that side's entry from the
+        current pass's levels and amounts; signal is the current value of the signal that
+        started the waits, or None to skip that check.
+        """
+        for side in ('long', 'short'):
+            entry = self.pending_entries.get((symbol, side))
+            if entry is None:
+                continue
+            entry['current_signal'] = signal
+            watch = entry['watch']
+            result = watch.poll()
+            if result == watch.CHANGED:
+                logging.info(f"[{symbol}] {side.capitalize()} position filled after {watch.elapsed():.1f}s (qty {watch.qty}).")
+            elif result == watch.TIMED_OUT:
+                logging.info(f"[{symbol}] {side.capitalize()} entry not filled after {watch.elapsed():.0f}s and {entry['reissues']} reissues, no longer waiting.")
+            elif result == watch.CANCELLED:
+                logging.info(f"[{symbol}] No longer waiting for the {side} entry: {self._pending_entry_cancel_reason(symbol, side, entry)}.")
+            if result is not None:
+                del self.pending_entries[(symbol, side)]
+                continue
+            if time.monotonic() - entry['last_issued'] < entry['reissue_interval']:
+                continue
+            entry['reissues'] += 1
+            entry['last_issued'] = time.monotonic()
+            logging.info(f"[{symbol}] Retrying {side} grid orders, no fill yet (attempt {entry['reissues']}).")
+            try:
+                reissue(side)
+            except Exception as e:
+                logging.error(f"[{symbol}] Error reissuing {side} entry orders: {e}")
+            # Our own reissue doesn't count as the grid changing elsewhere
+            entry['grid_version'] = self.grid_versions.get((symbol, self._grid_side(side)))
+
+    @staticmethod
+    def _grid_side(side):
+        return 'buy' if side in ('long', 'buy') else 'sell'
+
+    def _grid_changed(self, symbol, side):
+        # Lets pending entry waits notice that the grid was cancelled or issued since they last placed it
+        key = (symbol, self._grid_side(side.lower()))
+        self.grid_versions[key] = self.grid_versions.get(key, 0) + 1
+
     def get_position_qty(self, symbol, side):
         # Fetch open position data
         open_position_data = self.retry_api_call(self.exchange.get_all_open_positions_bybit)
@@ -4802,7 +4917,8 @@ class BybitStrategy(BaseStrategy):
                     short_mode: bool, initial_entry_buffer_pct: float, min_buffer_percentage: float, max_buffer_percentage: float,
                     symbols_allowed: int, enforce_full_grid: bool, mfirsi_signal: str, upnl_profit_pct: float,
                     max_upnl_profit_pct: float, tp_order_counts: dict, entry_during_autoreduce: bool,
-                    max_qty_percent_long: float, max_qty_percent_short: float, graceful_stop_long: bool, graceful_stop_short: bool, additional_entries_from_signal: bool, open_position_data: list):
+                    max_qty_percent_long: float, max_qty_percent_short: float, graceful_stop_long: bool, graceful_stop_short: bool, additional_entries_from_signal: bool, open_position_data: list,
+                    stop_event=None):
         try:
             spread, current_price = self.get_spread_and_price(symbol)
             dynamic_outer_price_distance = self.calculate_dynamic_outer_price_distance(spread, min_outer_price_distance, max_outer_price_distance)
@@ -4944,7 +5060,8 @@ class BybitStrategy(BaseStrategy):
                 min_buffer_percentage,
                 max_buffer_percentage,
                 additional_entries_from_signal,
-                open_position_data
+                open_position_data,
+                stop_event=stop_event
             )
 
         except Exception as e:
@@ -4994,31 +5111,10 @@ class BybitStrategy(BaseStrategy):
         return order_book, best_ask_price, best_bid_price
 
     def calculate_price_range_and_volume_histograms(self, order_book, current_price, max_outer_price_distance):
-        min_price = current_price - max_outer_price_distance * current_price
-        max_price = current_price + max_outer_price_distance * current_price
-
-        price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
-        volume_histogram_long = np.zeros_like(price_range)
-        volume_histogram_short = np.zeros_like(price_range)
-
-        for order in order_book['bids']:
-            price, volume = order[0], order[1]
-            if min_price <= price <= current_price:
-                index = int((price - min_price) / (max_price - min_price) * 100)
-                volume_histogram_long[index] += volume
-
-        for order in order_book['asks']:
-            price, volume = order[0], order[1]
-            if current_price <= price <= max_price:
-                index = int((price - min_price) / (max_price - min_price) * 100)
-                volume_histogram_short[index] += volume
-
-        return min_price, max_price, price_range, volume_histogram_long, volume_histogram_short
+        return get_orderbook_analytics(order_book).volume_profile(current_price, max_outer_price_distance)
 
     def calculate_volume_thresholds_and_significant_levels(self, volume_histogram, price_range):
-        volume_threshold = np.mean(volume_histogram) * 1.5
-        significant_levels = price_range[volume_histogram >= volume_threshold]
-        return volume_threshold, significant_levels
+        return significant_levels(volume_histogram, price_range)
 
     def calculate_initial_entries(self, current_price, buffer_distance_long, buffer_distance_short):
         initial_entry_long = current_price - buffer_distance_long
@@ -5026,76 +5122,25 @@ class BybitStrategy(BaseStrategy):
         return initial_entry_long, initial_entry_short
 
     def calculate_grid_levels(self, long_pos_qty, short_pos_qty, levels, initial_entry_long, initial_entry_short, current_price, buffer_distance_long, buffer_distance_short, max_outer_price_distance):
-        if long_pos_qty == 0:
-            grid_levels_long = [initial_entry_long] + [
-                current_price - buffer_distance_long - i * ((max_outer_price_distance * current_price - buffer_distance_long) / (levels - 1)) 
-                for i in range(1, levels)
-            ]
-        else:
-            grid_levels_long = [
-                current_price - buffer_distance_long - i * ((max_outer_price_distance * current_price - buffer_distance_long) / levels) 
-                for i in range(levels)
-            ]
-
-        if short_pos_qty == 0:
-            grid_levels_short = [initial_entry_short] + [
-                current_price + buffer_distance_short + i * ((max_outer_price_distance * current_price - buffer_distance_short) / (levels - 1)) 
-                for i in range(1, levels)
-            ]
-        else:
-            grid_levels_short = [
-                current_price + buffer_distance_short + i * ((max_outer_price_distance * current_price - buffer_distance_short) / levels) 
-                for i in range(levels)
-            ]
+        # Without a position the first level is the initial entry and the rest span out to the outer distance
+        grid_levels_long = grid_kernel.grid_levels(current_price, buffer_distance_long, max_outer_price_distance, levels, 'buy', fresh_entry=long_pos_qty == 0).tolist()
+        grid_levels_short = grid_kernel.grid_levels(current_price, buffer_distance_short, max_outer_price_distance, levels, 'sell', fresh_entry=short_pos_qty == 0).tolist()
         return grid_levels_long, grid_levels_short
 
     def adjust_grid_levels(self, grid_levels, significant_levels, tolerance, min_outer_price_distance, max_outer_price_distance, current_price, levels):
-        def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-            for sig_level in significant_levels:
-                if abs(level - sig_level) / level < tolerance:
-                    if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                        if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                            return sig_level
-            return level
-
-        adjusted_grid_levels = []
-
-        for i, level in enumerate(grid_levels):
-            previous_level = adjusted_grid_levels[-1] if adjusted_grid_levels else None
-            adjusted_level = find_nearest_significant_level(
-                level,
-                significant_levels,
-                tolerance,
-                min_outer_price_distance,
-                max_outer_price_distance,
-                current_price,
-                previous_level
-            )
-            adjusted_grid_levels.append(adjusted_level)
-
-        return adjusted_grid_levels
+        return grid_kernel.snap_to_significant_levels(
+            grid_levels,
+            significant_levels,
+            current_price,
+            min_outer_price_distance,
+            max_outer_price_distance,
+            levels,
+            tolerance
+        ).tolist()
 
     def finalize_grid_levels(self, adjusted_grid_levels_long, adjusted_grid_levels_short, levels, current_price, buffer_distance_long, buffer_distance_short, max_outer_price_distance, initial_entry_long, initial_entry_short):
-        if len(adjusted_grid_levels_long) < levels:
-            remaining_levels = levels - len(adjusted_grid_levels_long)
-            additional_levels_long = np.linspace(
-                adjusted_grid_levels_long[-1] if adjusted_grid_levels_long else current_price - buffer_distance_long,
-                current_price - max_outer_price_distance * current_price,
-                remaining_levels + 1
-            )[1:]
-            adjusted_grid_levels_long = np.concatenate((adjusted_grid_levels_long, additional_levels_long))
-
-        if len(adjusted_grid_levels_short) < levels:
-            remaining_levels = levels - len(adjusted_grid_levels_short)
-            additional_levels_short = np.linspace(
-                adjusted_grid_levels_short[-1] if adjusted_grid_levels_short else current_price + buffer_distance_short,
-                current_price + max_outer_price_distance * current_price,
-                remaining_levels + 1
-            )[1:]
-            adjusted_grid_levels_short = np.concatenate((adjusted_grid_levels_short, additional_levels_short))
-
-        adjusted_grid_levels_long = sorted(adjusted_grid_levels_long, reverse=True)
-        adjusted_grid_levels_short = sorted(adjusted_grid_levels_short)
+        adjusted_grid_levels_long = grid_kernel.fill_grid(adjusted_grid_levels_long, levels, current_price, buffer_distance_long, max_outer_price_distance, 'buy').tolist()
+        adjusted_grid_levels_short = grid_kernel.fill_grid(adjusted_grid_levels_short, levels, current_price, buffer_distance_short, max_outer_price_distance, 'sell').tolist()
 
         logging.info(f"Initial long entry level: {initial_entry_long}")
         logging.info(f"Initial short entry level: {initial_entry_short}")
@@ -5178,8 +5223,21 @@ class BybitStrategy(BaseStrategy):
     #         symbol, total_amount, levels, strength, qty_precision, enforce_full_grid, long_pos_qty, short_pos_qty, side
     #     )
 
-    def handle_auto_reduce(self, symbol, grid_levels_long, grid_levels_short, long_grid_active, short_grid_active, long_pos_qty, short_pos_qty, current_price, dynamic_outer_price_distance, min_outer_price_distance, max_outer_price_distance, buffer_percentage_long, buffer_percentage_short, adjusted_grid_levels_long, adjusted_grid_levels_short, levels, amounts_long, amounts_short, best_bid_price, best_ask_price, mfirsi_signal, open_orders, initial_entry_buffer_pct, reissue_threshold, entry_during_autoreduce, min_qty, open_symbols, symbols_allowed, long_mode, short_mode, long_pos_price, short_pos_price, graceful_stop_long, graceful_stop_short, min_buffer_percentage, max_buffer_percentage, additional_entries_from_signal, open_position_data):
+    def handle_auto_reduce(self, symbol, grid_levels_long, grid_levels_short, long_grid_active, short_grid_active, long_pos_qty, short_pos_qty, current_price, dynamic_outer_price_distance, min_outer_price_distance, max_outer_price_distance, buffer_percentage_long, buffer_percentage_short, adjusted_grid_levels_long, adjusted_grid_levels_short, levels, amounts_long, amounts_short, best_bid_price, best_ask_price, mfirsi_signal, open_orders, initial_entry_buffer_pct, reissue_threshold, entry_during_autoreduce, min_qty, open_symbols, symbols_allowed, long_mode, short_mode, long_pos_price, short_pos_price, graceful_stop_long, graceful_stop_short, min_buffer_percentage, max_buffer_percentage, additional_entries_from_signal, open_position_data, stop_event=None):
         try:
+            def reissue_entry(side):
+                # From this pass's levels and amounts, led by the current best price
+                if side == 'long':
+                    self.clear_grid(symbol, 'buy')
+                    self.issue_grid_orders(symbol, "buy", [best_bid_price] + list(grid_levels_long[1:]), amounts_long, True, self.filled_levels[symbol]["buy"])
+                    self.active_long_grids.add(symbol)
+                else:
+                    self.clear_grid(symbol, 'sell')
+                    self.issue_grid_orders(symbol, "sell", [best_ask_price] + list(grid_levels_short[1:]), amounts_short, False, self.filled_levels[symbol]["sell"])
+                    self.active_short_grids.add(symbol)
+
+            self.process_pending_entries(symbol, reissue_entry, self.exchange.last_signal.get(symbol))
+
             # Fetch open symbols for long and short positions
             open_symbols_long = self.get_open_symbols_long(open_position_data)
             open_symbols_short = self.get_open_symbols_short(open_position_data)
@@ -5495,29 +5553,8 @@ class BybitStrategy(BaseStrategy):
                                     self.issue_grid_orders(symbol, "buy", grid_levels_long, amounts_long, True, self.filled_levels[symbol]["buy"])
                                     self.active_long_grids.add(symbol)
 
-                                    retry_counter = 0
-                                    max_retries = 15  # Set a maximum number of retries
-
-                                    while long_pos_qty < 0.00001 and retry_counter < max_retries:
-                                        time.sleep(5)  # Wait for some time to allow order to be filled
-                                        try:
-                                            long_pos_qty = self.get_position_qty(symbol, 'long')  # Re-fetch the long position quantity
-                                        except Exception as e:
-                                            logging.error(f"[{symbol}] Error fetching long position quantity: {e}")
-                                            break
-
-                                        retry_counter += 1
-                                        logging.info(f"[{symbol}] Long position quantity after waiting: {long_pos_qty}, retry attempt: {retry_counter}")
-
-                                        if long_pos_qty < 0.00001 and retry_counter < max_retries:
-                                            logging.info(f"[{symbol}] Retrying long grid orders due to MFIRSI signal long.")
-                                            self.clear_grid(symbol, 'buy')
-                                            grid_levels_long[0] = best_bid_price
-                                            self.issue_grid_orders(symbol, "buy", grid_levels_long, amounts_long, True, self.filled_levels[symbol]["buy"])
-                                            self.active_long_grids.add(symbol)
-                                        else:
-                                            logging.info(f"[{symbol}] Long position filled or max retries reached, exiting loop.")
-                                            break  # Exit loop once the order is filled or max retries are reached
+                                    # Re-placed every 5s until the long position shows up, the signal changes or the wait times out
+                                    self.wait_for_entry_fill(symbol, 'long', fresh_signal, stop_event=stop_event)
 
                                     self.last_signal_time[symbol] = current_time
                                     self.last_mfirsi_signal[symbol] = "neutral"  # Reset to neutral after processing
@@ -5543,29 +5580,8 @@ class BybitStrategy(BaseStrategy):
                                     self.issue_grid_orders(symbol, "sell", grid_levels_short, amounts_short, False, self.filled_levels[symbol]["sell"])
                                     self.active_short_grids.add(symbol)
 
-                                    retry_counter = 0
-                                    max_retries = 15  # Set a maximum number of retries
-
-                                    while short_pos_qty < 0.00001 and retry_counter < max_retries:
-                                        time.sleep(5)  # Wait for some time to allow order to be filled
-                                        try:
-                                            short_pos_qty = self.get_position_qty(symbol, 'short')  # Re-fetch the short position quantity
-                                        except Exception as e:
-                                            logging.error(f"[{symbol}] Error fetching short position quantity: {e}")
-                                            break
-
-                                        retry_counter += 1
-                                        logging.info(f"[{symbol}] Short position quantity after waiting: {short_pos_qty}, retry attempt: {retry_counter}")
-
-                                        if short_pos_qty < 0.00001 and retry_counter < max_retries:
-                                            logging.info(f"[{symbol}] Retrying short grid orders due to MFIRSI signal short.")
-                                            self.clear_grid(symbol, 'sell')
-                                            grid_levels_short[0] = best_ask_price
-                                            self.issue_grid_orders(symbol, "sell", grid_levels_short, amounts_short, False, self.filled_levels[symbol]["sell"])
-                                            self.active_short_grids.add(symbol)
-                                        else:
-                                            logging.info(f"[{symbol}] Short position filled or max retries reached, exiting loop.")
-                                            break  # Exit loop once the order is filled or max retries are reached
+                                    # Re-placed every 5s until the short position shows up, the signal changes or the wait times out
+                                    self.wait_for_entry_fill(symbol, 'short', fresh_signal, stop_event=stop_event)
 
                                     self.last_signal_time[symbol] = current_time
                                     self.last_mfirsi_signal[symbol] = "neutral"  # Reset to neutral after processing
@@ -5592,8 +5608,9 @@ class BybitStrategy(BaseStrategy):
                                                         short_mode: bool, initial_entry_buffer_pct: float, min_buffer_percentage: float, max_buffer_percentage: float,
                                                         symbols_allowed: int, enforce_full_grid: bool, mfirsi_signal: str, upnl_profit_pct: float,
                                                         max_upnl_profit_pct: float, tp_order_counts: dict, entry_during_autoreduce: bool,
-                                                        max_qty_percent_long: float, max_qty_percent_short: float):
+                                                        max_qty_percent_long: float, max_qty_percent_short: float, stop_event=None):
         try:
+
             spread = self.get_4h_candle_spread(symbol)
             logging.info(f"4h Candle spread for {symbol}: {spread}")
 
@@ -5780,6 +5797,18 @@ class BybitStrategy(BaseStrategy):
             logging.info(f"[{symbol}] Long order amounts: {amounts_long}")
             logging.info(f"[{symbol}] Short order amounts: {amounts_short}")
 
+            def reissue_entry(side):
+                # From this pass's levels and amounts, led by the current best price
+                if side == 'long':
+                    self.clear_grid(symbol, 'buy')
+                    self.issue_grid_orders(symbol, "buy", [best_bid_price] + list(grid_levels_long[1:]), amounts_long, True, self.filled_levels[symbol]["buy"])
+                else:
+                    self.clear_grid(symbol, 'sell')
+                    self.issue_grid_orders(symbol, "sell", [best_ask_price] + list(grid_levels_short[1:]), amounts_short, False, self.filled_levels[symbol]["sell"])
+                self.active_grids.add(symbol)
+
+            self.process_pending_entries(symbol, reissue_entry, self.exchange.last_signal.get(symbol))
+
             if self.auto_reduce_active_long.get(symbol, False):
                 logging.info(f"Auto-reduce for long position on {symbol} is active")
                 self.clear_grid(symbol, 'buy')
@@ -6066,18 +6095,8 @@ class BybitStrategy(BaseStrategy):
                         self.issue_grid_orders(symbol, "buy", grid_levels_long, amounts_long, True, self.filled_levels[symbol]["buy"])
                         self.active_grids.add(symbol)
 
-                        while long_pos_qty < 0.00001:
-                            time.sleep(5)  # Wait for some time to allow order to be filled
-                            long_pos_qty = self.get_position_qty(symbol, 'long')  # Re-fetch the long position quantity
-                            logging.info(f"[{symbol}] Long position quantity after waiting: {long_pos_qty}")
-                            if long_pos_qty < 0.00001:
-                                logging.info(f"[{symbol}] Retrying long grid orders due to MFIRSI signal long.")
-                                self.clear_grid(symbol, 'buy')
-                                self.issue_grid_orders(symbol, "buy", grid_levels_long, amounts_long, True, self.filled_levels[symbol]["buy"])
-                                self.active_grids.add(symbol)
-                            else:
-                                logging.info(f"[{symbol}] Long position filled, exiting loop.")
-                                break  # Exit loop once the order is filled
+                        # Re-placed every 5s until the long position shows up, the signal changes or the wait times out
+                        self.wait_for_entry_fill(symbol, 'long', fresh_signal, stop_event=stop_event)
 
                         self.last_signal_time[symbol] = current_time
                         self.last_mfirsi_signal[symbol] = "neutral"  # Reset to neutral after processing
@@ -6101,18 +6120,8 @@ class BybitStrategy(BaseStrategy):
                         self.issue_grid_orders(symbol, "sell", grid_levels_short, amounts_short, False, self.filled_levels[symbol]["sell"])
                         self.active_grids.add(symbol)
 
-                        while short_pos_qty < 0.00001:
-                            time.sleep(5)  # Wait for some time to allow order to be filled
-                            short_pos_qty = self.get_position_qty(symbol, 'short')  # Re-fetch the short position quantity
-                            logging.info(f"[{symbol}] Short position quantity after waiting: {short_pos_qty}")
-                            if short_pos_qty < 0.00001:
-                                logging.info(f"[{symbol}] Retrying short grid orders due to MFIRSI signal short.")
-                                self.clear_grid(symbol, 'sell')
-                                self.issue_grid_orders(symbol, "sell", grid_levels_short, amounts_short, False, self.filled_levels[symbol]["sell"])
-                                self.active_grids.add(symbol)
-                            else:
-                                logging.info(f"[{symbol}] Short position filled, exiting loop.")
-                                break  # Exit loop once the order is filled
+                        # Re-placed every 5s until the short position shows up, the signal changes or the wait times out
+                        self.wait_for_entry_fill(symbol, 'short', fresh_signal, stop_event=stop_event)
 
                         self.last_signal_time[symbol] = current_time
                         self.last_mfirsi_signal[symbol] = "neutral"  # Reset to neutral after processing
@@ -6135,8 +6144,9 @@ class BybitStrategy(BaseStrategy):
                                                                         short_mode: bool, initial_entry_buffer_pct: float, min_buffer_percentage: float, max_buffer_percentage: float,
                                                                         symbols_allowed: int, enforce_full_grid: bool, mfirsi_signal: str, upnl_profit_pct: float,
                                                                         max_upnl_profit_pct: float, tp_order_counts: dict, entry_during_autoreduce: bool,
-                                                                        max_qty_percent_long: float, max_qty_percent_short: float):
+                                                                        max_qty_percent_long: float, max_qty_percent_short: float, stop_event=None):
         try:
+
             spread = self.get_4h_candle_spread(symbol)
             logging.info(f"4h Candle spread for {symbol}: {spread}")
 
@@ -6170,119 +6180,30 @@ class BybitStrategy(BaseStrategy):
             best_ask_price = order_book['asks'][0][0] if 'asks' in order_book else self.last_known_ask.get(symbol, current_price)
             best_bid_price = order_book['bids'][0][0] if 'bids' in order_book else self.last_known_bid.get(symbol, current_price)
 
-            min_price = current_price - max_outer_price_distance * current_price
-            max_price = current_price + max_outer_price_distance * current_price
-
-            price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
-            volume_histogram_long = np.zeros_like(price_range)
-            volume_histogram_short = np.zeros_like(price_range)
-
-            for order in order_book['bids']:
-                price, volume = order[0], order[1]
-                if min_price <= price <= current_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_long[index] += volume
-
-            for order in order_book['asks']:
-                price, volume = order[0], order[1]
-                if current_price <= price <= max_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_short[index] += volume
-
-            volume_threshold_long = np.mean(volume_histogram_long) * 1.5
-            significant_levels_long = price_range[volume_histogram_long >= volume_threshold_long]
+            min_price, max_price, price_range, volume_histogram_long, volume_histogram_short = self.calculate_price_range_and_volume_histograms(order_book, current_price, max_outer_price_distance)
 
-            volume_threshold_short = np.mean(volume_histogram_short) * 1.5
-            significant_levels_short = price_range[volume_histogram_short >= volume_threshold_short]
+            volume_threshold_long, significant_levels_long = self.calculate_volume_thresholds_and_significant_levels(volume_histogram_long, price_range)
+            volume_threshold_short, significant_levels_short = self.calculate_volume_thresholds_and_significant_levels(volume_histogram_short, price_range)
 
             initial_entry_long = current_price - buffer_distance_long
             initial_entry_short = current_price + buffer_distance_short
 
-            if long_pos_qty == 0 or mfirsi_signal.lower() == "long":
-                grid_levels_long = [initial_entry_long] + [
-                    current_price - buffer_distance_long - i * ((max_outer_price_distance * current_price - buffer_distance_long) / (levels - 1)) 
-                    for i in range(1, levels)
-                ]
-            else:
-                grid_levels_long = [
-                    current_price - buffer_distance_long - i * ((max_outer_price_distance * current_price - buffer_distance_long) / levels) 
-                    for i in range(levels)
-                ]
-
-            if short_pos_qty == 0 or mfirsi_signal.lower() == "short":
-                grid_levels_short = [initial_entry_short] + [
-                    current_price + buffer_distance_short + i * ((max_outer_price_distance * current_price - buffer_distance_short) / (levels - 1)) 
-                    for i in range(1, levels)
-                ]
-            else:
-                grid_levels_short = [
-                    current_price + buffer_distance_short + i * ((max_outer_price_distance * current_price - buffer_distance_short) / levels) 
-                    for i in range(levels)
-                ]
-
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                                return sig_level
-                return level
+            # A fresh signal re-spreads the grid from the initial entry even with a position open
+            grid_levels_long = grid_kernel.grid_levels(current_price, buffer_distance_long, max_outer_price_distance, levels, 'buy', fresh_entry=long_pos_qty == 0 or mfirsi_signal.lower() == "long")
+            grid_levels_short = grid_kernel.grid_levels(current_price, buffer_distance_short, max_outer_price_distance, levels, 'sell', fresh_entry=short_pos_qty == 0 or mfirsi_signal.lower() == "short")
 
             tolerance = 0.01
-            adjusted_grid_levels_long = []
-            adjusted_grid_levels_short = []
-
-            for i, level in enumerate(grid_levels_long):
-                previous_level = adjusted_grid_levels_long[-1] if adjusted_grid_levels_long else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_long,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price - max_outer_price_distance * current_price <= adjusted_level <= current_price - buffer_distance_long:
-                    adjusted_grid_levels_long.append(adjusted_level)
-
-            for i, level in enumerate(grid_levels_short):
-                previous_level = adjusted_grid_levels_short[-1] if adjusted_grid_levels_short else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_short,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price + buffer_distance_short <= adjusted_level <= current_price + max_outer_price_distance * current_price:
-                    adjusted_grid_levels_short.append(adjusted_level)
-
-            grid_levels_long = adjusted_grid_levels_long
-            grid_levels_short = adjusted_grid_levels_short
-
-            if len(grid_levels_long) < levels:
-                remaining_levels = levels - len(grid_levels_long)
-                additional_levels_long = np.linspace(
-                    grid_levels_long[-1] if grid_levels_long else current_price - buffer_distance_long,
-                    current_price - max_outer_price_distance * current_price,
-                    remaining_levels + 1
-                )[1:]
-                grid_levels_long = np.concatenate((grid_levels_long, additional_levels_long))
-
-            if len(grid_levels_short) < levels:
-                remaining_levels = levels - len(grid_levels_short)
-                additional_levels_short = np.linspace(
-                    grid_levels_short[-1] if grid_levels_short else current_price + buffer_distance_short,
-                    current_price + max_outer_price_distance * current_price,
-                    remaining_levels + 1
-                )[1:]
-                grid_levels_short = np.concatenate((grid_levels_short, additional_levels_short))
+            grid_levels_long = grid_kernel.snap_to_significant_levels(
+                grid_levels_long, significant_levels_long, current_price, min_outer_price_distance, max_outer_price_distance, levels, tolerance,
+                keep_within=(current_price - max_outer_price_distance * current_price, current_price - buffer_distance_long)
+            )
+            grid_levels_short = grid_kernel.snap_to_significant_levels(
+                grid_levels_short, significant_levels_short, current_price, min_outer_price_distance, max_outer_price_distance, levels, tolerance,
+                keep_within=(current_price + buffer_distance_short, current_price + max_outer_price_distance * current_price)
+            )
 
-            grid_levels_long = sorted(grid_levels_long, reverse=True)
-            grid_levels_short = sorted(grid_levels_short)
+            grid_levels_long = grid_kernel.fill_grid(grid_levels_long, levels, current_price, buffer_distance_long, max_outer_price_distance, 'buy').tolist()
+            grid_levels_short = grid_kernel.fill_grid(grid_levels_short, levels, current_price, buffer_distance_short, max_outer_price_distance, 'sell').tolist()
 
             logging.info(f"[{symbol}] Initial long entry level: {initial_entry_long}")
             logging.info(f"[{symbol}] Initial short entry level: {initial_entry_short}")
@@ -6317,6 +6238,18 @@ class BybitStrategy(BaseStrategy):
             logging.info(f"[{symbol}] Long order amounts: {amounts_long}")
             logging.info(f"[{symbol}] Short order amounts: {amounts_short}")
 
+            def reissue_entry(side):
+                # From this pass's levels and amounts
+                if side == 'long':
+                    self.clear_grid(symbol, 'buy')
+                    self.issue_grid_orders(symbol, "buy", grid_levels_long, amounts_long, True, self.filled_levels[symbol]["buy"])
+                else:
+                    self.clear_grid(symbol, 'sell')
+                    self.issue_grid_orders(symbol, "sell", grid_levels_short, amounts_short, False, self.filled_levels[symbol]["sell"])
+                self.active_grids.add(symbol)
+
+            self.process_pending_entries(symbol, reissue_entry, mfirsi_signal)
+
             # Update position quantities before processing
             long_pos_qty = self.get_position_qty(symbol, 'long')
             short_pos_qty = self.get_position_qty(symbol, 'short')
@@ -6333,22 +6266,21 @@ class BybitStrategy(BaseStrategy):
                 return
 
             # Handle long and short grid replacement based on mfirsi_signal
-            if mfirsi_signal.lower() == "long" and long_mode and not self.auto_reduce_active_long.get(symbol, False):
+            if mfirsi_signal.lower() == "long" and long_mode and self.has_pending_entry(symbol, 'long'):
+                logging.info(f"[{symbol}] Still waiting for the long entry placed on the MFIRSI signal, not replacing it.")
+
+            elif mfirsi_signal.lower() == "long" and long_mode and not self.auto_reduce_active_long.get(symbol, False):
                 logging.info(f"[{symbol}] Replacing long grid orders due to MFIRSI signal long.")
                 self.clear_grid(symbol, 'buy')
                 self.issue_grid_orders(symbol, "buy", grid_levels_long, amounts_long, True, self.filled_levels[symbol]["buy"])
                 self.active_grids.add(symbol)
                 self.last_attempted_signal = mfirsi_signal  # Set the attempted signal
-                while long_pos_qty < 0.00001:
-                    time.sleep(5)  # Wait for some time to allow order to be filled
-                    long_pos_qty = self.get_position_qty(symbol, 'long')  # Re-fetch the long position quantity
-                    if long_pos_qty < 0.00001:
-                        logging.info(f"[{symbol}] Retrying long grid orders due to MFIRSI signal long.")
-                        self.clear_grid(symbol, 'buy')
-                        self.issue_grid_orders(symbol, "buy", grid_levels_long, amounts_long, True, self.filled_levels[symbol]["buy"])
-                        self.active_grids.add(symbol)
-                    else:
-                        break  # Exit loop once the order is filled
+                if long_pos_qty < 0.00001:
+                    # Re-placed every 5s until the long position shows up, the signal changes or the wait times out
+                    self.wait_for_entry_fill(symbol, 'long', mfirsi_signal, stop_event=stop_event)
+
+            elif mfirsi_signal.lower() == "short" and short_mode and self.has_pending_entry(symbol, 'short'):
+                logging.info(f"[{symbol}] Still waiting for the short entry placed on the MFIRSI signal, not replacing it.")
 
             elif mfirsi_signal.lower() == "short" and short_mode and not self.auto_reduce_active_short.get(symbol, False):
                 logging.info(f"[{symbol}] Replacing short grid orders due to MFIRSI signal short.")
@@ -6356,16 +6288,9 @@ class BybitStrategy(BaseStrategy):
                 self.issue_grid_orders(symbol, "sell", grid_levels_short, amounts_short, False, self.filled_levels[symbol]["sell"])
                 self.active_grids.add(symbol)
                 self.last_attempted_signal = mfirsi_signal  # Set the attempted signal
-                while short_pos_qty < 0.00001:
-                    time.sleep(5)  # Wait for some time to allow order to be filled
-                    short_pos_qty = self.get_position_qty(symbol, 'short')  # Re-fetch the short position quantity
-                    if short_pos_qty < 0.00001:
-                        logging.info(f"[{symbol}] Retrying short grid orders due to MFIRSI signal short.")
-                        self.clear_grid(symbol, 'sell')
-                        self.issue_grid_orders(symbol, "sell", grid_levels_short, amounts_short, False, self.filled_levels[symbol]["sell"])
-                        self.active_grids.add(symbol)
-                    else:
-                        break  # Exit loop once the order is filled
+                if short_pos_qty < 0.00001:
+                    # Re-placed every 5s until the short position shows up, the signal changes or the wait times out
+                    self.wait_for_entry_fill(symbol, 'short', mfirsi_signal, stop_event=stop_event)
                     
             # # Skip if the signal is the same as the last processed signal
             # if not hasattr(self, 'last_attempted_signal'):
@@ -13334,12 +13259,10 @@ class BybitStrategy(BaseStrategy):
 
     def generate_order_link_id(self, symbol, side, level):
         """
-        Generates a unique, short, and descriptive OrderLinkedID for Bybit orders.
+        Generates a unique, decodable OrderLinkedID for Bybit orders and starts tracking the
+        order as pending. `level` is the order's index in its grid (None if not on one).
         """
-        timestamp = int(time.time() * 1000) % 100000  # Use last 5 digits of current timestamp for uniqueness
-        level_str = f"{level:.5f}".replace('.', '')[:5]  # Convert level to string, remove '.', and use first 5 characters
-        unique_id = f"{symbol[:3]}_{side[0]}_{level_str}_{timestamp}"  # Build a compact OrderLinkedID
-        return unique_id[:45]  # Ensure the ID does not exceed 45 characters
+        return self.exchange.order_tracker.new_link_id(type(self).__name__, symbol, side, level)
 
     def issue_grid_orders(self, symbol: str, side: str, grid_levels: list, amounts: list, is_long: bool, filled_levels: set):
         """
@@ -13352,11 +13275,18 @@ class BybitStrategy(BaseStrategy):
         # Get the current price to update last reissue prices
         current_price = self.exchange.get_current_price(symbol)
         
-        # Place new grid orders for unfilled levels
-        for level, amount in zip(grid_levels, amounts):
-            order_exists = any(order['price'] == level and order['side'].lower() == side.lower() for order in open_orders)
+        # Place new grid orders for unfilled levels. A level counts as live only at its current
+        # price: after the grid is rebuilt, an order left at the level's old price doesn't fill it.
+        live_prices = self.exchange.order_tracker.live_level_prices(symbol, side)
+        for level_index, (level, amount) in enumerate(zip(grid_levels, amounts)):
+            live_price = live_prices.get(level_index)
+            level_live = level_index in live_prices and (
+                live_price is None
+                or self.exchange.quantize_order_bybit(symbol, live_price, amount) == self.exchange.quantize_order_bybit(symbol, level, amount)
+            )
+            order_exists = level_live or any(order['price'] == level and order['side'].lower() == side.lower() for order in open_orders)
             if not order_exists:
-                order_link_id = self.generate_order_link_id(symbol, side, level)
+                order_link_id = self.generate_order_link_id(symbol, side, level_index)
                 position_idx = 1 if is_long else 2
                 try:
                     order = self.exchange.create_tagged_limit_order_bybit(symbol, side, amount, level, positionIdx=position_idx, orderLinkId=order_link_id)
@@ -13365,8 +13295,10 @@ class BybitStrategy(BaseStrategy):
                         filled_levels.add(level)  # Add the level to filled_levels
                     else:
                         logging.info(f"Failed to place {side} order at level {level} for {symbol} with amount {amount}")
+                        self.exchange.order_tracker.mark_rejected(order_link_id)
                 except Exception as e:
                     logging.info(f"Exception when placing {side} order at level {level} for {symbol}: {e}")
+                    self.exchange.order_tracker.mark_rejected(order_link_id, str(e))
             else:
                 logging.info(f"Skipping {side} order at level {level} for {symbol} as it already exists.")
 
@@ -13378,6 +13310,7 @@ class BybitStrategy(BaseStrategy):
             self.last_reissue_price_short[symbol] = current_price
             logging.info(f"Updated last reissue price for short orders of {symbol} to {current_price}")
 
+        self._grid_changed(symbol, side)
         logging.info(f"[{symbol}] {side.capitalize()} grid orders issued for unfilled levels.")
 
     # def issue_grid_orders(self, symbol: str, side: str, grid_levels: list, amounts: list, is_long: bool, filled_levels: set):
@@ -13411,6 +13344,7 @@ class BybitStrategy(BaseStrategy):
     #     logging.info(f"[{symbol}] {side.capitalize()} grid orders issued for unfilled levels.")
         
     def cancel_grid_orders(self, symbol: str, side: str):
+        self._grid_changed(symbol, side)
         try:
             open_orders = self.retry_api_call(self.exchange.get_open_orders, symbol)
             #logging.info(f"Open orders data for {symbol}: {open_orders}")
@@ -13570,10 +13504,7 @@ class BybitStrategy(BaseStrategy):
         logging.info(f"Calculating order amounts for {symbol} with total_amount: {total_amount}, levels: {levels}, strength: {strength}, qty_precision: {qty_precision}, enforce_full_grid: {enforce_full_grid}")
         
         current_price = self.exchange.get_current_price(symbol)
-        amounts = []
-        total_ratio = sum([(i + 1) ** strength for i in range(levels)])
-        level_notional = [(i + 1) ** strength for i in range(levels)]
-        
+
         if enforce_full_grid:
             base_notional = self.min_notional(symbol) * total_amount / self.min_notional(symbol)
         else:
@@ -13587,29 +13518,23 @@ class BybitStrategy(BaseStrategy):
         else:
             current_position_qty = short_pos_qty
 
-        # Adjust for current position
-        total_amount_adjusted = total_amount + (current_position_qty * current_price)
-
-        for i in range(levels):
-            notional_amount = (level_notional[i] / total_ratio) * total_amount_adjusted
-            quantity = notional_amount / current_price
-            
-            # Determine the minimum quantity to use (either min_notional or min_qty)
-            min_quantity = max(min_base_notional, min_qty)
-            
-            # Apply the minimum quantity requirement
-            rounded_quantity = max(round(quantity / qty_precision) * qty_precision, min_quantity)
-            
-            amounts.append(rounded_quantity)
+        # Determine the minimum quantity to use (either min_notional or min_qty)
+        min_quantity = max(min_base_notional, min_qty)
+
+        # Weighted split including the current position; any rounding shortfall goes to the last level
+        amounts = grid_kernel.order_amounts(
+            total_amount,
+            levels,
+            strength,
+            qty_precision,
+            current_price,
+            min_quantity,
+            current_position_qty,
+            enforce_full_grid
+        ).tolist()
 
         logging.info(f"Calculated order amounts for {symbol}: {amounts}")
-        
-        # Verify the sum of amounts matches the total_amount
-        total_distributed_amount = sum(amounts) * current_price
-        if not enforce_full_grid and total_distributed_amount < total_amount_adjusted:
-            discrepancy = total_amount_adjusted - total_distributed_amount
-            amounts[-1] += discrepancy / current_price  # Adjust the last amount to match total_amount_adjusted
-        
+
         return amounts
 
     def calculate_max_positions(self, symbol, total_equity, current_price, max_qty_percent_long, max_qty_percent_short):
@@ -13786,18 +13711,7 @@ class BybitStrategy(BaseStrategy):
         short_dynamic_amount = self.m_order_amount(symbol, "short", short_dynamic_amount)
         
         # Calculate order book imbalance
-        depth = self.ORDER_BOOK_DEPTH
-        top_bids = order_book['bids'][:depth]
-        total_bids = sum([bid[1] for bid in top_bids])
-        top_asks = order_book['asks'][:depth]
-        total_asks = sum([ask[1] for ask in top_asks])
-        
-        if total_bids > total_asks:
-            imbalance = "buy_wall"
-        elif total_asks > total_bids:
-            imbalance = "sell_wall"
-        else:
-            imbalance = "neutral"
+        imbalance = get_orderbook_analytics(order_book).imbalance(self.ORDER_BOOK_DEPTH)
         
         # Entry Logic
         if imbalance == "buy_wall" and not self.entry_order_exists(open_orders, "buy") and long_pos_qty <= 0:
@@ -13807,38 +13721,15 @@ class BybitStrategy(BaseStrategy):
 
     def get_order_book_imbalance(self, symbol):
         order_book = self.exchange.get_orderbook(symbol)
-        
-        depth = self.ORDER_BOOK_DEPTH
-        top_bids = order_book['bids'][:depth]
-        total_bids = sum([bid[1] for bid in top_bids])
-        
-        top_asks = order_book['asks'][:depth]
-        total_asks = sum([ask[1] for ask in top_asks])
-        
-        if total_bids > total_asks:
-            return "buy_wall"
-        elif total_asks > total_bids:
-            return "sell_wall"
-        else:
-            return "neutral"
+        return get_orderbook_analytics(order_book).imbalance(self.ORDER_BOOK_DEPTH)
 
     def identify_walls(self, order_book, type="buy"):
         # Threshold for what constitutes a wall (this can be adjusted)
         WALL_THRESHOLD = 5.0  # for example, 5 times the average size of top orders
         
-        if type == "buy":
-            orders = order_book['bids']
-        else:
-            orders = order_book['asks']
-
-        avg_size = sum([order[1] for order in orders[:10]]) / 10  # average size of top 10 orders
-        
-        walls = []
-        for price, size in orders:
-            if size > avg_size * WALL_THRESHOLD:
-                walls.append(price)
-        
-        return walls
+        side = 'bids' if type == "buy" else 'asks'
+        # Compared against the average size of the top 10 orders
+        return [price for price, size in get_orderbook_analytics(order_book).walls(side, WALL_THRESHOLD, sample_size=10)]
     
     def print_order_book_imbalance(self, symbol):
         imbalance = self.get_order_book_imbalance(symbol)
@@ -1 +1,15 @@
-from .bybit_mm_onemin_qfl_mfi_eri_walls_autohedge_atr import BybitMMOneMinuteQFLMFIERIAutoHedgeWallsATR
\ No newline at end of file
+import importlib
+
+# Strategy classes are imported on first access so that running one strategy
+# doesn't import its siblings.
+_STRATEGIES = {
+    'BybitMMOneMinuteQFLMFIERIAutoHedgeWallsATR': 'bybit_mm_onemin_qfl_mfi_eri_walls_autohedge_atr',
+}
+
+__all__ = list(_STRATEGIES)
+
+
+def __getattr__(name):
+    if name in _STRATEGIES:
+        return getattr(importlib.import_module(f"{__name__}.{_STRATEGIES[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,21 @@
-from .dynamicgrid_sr_ob_instantsignal import BybitDynamicGridSpanOBSRStaticIS
-from .dynamicgrid_dynamictp_gridspan import BybitDynamicGridSpanIS
-from .dynamicgrid_oblevels_tight import BybitDynamicGridSpanOBTight
-from .dynamicgrid_oblevels import BybitDynamicGridSpanOBLevels
-from .qstrendob_dynamictp import BybitQuickScalpTrendDynamicTP
-from .dynamicgrid_oblevels_spot import BybitSpotGridStrategy
-from .dynamicgrid_oblevels_l import BybitDynamicGridSpanOBLevelsLSignal
\ No newline at end of file
+import importlib
+
+# Strategy classes are imported on first access so that running one strategy
+# doesn't import its siblings.
+_STRATEGIES = {
+    'BybitDynamicGridSpanOBSRStaticIS': 'dynamicgrid_sr_ob_instantsignal',
+    'BybitDynamicGridSpanIS': 'dynamicgrid_dynamictp_gridspan',
+    'BybitDynamicGridSpanOBTight': 'dynamicgrid_oblevels_tight',
+    'BybitDynamicGridSpanOBLevels': 'dynamicgrid_oblevels',
+    'BybitQuickScalpTrendDynamicTP': 'qstrendob_dynamictp',
+    'BybitSpotGridStrategy': 'dynamicgrid_oblevels_spot',
+    'BybitDynamicGridSpanOBLevelsLSignal': 'dynamicgrid_oblevels_l',
+}
+
+__all__ = list(_STRATEGIES)
+
+
+def __getattr__(name):
+    if name in _STRATEGIES:
+        return getattr(importlib.import_module(f"{__name__}.{_STRATEGIES[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
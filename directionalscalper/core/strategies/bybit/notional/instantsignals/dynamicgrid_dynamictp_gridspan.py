@@ -98,7 +98,7 @@ class BybitDynamicGridSpanIS(BybitStrategy):
             if standardized_symbol not in symbol_locks:
                 symbol_locks[standardized_symbol] = {'long': threading.Lock(), 'short': threading.Lock()}
 
-    def run(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+    def run(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None, stop_event=None):
         try:
             standardized_symbol = symbol.upper()
             logging.info(f"Standardized symbol: {standardized_symbol}")
@@ -111,9 +111,9 @@ class BybitDynamicGridSpanIS(BybitStrategy):
                 logging.info(f"Lock acquired for symbol {standardized_symbol} action {action} by thread {current_thread_id}")
                 try:
                     if action == "long":
-                        self.run_long_trades(standardized_symbol, rotator_symbols_standardized, mfirsi_signal)
+                        self.run_long_trades(standardized_symbol, rotator_symbols_standardized, mfirsi_signal, stop_event)
                     elif action == "short":
-                        self.run_short_trades(standardized_symbol, rotator_symbols_standardized, mfirsi_signal)
+                        self.run_short_trades(standardized_symbol, rotator_symbols_standardized, mfirsi_signal, stop_event)
                 finally:
                     symbol_locks[standardized_symbol][action].release()
                     logging.info(f"Lock released for symbol {standardized_symbol} action {action} by thread {current_thread_id}")
@@ -123,15 +123,15 @@ class BybitDynamicGridSpanIS(BybitStrategy):
             logging.error(f"Exception in run function: {e}")
             logging.debug(traceback.format_exc())
 
-    def run_long_trades(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None):
+    def run_long_trades(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, stop_event=None):
         self.running_long = True
-        self.run_single_symbol(symbol, rotator_symbols_standardized, mfirsi_signal, "long")
+        self.run_single_symbol(symbol, rotator_symbols_standardized, mfirsi_signal, "long", stop_event)
 
-    def run_short_trades(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None):
+    def run_short_trades(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, stop_event=None):
         self.running_short = True
-        self.run_single_symbol(symbol, rotator_symbols_standardized, mfirsi_signal, "short")
+        self.run_single_symbol(symbol, rotator_symbols_standardized, mfirsi_signal, "short", stop_event)
 
-    def run_single_symbol(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+    def run_single_symbol(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None, stop_event=None):
         try:
             logging.info(f"Starting to process symbol: {symbol}")
             logging.info(f"Initializing default values for symbol: {symbol}")
@@ -292,6 +292,11 @@ class BybitDynamicGridSpanIS(BybitStrategy):
                 if action == "short" and not self.running_short:
                     logging.info(f"Killing thread for {symbol} because not running short")
                     break
+                # Set when the rotation drains this symbol or the bot stops the thread
+                if stop_event is not None and stop_event.is_set():
+                    logging.info(f"Stop requested for {symbol} {action}, ending the thread")
+                    shared_symbols_data.pop(symbol, None)
+                    break
 
                 current_time = time.time()
 
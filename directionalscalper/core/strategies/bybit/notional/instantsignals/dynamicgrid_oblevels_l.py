@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from directionalscalper.core.config_initializer import ConfigInitializer
 from directionalscalper.core.strategies.bybit.bybit_strategy import BybitStrategy
 from directionalscalper.core.exchanges.bybit import BybitExchange
+from directionalscalper.core.position_book import PositionBook
 from directionalscalper.core.strategies.logger import Logger
 from live_table_manager import shared_symbols_data
 logging = Logger(logger_name="BybitDynamicGridSpanOBLevelsLSignal", filename="BybitDynamicGridSpanOBLevelsLSignal.log", stream=True)
@@ -44,7 +45,7 @@ class BybitDynamicGridSpanOBLevelsLSignal(BybitStrategy):
             if standardized_symbol not in symbol_locks:
                 symbol_locks[standardized_symbol] = {'long': threading.Lock(), 'short': threading.Lock()}
 
-    def run(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+    def run(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None, stop_event=None):
         try:
             standardized_symbol = symbol.upper()
             logging.info(f"Standardized symbol: {standardized_symbol}")
@@ -57,9 +58,9 @@ class BybitDynamicGridSpanOBLevelsLSignal(BybitStrategy):
                 logging.info(f"Lock acquired for symbol {standardized_symbol} action {action} by thread {current_thread_id}")
                 try:
                     if action == "long":
-                        self.run_long_trades(standardized_symbol, rotator_symbols_standardized, mfirsi_signal)
+                        self.run_long_trades(standardized_symbol, rotator_symbols_standardized, mfirsi_signal, stop_event)
                     elif action == "short":
-                        self.run_short_trades(standardized_symbol, rotator_symbols_standardized, mfirsi_signal)
+                        self.run_short_trades(standardized_symbol, rotator_symbols_standardized, mfirsi_signal, stop_event)
                 finally:
                     symbol_locks[standardized_symbol][action].release()
                     logging.info(f"Lock released for symbol {standardized_symbol} action {action} by thread {current_thread_id}")
@@ -69,15 +70,15 @@ class BybitDynamicGridSpanOBLevelsLSignal(BybitStrategy):
             logging.error(f"Exception in run function: {e}")
             logging.debug(traceback.format_exc())
 
-    def run_long_trades(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None):
+    def run_long_trades(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, stop_event=None):
         self.running_long = True
-        self.run_single_symbol(symbol, rotator_symbols_standardized, mfirsi_signal, "long")
+        self.run_single_symbol(symbol, rotator_symbols_standardized, mfirsi_signal, "long", stop_event)
 
-    def run_short_trades(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None):
+    def run_short_trades(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, stop_event=None):
         self.running_short = True
-        self.run_single_symbol(symbol, rotator_symbols_standardized, mfirsi_signal, "short")
+        self.run_single_symbol(symbol, rotator_symbols_standardized, mfirsi_signal, "short", stop_event)
 
-    def run_single_symbol(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+    def run_single_symbol(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None, stop_event=None):
         try:
             logging.info(f"Starting to process symbol: {symbol}")
             logging.info(f"Initializing default values for symbol: {symbol}")
@@ -132,83 +133,6 @@ class BybitDynamicGridSpanOBLevelsLSignal(BybitStrategy):
             max_retries = 5
             retry_delay = 5
 
-
-            test_orders_enabled = self.config.test_orders_enabled
-            
-
-            levels = self.config.linear_grid['levels']
-            strength = self.config.linear_grid['strength']
-            outer_price_distance = self.config.linear_grid['outer_price_distance']
-            long_mode = self.config.linear_grid['long_mode']
-            short_mode = self.config.linear_grid['short_mode']
-            reissue_threshold = self.config.linear_grid['reissue_threshold']
-            buffer_percentage = self.config.linear_grid['buffer_percentage']
-            enforce_full_grid = self.config.linear_grid['enforce_full_grid']
-            initial_entry_buffer_pct = self.config.linear_grid['initial_entry_buffer_pct']
-            min_buffer_percentage = self.config.linear_grid['min_buffer_percentage']
-            max_buffer_percentage = self.config.linear_grid['max_buffer_percentage']
-            wallet_exposure_limit_long = self.config.linear_grid['wallet_exposure_limit_long']
-            wallet_exposure_limit_short = self.config.linear_grid['wallet_exposure_limit_short']
-            min_buffer_percentage_ar = self.config.linear_grid['min_buffer_percentage_ar']
-            max_buffer_percentage_ar = self.config.linear_grid['max_buffer_percentage_ar']
-            upnl_auto_reduce_threshold_long = self.config.linear_grid['upnl_auto_reduce_threshold_long']
-            upnl_auto_reduce_threshold_short = self.config.linear_grid['upnl_auto_reduce_threshold_short']
-            failsafe_enabled = self.config.linear_grid['failsafe_enabled']
-            long_failsafe_upnl_pct = self.config.linear_grid['long_failsafe_upnl_pct']
-            short_failsafe_upnl_pct = self.config.linear_grid['short_failsafe_upnl_pct']
-            failsafe_start_pct = self.config.linear_grid['failsafe_start_pct']
-            auto_reduce_cooldown_enabled = self.config.linear_grid['auto_reduce_cooldown_enabled']
-            auto_reduce_cooldown_start_pct = self.config.linear_grid['auto_reduce_cooldown_start_pct']
-            max_qty_percent_long = self.config.linear_grid['max_qty_percent_long']
-            max_qty_percent_short = self.config.linear_grid['max_qty_percent_short']
-            min_outer_price_distance = self.config.linear_grid['min_outer_price_distance']
-            max_outer_price_distance = self.config.linear_grid['max_outer_price_distance']
-            graceful_stop_long = self.config.linear_grid['graceful_stop_long']
-            graceful_stop_short = self.config.linear_grid['graceful_stop_short']
-            additional_entries_from_signal = self.config.linear_grid['additional_entries_from_signal']
-
-            # reissue_threshold_inposition = self.config.linear_grid['reissue_threshold_inposition']
-
-            volume_check = self.config.volume_check
-            min_dist = self.config.min_distance
-            min_vol = self.config.min_volume
-
-            upnl_threshold_pct = self.config.upnl_threshold_pct
-            upnl_profit_pct = self.config.upnl_profit_pct
-            max_upnl_profit_pct = self.config.max_upnl_profit_pct
-
-            # Stop loss
-            stoploss_enabled = self.config.stoploss_enabled
-            stoploss_upnl_pct = self.config.stoploss_upnl_pct
-            # Liq based stop loss
-            liq_stoploss_enabled = self.config.liq_stoploss_enabled
-            liq_price_stop_pct = self.config.liq_price_stop_pct
-
-            # Auto reduce
-            auto_reduce_enabled = self.config.auto_reduce_enabled
-            auto_reduce_start_pct = self.config.auto_reduce_start_pct
-
-            auto_reduce_maxloss_pct = self.config.auto_reduce_maxloss_pct
-
-            entry_during_autoreduce = self.config.entry_during_autoreduce
-
-            auto_reduce_marginbased_enabled = self.config.auto_reduce_marginbased_enabled
-
-            auto_reduce_wallet_exposure_pct = self.config.auto_reduce_wallet_exposure_pct
-
-            percentile_auto_reduce_enabled = self.config.percentile_auto_reduce_enabled
-        
-            max_pos_balance_pct = self.config.max_pos_balance_pct
-
-            # Funding
-            MaxAbsFundingRate = self.config.MaxAbsFundingRate
-            
-            # Hedge ratio
-            hedge_ratio = self.config.hedge_ratio
-
-            # Hedge price diff
-            price_difference_threshold = self.config.hedge_price_difference_threshold
-                    
             logging.info("Setting up exchange")
             self.exchange.setup_exchange_bybit(symbol)
 
@@ -228,6 +152,7 @@ class BybitDynamicGridSpanOBLevelsLSignal(BybitStrategy):
                 logging.info(f"No recent trading activity for {symbol} in the last 24 hours")
 
 
+            config_version = None
             while self.running_long or self.running_short:
 
                 logging.info(f"Trading {symbol} in while loop in obstrategy with long: {self.running_long}")
@@ -240,11 +165,96 @@ class BybitDynamicGridSpanOBLevelsLSignal(BybitStrategy):
                 if action == "short" and not self.running_short:
                     logging.info(f"Killing thread for {symbol} because not running short")
                     break
+                # Set when the rotation drains this symbol or the bot stops the thread
+                if stop_event is not None and stop_event.is_set():
+                    logging.info(f"Stop requested for {symbol} {action}, ending the thread")
+                    shared_symbols_data.pop(symbol, None)
+                    break
 
                 current_time = time.time()
 
                 iteration_start_time = time.time()
 
+                # Settings are re-read on the first pass and whenever the config files are reloaded
+                self.refresh_config()
+                if config_version != self.config_version:
+                    config_version = self.config_version
+                    test_orders_enabled = self.config.test_orders_enabled
+
+
+                    levels = self.config.linear_grid['levels']
+                    strength = self.config.linear_grid['strength']
+                    outer_price_distance = self.config.linear_grid['outer_price_distance']
+                    reissue_threshold = self.config.linear_grid['reissue_threshold']
+                    buffer_percentage = self.config.linear_grid['buffer_percentage']
+                    enforce_full_grid = self.config.linear_grid['enforce_full_grid']
+                    initial_entry_buffer_pct = self.config.linear_grid['initial_entry_buffer_pct']
+                    min_buffer_percentage = self.config.linear_grid['min_buffer_percentage']
+                    max_buffer_percentage = self.config.linear_grid['max_buffer_percentage']
+                    wallet_exposure_limit_long = self.config.linear_grid['wallet_exposure_limit_long']
+                    wallet_exposure_limit_short = self.config.linear_grid['wallet_exposure_limit_short']
+                    min_buffer_percentage_ar = self.config.linear_grid['min_buffer_percentage_ar']
+                    max_buffer_percentage_ar = self.config.linear_grid['max_buffer_percentage_ar']
+                    upnl_auto_reduce_threshold_long = self.config.linear_grid['upnl_auto_reduce_threshold_long']
+                    upnl_auto_reduce_threshold_short = self.config.linear_grid['upnl_auto_reduce_threshold_short']
+                    failsafe_enabled = self.config.linear_grid['failsafe_enabled']
+                    long_failsafe_upnl_pct = self.config.linear_grid['long_failsafe_upnl_pct']
+                    short_failsafe_upnl_pct = self.config.linear_grid['short_failsafe_upnl_pct']
+                    failsafe_start_pct = self.config.linear_grid['failsafe_start_pct']
+                    auto_reduce_cooldown_enabled = self.config.linear_grid['auto_reduce_cooldown_enabled']
+                    auto_reduce_cooldown_start_pct = self.config.linear_grid['auto_reduce_cooldown_start_pct']
+                    max_qty_percent_long = self.config.linear_grid['max_qty_percent_long']
+                    max_qty_percent_short = self.config.linear_grid['max_qty_percent_short']
+                    min_outer_price_distance = self.config.linear_grid['min_outer_price_distance']
+                    max_outer_price_distance = self.config.linear_grid['max_outer_price_distance']
+                    additional_entries_from_signal = self.config.linear_grid['additional_entries_from_signal']
+
+                    # reissue_threshold_inposition = self.config.linear_grid['reissue_threshold_inposition']
+
+                    volume_check = self.config.volume_check
+                    min_dist = self.config.min_distance
+                    min_vol = self.config.min_volume
+
+                    upnl_threshold_pct = self.config.upnl_threshold_pct
+                    upnl_profit_pct = self.config.upnl_profit_pct
+                    max_upnl_profit_pct = self.config.max_upnl_profit_pct
+
+                    # Stop loss
+                    stoploss_enabled = self.config.stoploss_enabled
+                    stoploss_upnl_pct = self.config.stoploss_upnl_pct
+                    # Liq based stop loss
+                    liq_stoploss_enabled = self.config.liq_stoploss_enabled
+                    liq_price_stop_pct = self.config.liq_price_stop_pct
+
+                    # Auto reduce
+                    auto_reduce_enabled = self.config.auto_reduce_enabled
+                    auto_reduce_start_pct = self.config.auto_reduce_start_pct
+
+                    auto_reduce_maxloss_pct = self.config.auto_reduce_maxloss_pct
+
+                    entry_during_autoreduce = self.config.entry_during_autoreduce
+
+                    auto_reduce_marginbased_enabled = self.config.auto_reduce_marginbased_enabled
+
+                    auto_reduce_wallet_exposure_pct = self.config.auto_reduce_wallet_exposure_pct
+
+                    percentile_auto_reduce_enabled = self.config.percentile_auto_reduce_enabled
+
+                    max_pos_balance_pct = self.config.max_pos_balance_pct
+
+                    # Funding
+                    MaxAbsFundingRate = self.config.MaxAbsFundingRate
+
+                    # Hedge ratio
+                    hedge_ratio = self.config.hedge_ratio
+
+                    # Hedge price diff
+                    price_difference_threshold = self.config.hedge_price_difference_threshold
+
+                # Runtime state: a reload only overwrites these when the file changed them
+                long_mode, short_mode = self.long_mode, self.short_mode
+                graceful_stop_long, graceful_stop_short = self.graceful_stop_long, self.graceful_stop_short
+
                 leverage_tiers = self.exchange.fetch_leverage_tiers(symbol)
 
                 if leverage_tiers:
@@ -265,40 +275,10 @@ class BybitDynamicGridSpanOBLevelsLSignal(BybitStrategy):
                 
                 #logging.info(f"Open position data for {symbol}: {open_position_data}")
 
-                position_details = {}
-
-                for position in open_position_data:
-                    info = position.get('info', {})
-                    position_symbol = info.get('symbol', '').split(':')[0]  # Use a different variable name
-
-                    # Ensure 'size', 'side', 'avgPrice', and 'liqPrice' keys exist in the info dictionary
-                    if 'size' in info and 'side' in info and 'avgPrice' in info and 'liqPrice' in info:
-                        size = float(info['size'])
-                        side = info['side'].lower()
-                        avg_price = float(info['avgPrice'])
-                        liq_price = info.get('liqPrice', None)  # Default to None if not available
-
-                        # Initialize the nested dictionary if the position_symbol is not already in position_details
-                        if position_symbol not in position_details:
-                            position_details[position_symbol] = {
-                                'long': {'qty': 0, 'avg_price': 0, 'liq_price': None}, 
-                                'short': {'qty': 0, 'avg_price': 0, 'liq_price': None}
-                            }
-
-                        # Update the quantities, average prices, and liquidation prices based on the side of the position
-                        if side == 'buy':
-                            position_details[position_symbol]['long']['qty'] += size
-                            position_details[position_symbol]['long']['avg_price'] = avg_price
-                            position_details[position_symbol]['long']['liq_price'] = liq_price
-                        elif side == 'sell':
-                            position_details[position_symbol]['short']['qty'] += size
-                            position_details[position_symbol]['short']['avg_price'] = avg_price
-                            position_details[position_symbol]['short']['liq_price'] = liq_price
-                    else:
-                        logging.warning(f"Missing required keys in position info for {position_symbol}")
-
-                open_symbols = self.extract_symbols_from_positions_bybit(open_position_data)
-                open_symbols = [symbol.replace("/", "") for symbol in open_symbols]
+                # Positions are indexed once per snapshot by the shared position book
+                book_positions, position_details, open_symbols = self.exchange.position_book.snapshot()
+                if book_positions is not open_position_data:
+                    _, position_details, open_symbols = PositionBook.from_positions(open_position_data).snapshot()
                 logging.info(f"Open symbols: {open_symbols}")
                 open_orders = self.retry_api_call(self.exchange.get_open_orders, symbol)
 
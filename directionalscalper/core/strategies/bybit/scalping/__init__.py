@@ -1,16 +1,30 @@
-from .bybit_mm_onemin_qfl_mfi_eri_walls import BybitMMOneMinuteQFLMFIERIWalls
-from .mfirsi_eri_ob_imbalance import BybitMFIRSIERIOBImbalance
-from .mfi_quickscalp import BybitMFIRSIQuickScalp
-from .quickscalp_trend import BybitQuickScalpTrend
-from .quickscalp_trend_dca import BybitQuickScalpTrendDCA
-from .mfi_eri_long_short_trend import BybitMFIERILongShortTrend
-from .mfi_quickscalp_long import BybitMFIRSIQuickScalpLong
-from .mfi_quickscalp_short import BybitMFIRSIQuickScalpShort
-from .quickscalp_trend_ob import BybitQuickScalpTrendOB
-from .quickscalp_trend_unified import BybitQuickScalpUnified
-from .quickscalp_trend_emas import BybitQSTrendDoubleMA
-from .basicgrid import BybitBasicGrid
-from .basicgridmfirsi import BybitBasicGridMFIRSI
-from .basicgridmfirsi_persistent import BybitBasicGridMFIRSIPersisent
-from .quickscalp_trend_spot import BybitQuickScalpTrendSpot
-from .quickscalp_ematrend import BybitQuickScalpEMATrend
\ No newline at end of file
+import importlib
+
+# Strategy classes are imported on first access so that running one strategy
+# doesn't import its siblings.
+_STRATEGIES = {
+    'BybitMMOneMinuteQFLMFIERIWalls': 'bybit_mm_onemin_qfl_mfi_eri_walls',
+    'BybitMFIRSIERIOBImbalance': 'mfirsi_eri_ob_imbalance',
+    'BybitMFIRSIQuickScalp': 'mfi_quickscalp',
+    'BybitQuickScalpTrend': 'quickscalp_trend',
+    'BybitQuickScalpTrendDCA': 'quickscalp_trend_dca',
+    'BybitMFIERILongShortTrend': 'mfi_eri_long_short_trend',
+    'BybitMFIRSIQuickScalpLong': 'mfi_quickscalp_long',
+    'BybitMFIRSIQuickScalpShort': 'mfi_quickscalp_short',
+    'BybitQuickScalpTrendOB': 'quickscalp_trend_ob',
+    'BybitQuickScalpUnified': 'quickscalp_trend_unified',
+    'BybitQSTrendDoubleMA': 'quickscalp_trend_emas',
+    'BybitBasicGrid': 'basicgrid',
+    'BybitBasicGridMFIRSI': 'basicgridmfirsi',
+    'BybitBasicGridMFIRSIPersisent': 'basicgridmfirsi_persistent',
+    'BybitQuickScalpTrendSpot': 'quickscalp_trend_spot',
+    'BybitQuickScalpEMATrend': 'quickscalp_ematrend',
+}
+
+__all__ = list(_STRATEGIES)
+
+
+def __getattr__(name):
+    if name in _STRATEGIES:
+        return getattr(importlib.import_module(f"{__name__}.{_STRATEGIES[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,253 @@
+import copy
 import threading
 import datetime
 import time
+from bisect import insort
 from rich.console import Console
 from rich.live import Live
 from rich.table import Table
 
-shared_symbols_data = {}
+
+class SharedSymbolsData(dict):
+    """
+    Per-symbol dashboard rows written by every strategy thread.
+
+    Writes are serialised with a lock and stamped with a version so readers can take a
+    consistent snapshot and only look at the rows that changed since their last read.
+    Iteration (keys/values/items) always walks a snapshot, so a reader can never hit
+    "dictionary changed size during iteration" while strategies are writing.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.lock = threading.RLock()
+        self.version = 0
+        self.row_versions = {}
+        self.update(*args, **kwargs)
+
+    def _touch(self, symbol):
+        self.version += 1
+        self.row_versions[symbol] = self.version
+
+    def __setitem__(self, symbol, symbol_data):
+        with self.lock:
+            # Store a private copy so the row can't be mutated behind the reader's back
+            super().__setitem__(symbol, dict(symbol_data))
+            self._touch(symbol)
+
+    def __delitem__(self, symbol):
+        with self.lock:
+            super().__delitem__(symbol)
+            self.row_versions.pop(symbol, None)
+            self.version += 1
+
+    def pop(self, symbol, *default):
+        with self.lock:
+            if symbol in self:
+                self.row_versions.pop(symbol, None)
+                self.version += 1
+            return super().pop(symbol, *default)
+
+    def setdefault(self, symbol, default=None):
+        with self.lock:
+            if symbol not in self:
+                self[symbol] = default if default is not None else {}
+            return super().__getitem__(symbol)
+
+    def update(self, *args, **kwargs):
+        with self.lock:
+            for symbol, symbol_data in dict(*args, **kwargs).items():
+                self[symbol] = symbol_data
+
+    def clear(self):
+        with self.lock:
+            super().clear()
+            self.row_versions.clear()
+            self.version += 1
+
+    def keys(self):
+        with self.lock:
+            return list(super().keys())
+
+    def values(self):
+        with self.lock:
+            return list(super().values())
+
+    def items(self):
+        with self.lock:
+            return list(super().items())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def snapshot(self):
+        """Return (version, rows, row_versions) taken atomically under the lock."""
+        with self.lock:
+            return self.version, dict(super().items()), dict(self.row_versions)
+
+    def copy(self):
+        return self.snapshot()[1]
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self.copy(), memo)
+
+    def __reduce__(self):
+        return (dict, (self.copy(),))
+
+
+shared_symbols_data = SharedSymbolsData()
+
+
+def format_cell(value, is_bold=False, is_highlight=False):
+    if value is None:
+        return f"[b]N/A[/b]"
+    if is_bold:
+        return f"[b]{value}[/b]"
+    elif is_highlight:
+        return f"[b]{value}[/b]" if value > 0 else str(value) #if for some reason there isn't a position and there's a Pnl (making sure there's no )
+    return str(value)
+
+
+class SymbolTableModel:
+    """
+    Incremental model behind the live table.
+
+    Each refresh takes one snapshot of the shared data, re-renders only the rows whose
+    version changed and keeps the displayed order sorted incrementally, so a refresh with
+    nothing new costs a single version comparison.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.seen_version = -1
+        self.row_versions = {}
+        self.rows = {}          # symbol -> rendered cells
+        self.sort_keys = {}     # symbol -> sort key of the rows currently displayed
+        self.order = []         # sorted list of sort keys for displayed rows
+        self.upnl = {}          # symbol -> long + short uPnL, used for the caption total
+        self.last_row = None
+        self.last_update = None
+        self.dirty_count = 0
+
+    @staticmethod
+    def sort_key(symbol_data):
+        # Only symbols with an open position are shown, so the symbol name is the whole key
+        return symbol_data['symbol']
+
+    @staticmethod
+    def is_alive(symbol_data):
+        return (symbol_data.get('long_pos_qty', 0) or 0) > 0 or (symbol_data.get('short_pos_qty', 0) or 0) > 0
+
+    @staticmethod
+    def render_row(symbol_data):
+        long_pos_qty = symbol_data.get('long_pos_qty', 0) or 0
+        short_pos_qty = symbol_data.get('short_pos_qty', 0) or 0
+        long_upnl = round(symbol_data.get('long_upnl', 0) or 0, 2)
+        short_upnl = round(symbol_data.get('short_upnl', 0) or 0, 2)
+
+        # Determine if the entire row should be bold
+        is_bold = long_pos_qty > 0 or short_pos_qty > 0
+
+        return [
+            format_cell(symbol_data['symbol'], is_bold),
+            format_cell(symbol_data.get('min_qty', 0), is_bold),
+            format_cell(round(symbol_data.get('current_price', 0) or 0, 8), is_bold),
+            format_cell(symbol_data.get('volume', 0), is_bold),
+            format_cell(symbol_data.get('spread', 0), is_bold),
+            format_cell(symbol_data.get('ema_trend', ''), is_bold),
+            format_cell(long_pos_qty, is_bold),
+            format_cell(short_pos_qty, is_bold),
+            format_cell(long_upnl, is_bold, is_highlight=True),
+            format_cell(short_upnl, is_bold, is_highlight=True),
+            format_cell(round(symbol_data.get('long_cum_pnl', 0) or 0, 2), is_bold),
+            format_cell(round(symbol_data.get('short_cum_pnl', 0) or 0, 2), is_bold),
+            format_cell(round(symbol_data.get('long_pos_price', 0) or 0, 8), is_bold),
+            format_cell(round(symbol_data.get('short_pos_price', 0) or 0, 8), is_bold)
+        ]
+
+    def _drop(self, symbol):
+        key = self.sort_keys.pop(symbol, None)
+        if key is not None:
+            self.order.remove(key)
+        self.rows.pop(symbol, None)
+
+    def refresh(self) -> bool:
+        """Apply changes since the last refresh. Returns True if anything changed."""
+        version, data, row_versions = self.source.snapshot()
+        if version == self.seen_version:
+            self.dirty_count = 0
+            return False
+
+        dirty = [symbol for symbol, row_version in row_versions.items() if self.row_versions.get(symbol) != row_version]
+        removed = [symbol for symbol in self.row_versions if symbol not in row_versions]
+
+        for symbol in removed:
+            self._drop(symbol)
+            self.upnl.pop(symbol, None)
+
+        for symbol in dirty:
+            symbol_data = data[symbol]
+            self.upnl[symbol] = (symbol_data.get('long_upnl') or 0) + (symbol_data.get('short_upnl') or 0)
+
+            if not self.is_alive(symbol_data):
+                self._drop(symbol)
+                continue
+
+            key = self.sort_key(symbol_data)
+            if self.sort_keys.get(symbol) != key:
+                # Only a changed sort key touches the ordering
+                if symbol in self.sort_keys:
+                    self.order.remove(self.sort_keys[symbol])
+                insort(self.order, key)
+                self.sort_keys[symbol] = key
+            self.rows[symbol] = self.render_row(symbol_data)
+
+        # Assuming all symbols have **nearly** the same balance and available balance we pick the last symbol to get these values
+        self.last_row = data[next(reversed(data))] if data else None
+        self.row_versions = row_versions
+        self.seen_version = version
+        self.dirty_count = len(dirty) + len(removed)
+        self.last_update = datetime.datetime.now().strftime('%H:%M:%S %d-%m-%Y')
+        return True
+
+    def caption(self):
+        current_time = self.last_update or datetime.datetime.now().strftime('%H:%M:%S %d-%m-%Y')
+        if self.last_row:
+            balance = "{:.4f}".format(float(self.last_row.get('balance') or 0))
+            available_bal = "{:.4f}".format(float(self.last_row.get('available_bal') or 0))
+            total_upnl = "{:.4f}".format(sum(self.upnl.values()))
+            # Styling
+            upnl_value = float(total_upnl)
+            upnl_style = "[italic]" if upnl_value > 9 or upnl_value < -9.5 else "[bold]" if upnl_value > 3.5 or upnl_value < -3.5 else ""
+            upnl_color = "[green]" if upnl_value > 1 else "[red]" if upnl_value < -1 else "[grey]"
+            styled_upnl = f"{upnl_style}{upnl_color}{total_upnl}[/]"
+            return f"Balance: {balance} | Available: {available_bal} | Total uPnL: {styled_upnl} | Updated: {current_time}"
+        return f"Loading... {len(self.row_versions)} symbols loaded | Updated: {current_time}"
+
+    def ordered_rows(self):
+        symbol_by_key = {key: symbol for symbol, key in self.sort_keys.items()}
+        return [self.rows[symbol_by_key[key]] for key in self.order]
+
 
 class LiveTableManager:
-    def __init__(self):
-        self.table = self.generate_table()
+    MIN_REFRESH_INTERVAL = 1
+    MAX_REFRESH_INTERVAL = 10
+
+    def __init__(self, source=None):
+        self.model = SymbolTableModel(source if source is not None else shared_symbols_data)
+        self.refresh_interval = 3
         self.row_data = {}  # Dictionary to store row data
         self.lock = threading.Lock()
+        self.table = self.generate_table()
 
     def generate_table(self) -> Table:
+        self.model.refresh()
+
         table = Table(show_header=True, header_style="bold blue", title="DirectionalScalper")
-       
+
         table.add_column("Symbol", style="cyan", min_width=12)
         table.add_column("Min. Qty")
         table.add_column("Price")
@@ -31,75 +263,29 @@ class LiveTableManager:
         table.add_column("Long Pos. Price")
         table.add_column("Short Pos. Price")
 
-        # Assuming all symbols have **nearly** the same balance and available balance we pick the last symbol to get these values
-        current_time = datetime.datetime.now().strftime('%H:%M:%S %d-%m-%Y')
-        last_symbol_data = list(shared_symbols_data.values())[-1] if shared_symbols_data else None
-        if last_symbol_data:
-            balance = "{:.4f}".format(float(last_symbol_data.get('balance') or 0))
-            available_bal = "{:.4f}".format(float(last_symbol_data.get('available_bal') or 0))
-            total_upnl = "{:.4f}".format(sum((symbol_data.get('long_upnl') or 0) + (symbol_data.get('short_upnl') or 0) for symbol_data in shared_symbols_data.values()))
-            # Styling
-            upnl_value = float(total_upnl)
-            upnl_style = "[italic]" if upnl_value > 9 or upnl_value < -9.5 else "[bold]" if upnl_value > 3.5 or upnl_value < -3.5 else ""
-            upnl_color = "[green]" if upnl_value > 1 else "[red]" if upnl_value < -1 else "[grey]"
-            styled_upnl = f"{upnl_style}{upnl_color}{total_upnl}[/]"
-            table.caption = f"Balance: {balance} | Available: {available_bal} | Total uPnL: {styled_upnl} | Updated: {current_time}"
-        else:
-            table.caption = f"Loading... {len(shared_symbols_data)} symbols loaded | Updated: {current_time}"
-
-        # Sorting symbols
-        sorted_symbols = sorted(
-            [symbol_data for symbol_data in shared_symbols_data.values() if symbol_data['symbol'] in shared_symbols_data],
-            key=lambda x: (
-                -(x.get('long_pos_qty', 0) > 0 or x.get('short_pos_qty', 0) > 0),  # Prioritize symbols with quantities > 0
-                x['symbol']  # Then sort by symbol name
-            )
-        )
-        
-        for symbol_data in sorted_symbols:
-            long_pos_qty = symbol_data.get('long_pos_qty', 0)
-            short_pos_qty = symbol_data.get('short_pos_qty', 0)
-            long_upnl = round(symbol_data.get('long_upnl', 0) or 0, 2)
-            short_upnl = round(symbol_data.get('short_upnl', 0) or 0, 2)
-
-            # Determine if the entire row should be bold
-            is_symbolrowalive = long_pos_qty > 0 or short_pos_qty > 0 
-
-            # Helper function to format the cell
-            def format_cell(value, is_bold=is_symbolrowalive, is_highlight=False):
-                if value is None:
-                    return f"[b]N/A[/b]"
-                if is_bold:
-                    return f"[b]{value}[/b]"
-                elif is_highlight:
-                    return f"[b]{value}[/b]" if value > 0 else str(value) #if for some reason there isn't a position and there's a Pnl (making sure there's no )
-                return str(value)
-
-            row = [
-                format_cell(symbol_data['symbol']),
-                format_cell(symbol_data.get('min_qty', 0)),
-                format_cell(round(symbol_data.get('current_price', 0) or 0, 8)),
-                format_cell(symbol_data.get('volume', 0)),
-                format_cell(symbol_data.get('spread', 0)),
-                format_cell(symbol_data.get('ema_trend', '')),
-                format_cell(long_pos_qty),
-                format_cell(short_pos_qty),
-                format_cell(long_upnl, is_highlight=True),
-                format_cell(short_upnl, is_highlight=True),
-                format_cell(round(symbol_data.get('long_cum_pnl', 0) or 0, 2)),
-                format_cell(round(symbol_data.get('short_cum_pnl', 0) or 0, 2)),
-                format_cell(round(symbol_data.get('long_pos_price', 0) or 0, 8)),
-                format_cell(round(symbol_data.get('short_pos_price', 0) or 0, 8))
-            ]
-            if is_symbolrowalive: #if it's a symbol with long or short position > 0
-                table.add_row(*row)
+        table.caption = self.model.caption()
+
+        for row in self.model.ordered_rows():
+            table.add_row(*row)
 
         return table
 
+    def adapt_refresh_interval(self, changed):
+        # Refresh quickly while rows are changing, back off while the data is idle
+        if changed:
+            self.refresh_interval = max(self.MIN_REFRESH_INTERVAL, self.refresh_interval * 0.75)
+        else:
+            self.refresh_interval = min(self.MAX_REFRESH_INTERVAL, self.refresh_interval * 1.5)
+
     def display_table(self):
         console = Console()
-        with Live(self.table, refresh_per_second=1/3) as live:
+        with Live(self.table, console=console, auto_refresh=False) as live:
+            live.refresh()
             while True:
-                time.sleep(3)
+                time.sleep(self.refresh_interval)
                 with self.lock:
-                    live.update(self.generate_table())
+                    changed = self.model.seen_version != self.model.source.version
+                    if changed:
+                        self.table = self.generate_table()
+                        live.update(self.table, refresh=True)
+                    self.adapt_refresh_interval(changed)
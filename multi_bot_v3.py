@@ -1,6 +1,7 @@
 import sys
 import os
 import time
+startup_started = time.perf_counter()
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from concurrent.futures import Future
 import threading
@@ -20,21 +21,16 @@ import inquirer
 from rich.live import Live
 import argparse
 from pathlib import Path
-from config import load_config, Config, VERSION
+from config import get_config_service, Config, VERSION
 from api.manager import Manager
 
-from directionalscalper.core.exchanges import *
-
-import directionalscalper.core.strategies.bybit.notional.instantsignals as instant_signals
-import directionalscalper.core.strategies.bybit.notional as bybit_notional
-import directionalscalper.core.strategies.bybit.scalping as bybit_scalping
-import directionalscalper.core.strategies.bybit.hedging as bybit_hedging
-from directionalscalper.core.strategies.binance import *
-from directionalscalper.core.strategies.huobi import *
+from directionalscalper.core import registry
 
 from live_table_manager import LiveTableManager, shared_symbols_data
 
 from directionalscalper.core.strategies.logger import Logger
+from directionalscalper.core.signal_batch import SignalEvaluator, ACTIONABLE_SIGNALS
+from directionalscalper.core.rotation_supervisor import RotationSupervisor, STARTING
 
 from rate_limit import RateLimit
 
@@ -65,7 +61,10 @@ latest_rotator_symbols = set()
 last_rotator_update_time = time.time()
 tried_symbols = set()
 
+rotation_supervisor = None  # Set by bybit_auto_rotation; owns thread admission and lifecycle
+
 logging = Logger(logger_name="MultiBot", filename="MultiBot.log", stream=True)
+registry.startup_report("Imports complete", startup_started)
 
 colorama.init()
 
@@ -169,19 +168,8 @@ class DirectionalMarketMaker:
         secret_key = exchange_config.api_secret
         passphrase = getattr(exchange_config, 'passphrase', None)  # Use getattr to get passphrase if it exists
         
-        exchange_classes = {
-            'bybit': BybitExchange,
-            'bybit_spot': BybitExchange,
-            'hyperliquid': HyperLiquidExchange,
-            'huobi': HuobiExchange,
-            'bitget': BitgetExchange,
-            'binance': BinanceExchange,
-            'mexc': MexcExchange,
-            'lbank': LBankExchange,
-            'blofin': BlofinExchange
-        }
-
-        exchange_class = exchange_classes.get(exchange_name.lower(), Exchange)
+        # Only the exchange module in use is imported
+        exchange_class = registry.exchanges.get(exchange_name) or registry.exchanges.get('exchange')
 
         # Initialize the exchange based on whether a passphrase is required
         if exchange_name.lower() in ['bybit', 'binance']:  # Add other exchanges here that do not require a passphrase
@@ -191,7 +179,7 @@ class DirectionalMarketMaker:
         else:
             self.exchange = exchange_class(api_key, secret_key, passphrase)
 
-    def run_strategy(self, symbol, strategy_name, config, account_name, symbols_to_trade=None, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+    def run_strategy(self, symbol, strategy_name, config, account_name, symbols_to_trade=None, rotator_symbols_standardized=None, mfirsi_signal=None, action=None, stop_event=None):
         logging.info(f"Received rotator symbols in run_strategy for {symbol}: {rotator_symbols_standardized}")
         
         symbols_allowed = next((exch.symbols_allowed for exch in config.exchanges if exch.name == self.exchange_name and exch.account_name == account_name), None)
@@ -206,38 +194,19 @@ class DirectionalMarketMaker:
             except Exception as e:
                 logging.error(f"Error in printing info: {e}")
 
-        strategy_classes = {
-            'bybit_1m_qfl_mfi_eri_walls': bybit_scalping.BybitMMOneMinuteQFLMFIERIWalls,
-            'bybit_1m_qfl_mfi_eri_autohedge_walls_atr': bybit_hedging.BybitMMOneMinuteQFLMFIERIAutoHedgeWallsATR,
-            'bybit_mfirsi_imbalance': bybit_scalping.BybitMFIRSIERIOBImbalance,
-            'bybit_mfirsi_quickscalp': bybit_scalping.BybitMFIRSIQuickScalp,
-            'qsematrend': bybit_scalping.BybitQuickScalpEMATrend,
-            'qstrend_dca': bybit_scalping.BybitQuickScalpTrendDCA,
-            'mfieritrend': bybit_scalping.BybitMFIERILongShortTrend,
-            'qstrendlongonly': bybit_scalping.BybitMFIRSIQuickScalpLong,
-            'qstrendshortonly': bybit_scalping.BybitMFIRSIQuickScalpShort,
-            'qstrend_unified': bybit_scalping.BybitQuickScalpUnified,
-            'basicgrid': bybit_scalping.BybitBasicGrid,
-            'qstrendspot': bybit_scalping.BybitQuickScalpTrendSpot,
-            'qsgridinstantsignal': instant_signals.BybitDynamicGridSpanOBSRStaticIS,
-            'qsgriddynmaicgridspaninstant': instant_signals.BybitDynamicGridSpanIS,
-            #'qsgridob': instant_signals.BybitDynamicGridSpanOBLevels,
-            'qstrendobdynamictp': instant_signals.BybitQuickScalpTrendDynamicTP,
-            'qsgridob': instant_signals.BybitDynamicGridSpanOBLevelsLSignal
-        }
-
-        strategy_class = strategy_classes.get(strategy_name.lower())
+        # Strategy modules are imported on first use; see directionalscalper.core.registry
+        strategy_class = registry.strategies.get(strategy_name)
         if strategy_class:
             strategy = strategy_class(self.exchange, self.manager, config.bot, symbols_allowed)
             try:
                 logging.info(f"Running strategy for symbol {symbol} with action {action}")
                 if action == "long":
                     future_long = Future()
-                    Thread(target=self.run_with_future, args=(strategy, symbol, rotator_symbols_standardized, mfirsi_signal, "long", future_long)).start()
+                    Thread(target=self.run_with_future, args=(strategy, symbol, rotator_symbols_standardized, mfirsi_signal, "long", future_long, stop_event)).start()
                     return future_long
                 elif action == "short":
                     future_short = Future()
-                    Thread(target=self.run_with_future, args=(strategy, symbol, rotator_symbols_standardized, mfirsi_signal, "short", future_short)).start()
+                    Thread(target=self.run_with_future, args=(strategy, symbol, rotator_symbols_standardized, mfirsi_signal, "short", future_short, stop_event)).start()
                     return future_short
                 else:
                     future = Future()
@@ -254,9 +223,9 @@ class DirectionalMarketMaker:
             return future
 
 
-    def run_with_future(self, strategy, symbol, rotator_symbols_standardized, mfirsi_signal, action, future):
+    def run_with_future(self, strategy, symbol, rotator_symbols_standardized, mfirsi_signal, action, future, stop_event=None):
         try:
-            strategy.run(symbol, rotator_symbols_standardized=rotator_symbols_standardized, mfirsi_signal=mfirsi_signal, action=action)
+            strategy.run(symbol, rotator_symbols_standardized=rotator_symbols_standardized, mfirsi_signal=mfirsi_signal, action=action, stop_event=stop_event)
             future.set_result(True)
         except Exception as e:
             future.set_exception(e)
@@ -269,7 +238,7 @@ class DirectionalMarketMaker:
             # return self.exchange.retry_api_call(self.exchange.get_balance_bybit(quote))
             return self.exchange.get_balance_bybit(quote)
         elif self.exchange_name == 'bybit_unified':
-            return self.exchange.retry_api_call(self.exchange.get_balance_bybit(quote))
+            return self.exchange.retry_api_call(self.exchange.get_balance_bybit, quote)
         elif self.exchange_name == 'mexc':
             return self.exchange.get_balance_mexc(quote, market_type='swap')
         elif self.exchange_name == 'huobi':
@@ -350,6 +319,8 @@ orders_canceled = False
 def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed, rotator_symbols_standardized, thread_completed, mfirsi_signal, action):
     global orders_canceled, unique_active_symbols, active_long_symbols, active_short_symbols
     current_thread = threading.current_thread()
+    # Threads started by the supervisor were admitted against symbols_allowed already
+    supervised = rotation_supervisor is not None and rotation_supervisor.state(symbol, action) == STARTING
     try:
         if not args.config.startswith('configs/'):
             config_file_path = Path('configs/' + args.config)
@@ -359,7 +330,7 @@ def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed,
         logging.info(f"Loading config from: {config_file_path}")
 
         account_file_path = Path('configs/account.json')  # Define the account file path
-        config = load_config(config_file_path, account_file_path)  # Pass both file paths to load_config
+        config = get_config_service(config_file_path, account_file_path).config  # Shared snapshot, reloaded when the files change
 
         exchange_name = args.exchange
         strategy_name = args.strategy
@@ -388,7 +359,7 @@ def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed,
 
         with thread_to_symbol_lock:
             is_open_position = symbol in open_position_symbols
-            if not is_open_position and len(unique_active_symbols) >= symbols_allowed and symbol not in unique_active_symbols:
+            if not supervised and not is_open_position and len(unique_active_symbols) >= symbols_allowed and symbol not in unique_active_symbols:
                 logging.info(f"Symbols allowed limit reached. Skipping new symbol {symbol}.")
                 return
 
@@ -400,6 +371,9 @@ def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed,
             elif action == "short" or symbol in current_short_positions:
                 active_short_symbols.add(symbol)
 
+        if supervised:
+            rotation_supervisor.mark_running(symbol, action)
+
         try:
             if not orders_canceled and hasattr(market_maker.exchange, 'cancel_all_open_orders_bybit'):
                 market_maker.exchange.cancel_all_open_orders_bybit()
@@ -415,7 +389,7 @@ def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed,
 
         with general_rate_limiter:
             signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
-            future = market_maker.run_strategy(symbol, args.strategy, config, account_name, symbols_to_trade=symbols_allowed, rotator_symbols_standardized=latest_rotator_symbols, mfirsi_signal=signal, action=action)
+            future = market_maker.run_strategy(symbol, args.strategy, config, account_name, symbols_to_trade=symbols_allowed, rotator_symbols_standardized=latest_rotator_symbols, mfirsi_signal=signal, action=action, stop_event=thread_completed)
             future.result()  # Wait for the strategy to complete
 
     except Exception as e:
@@ -431,6 +405,8 @@ def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed,
             active_short_symbols.discard(symbol)
         logging.info(f"Thread for symbol {symbol} with action {action} has completed.")
         thread_completed.set()
+        if supervised:
+            rotation_supervisor.mark_stopped(symbol, action)
 
 
 def bybit_auto_rotation_spot(args, market_maker, manager, symbols_allowed):
@@ -448,7 +424,7 @@ def bybit_auto_rotation_spot(args, market_maker, manager, symbols_allowed):
 
     config_file_path = Path('configs/' + args.config) if not args.config.startswith('configs/') else Path(args.config)
     account_file_path = Path('configs/account.json')
-    config = load_config(config_file_path, account_file_path)
+    config = get_config_service(config_file_path, account_file_path).config
 
     market_maker = DirectionalMarketMaker(config, args.exchange, args.account_name)
     market_maker.manager = manager
@@ -530,20 +506,25 @@ def bybit_auto_rotation_spot(args, market_maker, manager, symbols_allowed):
 
 
 def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
-    global latest_rotator_symbols, long_threads, short_threads, active_symbols, active_long_symbols, active_short_symbols, last_rotator_update_time, unique_active_symbols
+    global latest_rotator_symbols, long_threads, short_threads, active_symbols, active_long_symbols, active_short_symbols, last_rotator_update_time, unique_active_symbols, rotation_supervisor
 
     max_workers_signals = 1
     max_workers_trading = 1
+    max_workers_signal_evaluation = 8
 
     signal_executor = ThreadPoolExecutor(max_workers=max_workers_signals)
     trading_executor = ThreadPoolExecutor(max_workers=max_workers_trading)
+    signal_evaluator = SignalEvaluator(market_maker.get_signal, max_workers=max_workers_signal_evaluation)
 
     logging.info(f"Initialized signal executor with max workers: {max_workers_signals}")
     logging.info(f"Initialized trading executor with max workers: {max_workers_trading}")
+    logging.info(f"Initialized signal evaluator with max workers: {max_workers_signal_evaluation}")
 
     config_file_path = Path('configs/' + args.config) if not args.config.startswith('configs/') else Path(args.config)
     account_file_path = Path('configs/account.json')
-    config = load_config(config_file_path, account_file_path)
+    config_service = get_config_service(config_file_path, account_file_path)
+    config = config_service.config
+    config_version = config_service.version
 
     market_maker.manager = manager
 
@@ -577,11 +558,41 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
                 logging.error(f"Exception in thread: {e}")
                 logging.debug(traceback.format_exc())
 
+    def launch_symbol_thread(symbol, side, signal, thread_completed):
+        thread = threading.Thread(target=run_bot, args=(symbol, args, market_maker, manager, args.account_name, symbols_allowed, latest_rotator_symbols, thread_completed, signal, side))
+        with thread_to_symbol_lock:
+            if side == "long":
+                long_threads[symbol] = (thread, thread_completed)
+            else:
+                short_threads[symbol] = (thread, thread_completed)
+        thread.start()
+        logging.info(f"Started thread for symbol {symbol} with action {side} based on signal {signal}.")
+        return thread
+
+    def forget_symbol_thread(symbol, side, thread):
+        threads_for_side = long_threads if side == "long" else short_threads
+        with thread_to_symbol_lock:
+            if symbol in threads_for_side and threads_for_side[symbol][0] is thread:
+                del threads_for_side[symbol]
+        logging.info(f"Thread and symbol management completed for: {symbol} {side}")
+
+    if rotation_supervisor is None:
+        rotation_supervisor = RotationSupervisor(symbols_allowed, launch_symbol_thread, forget_symbol_thread)
+
     processed_symbols = set()
 
     while True:
         try:
             current_time = time.time()
+            if config_service.version != config_version:
+                config = config_service.config
+                config_version = config_service.version
+                long_mode = config.bot.linear_grid['long_mode']
+                short_mode = config.bot.linear_grid['short_mode']
+                config_graceful_stop_long = config.bot.linear_grid.get('graceful_stop_long', False)
+                config_graceful_stop_short = config.bot.linear_grid.get('graceful_stop_short', False)
+                logging.info(f"Config version {config_version}: long mode {long_mode}, short mode {short_mode}, graceful stop long {config_graceful_stop_long}, graceful stop short {config_graceful_stop_short}")
+
             open_position_data = fetch_open_positions()
             open_position_symbols = {standardize_symbol(pos['symbol']) for pos in open_position_data}
             logging.info(f"Open position symbols: {open_position_symbols}")
@@ -616,10 +627,31 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
                     latest_rotator_symbols = fetch_updated_symbols(args, manager)
                 last_rotator_update_time = current_time
                 processed_symbols.clear()
+                rotation_supervisor.set_candidates(latest_rotator_symbols)
                 logging.info(f"Refreshed latest rotator symbols: {latest_rotator_symbols}")
             else:
                 logging.debug(f"No refresh needed yet. Last update was at {last_rotator_update_time}, less than 60 seconds ago.")
 
+            rotation_supervisor.reap()
+
+            # Evaluate every signal needed this cycle in one concurrent batch
+            open_symbols_needing_signal = [
+                symbol for symbol in sorted(open_position_symbols)
+                if not (symbol in long_threads and long_threads[symbol][0].is_alive())
+                or not (symbol in short_threads and short_threads[symbol][0].is_alive())
+            ]
+            rotator_candidates = []
+            if len(unique_active_symbols) < symbols_allowed and not (graceful_stop_long and graceful_stop_short):
+                rotator_candidates = [symbol for symbol in sorted(latest_rotator_symbols) if symbol not in processed_symbols and symbol not in unique_active_symbols]
+            ranked_signals = signal_evaluator.evaluate(open_symbols_needing_signal + rotator_candidates, open_symbols=open_position_symbols)
+            signals = {result['symbol']: result['signal'] for result in ranked_signals}
+            ranked_rotator_symbols = [result['symbol'] for result in ranked_signals if not result['is_open_position']]
+            logging.info(f"Ranked rotator signals: {[(result['symbol'], result['signal']) for result in ranked_signals if result['signal'] in ACTIONABLE_SIGNALS]}")
+
+            # Network calls and waits stay outside thread_management_lock
+            fresh_open_position_data = fetch_open_positions()
+            fresh_open_position_symbols = {standardize_symbol(pos['symbol']) for pos in fresh_open_position_data}
+
             with thread_management_lock:
                 open_position_futures = []
                 signal_futures = []
@@ -638,11 +670,13 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
                     short_thread_running = symbol in short_threads and short_threads[symbol][0].is_alive()
 
                     if not long_thread_running or not short_thread_running:
-                        signal_futures.append(signal_executor.submit(process_signal_for_open_position, symbol, args, market_maker, manager, symbols_allowed, open_position_data, long_mode, short_mode, graceful_stop_long, graceful_stop_short))
+                        signal_futures.append(signal_executor.submit(process_signal_for_open_position, symbol, args, market_maker, manager, symbols_allowed, open_position_data, long_mode, short_mode, graceful_stop_long, graceful_stop_short, signals.get(symbol)))
 
                     if (has_open_long and not long_thread_running) or (has_open_short and not short_thread_running):
-                        with general_rate_limiter:
-                            signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
+                        signal = signals.get(symbol)
+                        if signal is None:
+                            with general_rate_limiter:
+                                signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
                         if has_open_long and not long_thread_running:
                             logging.info(f"Open symbol {symbol} has open long: {has_open_long} and long thread not running {long_thread_running}")
                             open_position_futures.append(trading_executor.submit(start_thread_for_open_symbol, symbol, args, manager, signal, True, False, long_mode, short_mode))
@@ -660,8 +694,6 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
                 logging.info(f"Active symbols count: {len(active_symbols)}")
                 logging.info(f"Unique active symbols count: {len(unique_active_symbols)}")
 
-                fresh_open_position_data = fetch_open_positions()
-                fresh_open_position_symbols = {standardize_symbol(pos['symbol']) for pos in fresh_open_position_data}
                 update_active_symbols(fresh_open_position_symbols)
                 unique_active_symbols = active_long_symbols.union(active_short_symbols)
 
@@ -669,9 +701,9 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
                 logging.info(f"Updated active short symbols ({len(active_short_symbols)}): {active_short_symbols}")
                 logging.info(f"Updated unique active symbols ({len(unique_active_symbols)}): {unique_active_symbols}")
 
-                if len(unique_active_symbols) < symbols_allowed:
+                if len(unique_active_symbols) < symbols_allowed and rotation_supervisor.free_slots() > 0:
                     logging.info(f"Unique active symbols are less than allowed, scanning for new symbols")
-                    for symbol in latest_rotator_symbols:
+                    for symbol in ranked_rotator_symbols:
                         if symbol not in processed_symbols and symbol not in unique_active_symbols:
                             if len(unique_active_symbols) >= symbols_allowed:
                                 logging.info(f"Reached symbols_allowed limit. Stopping processing of new symbols.")
@@ -681,49 +713,35 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
                             can_open_short = len(active_short_symbols) < symbols_allowed and not graceful_stop_short
 
                             if can_open_long:
-                                signal_futures.append(signal_executor.submit(process_signal, symbol, args, market_maker, manager, symbols_allowed, open_position_data, False, True, False, graceful_stop_long, graceful_stop_short))
+                                signal_futures.append(signal_executor.submit(process_signal, symbol, args, market_maker, manager, symbols_allowed, open_position_data, False, True, False, graceful_stop_long, graceful_stop_short, signals[symbol]))
                                 logging.info(f"Submitted signal processing for new long rotator symbol {symbol}.")
                             
                             if can_open_short:
-                                signal_futures.append(signal_executor.submit(process_signal, symbol, args, market_maker, manager, symbols_allowed, open_position_data, False, False, True, graceful_stop_long, graceful_stop_short))
+                                signal_futures.append(signal_executor.submit(process_signal, symbol, args, market_maker, manager, symbols_allowed, open_position_data, False, False, True, graceful_stop_long, graceful_stop_short, signals[symbol]))
                                 logging.info(f"Submitted signal processing for new short rotator symbol {symbol}.")
                             
                             if can_open_long or can_open_short:
-                                unique_active_symbols.add(symbol)
                                 processed_symbols.add(symbol)
-                                time.sleep(2)
+                                if signals[symbol] in ACTIONABLE_SIGNALS:
+                                    unique_active_symbols.add(symbol)
                 else:
                     logging.info(f"Unique active symbols are at or above the allowed limit, not scanning for new symbols")
 
-                process_futures(open_position_futures + signal_futures)
-
-                completed_symbols = []
-                for symbol, (thread, thread_completed) in {**long_threads, **short_threads}.items():
-                    if thread_completed.is_set():
-                        thread.join()
-                        completed_symbols.append(symbol)
-
-                for symbol in completed_symbols:
-                    active_symbols.discard(symbol)
-                    if symbol in long_threads:
-                        del long_threads[symbol]
-                    if symbol in short_threads:
-                        del short_threads[symbol]
-                    active_long_symbols.discard(symbol)
-                    active_short_symbols.discard(symbol)
-                    unique_active_symbols.discard(symbol)
-                    logging.info(f"Thread and symbol management completed for: {symbol}")
+            # Thread starts are only admitted here; the supervisor launches and reaps them
+            process_futures(open_position_futures + signal_futures)
+            logging.info(f"Supervisor states: {rotation_supervisor.snapshot()}")
 
         except Exception as e:
             logging.info(f"Exception caught in bybit_auto_rotation: {str(e)}")
             logging.info(traceback.format_exc())
         time.sleep(1)
 
-def process_signal_for_open_position(symbol, args, market_maker, manager, symbols_allowed, open_position_data, long_mode, short_mode, graceful_stop_long, graceful_stop_short):
+def process_signal_for_open_position(symbol, args, market_maker, manager, symbols_allowed, open_position_data, long_mode, short_mode, graceful_stop_long, graceful_stop_short, signal=None):
     market_maker.manager = manager
 
-    with general_rate_limiter:
-        signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
+    if signal is None:
+        with general_rate_limiter:
+            signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
     logging.info(f"Processing signal for open position symbol {symbol}. Signal: {signal}")
 
     action_taken = handle_signal(symbol, args, manager, signal, open_position_data, symbols_allowed, True, long_mode, short_mode, graceful_stop_long, graceful_stop_short)
@@ -733,10 +751,11 @@ def process_signal_for_open_position(symbol, args, market_maker, manager, symbol
     else:
         logging.info(f"No action taken for open position symbol {symbol}.")
 
-def process_signal(symbol, args, market_maker, manager, symbols_allowed, open_position_data, is_open_position, long_mode, short_mode, graceful_stop_long, graceful_stop_short):
+def process_signal(symbol, args, market_maker, manager, symbols_allowed, open_position_data, is_open_position, long_mode, short_mode, graceful_stop_long, graceful_stop_short, signal=None):
     market_maker.manager = manager
 
-    signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
+    if signal is None:
+        signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
     logging.info(f"Processing signal for {'open position' if is_open_position else 'new rotator'} symbol {symbol}. Signal: {signal}")
 
     action_taken = handle_signal(symbol, args, manager, signal, open_position_data, symbols_allowed, is_open_position, long_mode, short_mode, graceful_stop_long, graceful_stop_short)
@@ -988,6 +1007,11 @@ def is_short_position(symbol):
 
 def remove_thread_for_symbol(symbol):
     global unique_active_symbols
+    if rotation_supervisor is not None:
+        # Draining is asynchronous; the slot is released once the thread reports back
+        rotation_supervisor.drain(symbol)
+        return
+
     if symbol in long_threads:
         thread, thread_completed = long_threads[symbol]
     elif symbol in short_threads:
@@ -1013,15 +1037,30 @@ def remove_thread_for_symbol(symbol):
 def start_thread_for_open_symbol(symbol, args, manager, mfirsi_signal, has_open_long, has_open_short, long_mode, short_mode):
     action_taken = False
     if long_mode and (has_open_long or mfirsi_signal.lower() == "long"):
-        action_taken |= start_thread_for_symbol(symbol, args, manager, mfirsi_signal, "long")
+        action_taken |= start_thread_for_symbol(symbol, args, manager, mfirsi_signal, "long", is_open_position=True)
         logging.info(f"[DEBUG] Started long thread for open symbol {symbol}")
     if short_mode and (has_open_short or mfirsi_signal.lower() == "short"):
-        action_taken |= start_thread_for_symbol(symbol, args, manager, mfirsi_signal, "short")
+        action_taken |= start_thread_for_symbol(symbol, args, manager, mfirsi_signal, "short", is_open_position=True)
         logging.info(f"[DEBUG] Started short thread for open symbol {symbol}")
     return action_taken
 
-def start_thread_for_symbol(symbol, args, manager, mfirsi_signal, action):
+def start_thread_for_symbol(symbol, args, manager, mfirsi_signal, action, is_open_position=False):
     global unique_active_symbols
+    if rotation_supervisor is not None and action in ("long", "short"):
+        admitted = rotation_supervisor.propose(symbol, action, mfirsi_signal, is_open_position)
+        if admitted:
+            with thread_to_symbol_lock:
+                if action == "long":
+                    active_long_symbols.add(symbol)
+                else:
+                    active_short_symbols.add(symbol)
+                active_symbols.add(symbol)
+                unique_active_symbols.add(symbol)
+            logging.info(f"Admitted {action} thread for symbol {symbol} based on MFIRSI signal.")
+        else:
+            logging.info(f"{action.capitalize()} thread for symbol {symbol} not admitted by the rotation supervisor.")
+        return admitted
+
     if action == "long":
         if symbol in long_threads and long_threads[symbol][0].is_alive():
             logging.info(f"Long thread already running for symbol {symbol}. Skipping.")
@@ -1146,7 +1185,7 @@ if __name__ == '__main__':
     account_path = Path('configs/account.json')
 
     try:
-        config = load_config(config_file_path, account_path)
+        config = get_config_service(config_file_path, account_path).config
     except Exception as e:
         logging.error(f"Failed to load configuration: {str(e)}")
         logging.error(f"There is probably an issue with your path try using --config configs/config.json")
@@ -1168,6 +1207,8 @@ if __name__ == '__main__':
         url=f"{config.api.url}{config.api.filename}"
     )
 
+    registry.startup_report("Startup complete", startup_started)
+
     print(f"Using exchange {config.api.data_source_exchange} for API data")
 
     whitelist = config.bot.whitelist
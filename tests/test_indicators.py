@@ -0,0 +1,73 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+ta = pytest.importorskip('ta')
+
+from directionalscalper.core.indicators import ABSOLUTE_TOLERANCE, EMA, MFI, RSI, MfiRsiEmaSignal
+
+
+def random_candles(seed, n=1500):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    # Unchanged closes and zero volume exercise the flat-price and empty-flow branches
+    flat = np.flatnonzero(rng.uniform(size=n) < 0.05)
+    flat = flat[flat > 0]
+    close[flat] = close[flat - 1]
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n))
+    volume = rng.uniform(0, 1000, n)
+    volume[rng.uniform(size=n) < 0.02] = 0.0
+    timestamp = np.arange(n, dtype=float) * 60000
+    return pd.DataFrame({'timestamp': timestamp, 'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume})
+
+
+def assert_matches(got, want):
+    assert np.array_equal(np.isnan(got), np.isnan(want))
+    np.testing.assert_allclose(got, want, rtol=0, atol=ABSOLUTE_TOLERANCE)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('window', [5, 14, 30])
+def test_streaming_indicators_match_ta(seed, window):
+    df = random_candles(seed)
+    close = df['close'].to_numpy()
+
+    want = ta.trend.EMAIndicator(df['close'], window=window).ema_indicator().to_numpy()
+    np.testing.assert_array_equal(EMA(window).warmup(close), want)
+
+    want = ta.momentum.RSIIndicator(df['close'], window=window).rsi().to_numpy()
+    np.testing.assert_array_equal(RSI(window).warmup(close), want)
+
+    want = ta.volume.MFIIndicator(df['high'], df['low'], df['close'], df['volume'], window=window).money_flow_index().to_numpy()
+    assert_matches(MFI(window).warmup(df['high'], df['low'], df['close'], df['volume']), want)
+
+
+def test_peek_does_not_commit():
+    df = random_candles(0, n=100)
+    rsi = RSI(14)
+    rsi.warmup(df['close'].to_numpy()[:-1])
+    peeked = rsi.peek(df['close'].iloc[-1])
+    assert rsi.peek(df['close'].iloc[-1]) == peeked
+    assert rsi.update(df['close'].iloc[-1]) == peeked
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_signal_matches_pandas_conditions(seed, ema_period=5, secondary_ema_period=3):
+    df = random_candles(seed, n=101)
+    # The pandas computation get_mfirsi_ema_secondary_ema used before MfiRsiEmaSignal
+    mfi = ta.volume.MFIIndicator(high=df['high'], low=df['low'], close=df['close'], volume=df['volume'], window=14, fillna=False).money_flow_index()
+    rsi = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
+    mfi_ema = mfi.ewm(span=ema_period, adjust=False).mean()
+    rsi_ema = rsi.ewm(span=ema_period, adjust=False).mean()
+    mfi_ema_secondary = mfi.ewm(span=secondary_ema_period, adjust=False).mean()
+    rsi_ema_secondary = rsi.ewm(span=secondary_ema_period, adjust=False).mean()
+    buy = (mfi_ema < 30) & (rsi_ema < 40) & (mfi_ema_secondary < mfi_ema) & (rsi_ema_secondary < rsi_ema) & (df['open'] < df['close'])
+    sell = (mfi_ema > 70) & (rsi_ema > 60) & (mfi_ema_secondary > mfi_ema) & (rsi_ema_secondary > rsi_ema) & (df['open'] > df['close'])
+    expected = list(zip(buy.tolist(), sell.tolist()))
+
+    signal = MfiRsiEmaSignal(ema_period, secondary_ema_period)
+    assert signal.sync(df.iloc[:100].to_numpy().tolist()) == expected[:100]
+    # The next window overlaps the first, so only the new candle is committed
+    assert signal.sync(df.iloc[1:].to_numpy().tolist()) == expected
@@ -0,0 +1,128 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from directionalscalper.core.orderbook_analytics import OrderBookAnalytics, significant_levels
+
+BOOK_PATH = os.path.join(os.path.dirname(__file__), 'data', 'orderbook_btcusdt.json')
+CURRENT_PRICE = 64231.5
+
+
+@pytest.fixture
+def order_book():
+    with open(BOOK_PATH) as f:
+        return json.load(f)
+
+
+# The loops OrderBookAnalytics replaced in BybitStrategy, kept here as the reference
+
+def loop_volume_profile(order_book, current_price, max_outer_price_distance):
+    min_price = current_price - max_outer_price_distance * current_price
+    max_price = current_price + max_outer_price_distance * current_price
+
+    price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
+    volume_histogram_long = np.zeros_like(price_range)
+    volume_histogram_short = np.zeros_like(price_range)
+
+    for order in order_book['bids']:
+        price, volume = order[0], order[1]
+        if min_price <= price <= current_price:
+            index = int((price - min_price) / (max_price - min_price) * 100)
+            volume_histogram_long[index] += volume
+
+    for order in order_book['asks']:
+        price, volume = order[0], order[1]
+        if current_price <= price <= max_price:
+            index = int((price - min_price) / (max_price - min_price) * 100)
+            volume_histogram_short[index] += volume
+
+    return min_price, max_price, price_range, volume_histogram_long, volume_histogram_short
+
+
+def loop_volume_weighted_price(levels, side, buffer_percentage, current_price):
+    weighted_prices = []
+    cumulative_volume = 0
+    total_volume = sum(float(level[1]) for level in side)
+    volume_thresholds = np.linspace(0.1, 1, levels) * total_volume
+    current_index = 0
+
+    for threshold in volume_thresholds:
+        while cumulative_volume < threshold and current_index < len(side):
+            price, volume = float(side[current_index][0]), float(side[current_index][1])
+            cumulative_volume += volume
+            if current_index == 0 or abs(price - current_price) / current_price <= buffer_percentage:
+                weighted_prices.append(price)
+            current_index += 1
+
+    return weighted_prices
+
+
+def loop_walls(orders, threshold=5.0):
+    avg_size = sum([order[1] for order in orders[:10]]) / 10
+    return [(price, size) for price, size in orders if size > avg_size * threshold]
+
+
+def loop_significant_walls(orders, current_price, threshold, base_threshold_factor, proximity_threshold):
+    avg_size = sum([order[1] for order in orders[:20]]) / 20
+    return [
+        (price, size) for price, size in orders
+        if size > max(threshold, avg_size * base_threshold_factor) and abs(price - current_price) <= proximity_threshold
+    ]
+
+
+def loop_imbalance(order_book, depth):
+    total_bids = sum([bid[1] for bid in order_book['bids'][:depth]])
+    total_asks = sum([ask[1] for ask in order_book['asks'][:depth]])
+    if total_bids > total_asks:
+        return "buy_wall"
+    elif total_asks > total_bids:
+        return "sell_wall"
+    return "neutral"
+
+
+@pytest.mark.parametrize('max_outer_price_distance', [0.0001, 0.0002, 0.0005])
+def test_volume_profile_matches_loops(order_book, max_outer_price_distance):
+    expected = loop_volume_profile(order_book, CURRENT_PRICE, max_outer_price_distance)
+    result = OrderBookAnalytics(order_book).volume_profile(CURRENT_PRICE, max_outer_price_distance)
+    assert result[:2] == expected[:2]
+    for got, want in zip(result[2:], expected[2:]):
+        np.testing.assert_array_equal(got, want)
+
+    for histogram_index in (3, 4):
+        want_threshold, want_levels = significant_levels(expected[histogram_index], expected[2])
+        got_threshold, got_levels = significant_levels(result[histogram_index], result[2])
+        assert got_threshold == want_threshold
+        np.testing.assert_array_equal(got_levels, want_levels)
+
+
+@pytest.mark.parametrize('levels', [1, 5, 10, 40])
+@pytest.mark.parametrize('buffer_percentage', [0.0, 0.0001, 0.01])
+def test_volume_weighted_levels_match_loop(order_book, levels, buffer_percentage):
+    analytics = OrderBookAnalytics(order_book)
+    assert analytics.volume_weighted_levels('asks', levels, CURRENT_PRICE, buffer_percentage) == \
+        loop_volume_weighted_price(levels, order_book['asks'], buffer_percentage, CURRENT_PRICE)
+    assert analytics.volume_weighted_levels('bids', levels, CURRENT_PRICE, buffer_percentage, reverse=True) == \
+        loop_volume_weighted_price(levels, order_book['bids'][::-1], buffer_percentage, CURRENT_PRICE)
+
+
+def test_walls_match_loops(order_book):
+    analytics = OrderBookAnalytics(order_book)
+    for side in ('bids', 'asks'):
+        assert analytics.walls(side) == loop_walls(order_book[side])
+        assert analytics.walls(side, 3.0) == loop_walls(order_book[side], 3.0)
+        assert analytics.significant_walls(side, CURRENT_PRICE, 10.0, 2.0, 12.0) == \
+            loop_significant_walls(order_book[side], CURRENT_PRICE, 10.0, 2.0, 12.0)
+    assert analytics.walls('bids')
+
+
+@pytest.mark.parametrize('depth', [1, 5, 10, 50])
+def test_imbalance_and_strength_match_loops(order_book, depth):
+    analytics = OrderBookAnalytics(order_book)
+    assert analytics.imbalance(depth) == loop_imbalance(order_book, depth)
+
+    total_bid_quantity = sum([bid[1] for bid in order_book['bids'][:depth]])
+    total_ask_quantity = sum([ask[1] for ask in order_book['asks'][:depth]])
+    assert analytics.strength(depth) == total_bid_quantity / (total_bid_quantity + total_ask_quantity)
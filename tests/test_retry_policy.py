@@ -0,0 +1,92 @@
+import pytest
+
+ccxt = pytest.importorskip('ccxt')
+pytest.importorskip('requests')
+
+from directionalscalper.core.retry_policy import CircuitBreaker, CircuitOpenError, RetryError, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class Failing:
+    """Stand-in for an exchange call: raises the queued errors in order, then returns `result`."""
+
+    def __init__(self, *errors, result='ok'):
+        self.errors = list(errors)
+        self.result = result
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+def make_policy(**kwargs):
+    clock = FakeClock()
+    return RetryPolicy(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_retries_transient_errors_until_success():
+    policy, clock = make_policy()
+    call = Failing(ccxt.NetworkError('reset'), ccxt.RateLimitExceeded('slow down'))
+    assert policy.execute(call, endpoint='fetch_open_orders') == 'ok'
+    assert call.calls == 3
+    assert len(clock.sleeps) == 2
+
+
+def test_invalid_order_is_not_retried():
+    policy, _ = make_policy()
+    call = Failing(ccxt.InvalidOrder('bad qty'))
+    with pytest.raises(ccxt.InvalidOrder):
+        policy.execute(call, endpoint='create_order')
+    assert call.calls == 1
+
+
+def test_deadline_stops_retries():
+    policy, clock = make_policy(deadline=3)
+    call = Failing(*[ccxt.NetworkError('down')] * 50)
+    with pytest.raises(RetryError):
+        policy.execute(call, endpoint='fetch_balance')
+    assert clock.now <= 3
+
+
+def test_breaker_opens_per_endpoint():
+    policy, clock = make_policy(failure_threshold=2, reset_timeout=30)
+    for _ in range(2):
+        with pytest.raises(RetryError):
+            policy.execute(Failing(ccxt.NetworkError('down')), endpoint='fetch_open_orders', max_attempts=1)
+    with pytest.raises(CircuitOpenError):
+        policy.execute(Failing(), endpoint='fetch_open_orders')
+
+    # The per-symbol fallback has its own breaker and still goes out
+    assert policy.execute(Failing(result=[]), endpoint='fetch_open_orders_symbol') == []
+
+    clock.now += 30
+    assert policy.execute(Failing(), endpoint='fetch_open_orders') == 'ok'
+    assert policy.breaker('fetch_open_orders').state == CircuitBreaker.CLOSED
+
+
+def test_nested_retry_error_is_not_retried_again():
+    policy, clock = make_policy()
+    inner = Failing(*[ccxt.NetworkError('down')] * 2)
+
+    def get_open_orders():
+        return policy.execute(inner, endpoint='fetch_open_orders_symbol', max_attempts=2)
+
+    with pytest.raises(RetryError):
+        policy.execute(get_open_orders)
+    assert inner.calls == 2
+    assert len(clock.sleeps) == 1